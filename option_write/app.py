@@ -3,7 +3,6 @@ from datetime import datetime, timedelta
 import yfinance as yf
 import json
 import os
-import glob
 from live_signals import get_next_weekly_expiry, find_closest_strike_simple
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -11,12 +10,57 @@ import pytz
 import weeklies
 import live_signals
 import threading
+import concurrent.futures
 import requests
 import pandas as pd
 import config
+from signal_store import SignalStore
+from quote_snapshot import QuoteSnapshot, ProxySessions, market_open
 
 app = Flask(__name__)
 
+def load_json(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# Live signal runs, with any legacy JSON files imported on first start
+signal_store = SignalStore(config.SIGNAL_DB_PATH)
+signal_store.backfill(config.SIGNAL_STRATEGY, 'signals', load_json)
+
+# Shared pool for the quote and chain downloads made on the request path
+strike_refresh_pool = concurrent.futures.ThreadPoolExecutor(max_workers=config.STRIKE_REFRESH_MAX_WORKERS)
+_strike_refresh_pool_lock = threading.Lock()
+
+def retire_strike_refresh_pool(pool):
+    """
+    Replace a pool whose workers are stuck on refreshes past their deadline
+    The chain download cannot be interrupted, so the old pool is shut down
+    without waiting and its workers exit once their downloads return.
+    """
+    global strike_refresh_pool
+    with _strike_refresh_pool_lock:
+        if strike_refresh_pool is not pool:
+            return
+        strike_refresh_pool = concurrent.futures.ThreadPoolExecutor(max_workers=config.STRIKE_REFRESH_MAX_WORKERS)
+    pool.shutdown(wait=False)
+
+def signaled_tickers():
+    """Tickers in the latest live signal run"""
+    run = signal_store.latest(config.SIGNAL_STRATEGY)
+    if run is None:
+        return []
+    return [trade['contract'].split()[0] for trade in run['payload'].get('options_trades', [])]
+
+# Last prices of the signaled tickers, refreshed in the background through the proxies
+quote_snapshot = QuoteSnapshot(
+    signaled_tickers,
+    interval=config.QUOTE_REFRESH_INTERVAL,
+    batch_size=config.QUOTE_BATCH_SIZE,
+    session_factory=ProxySessions(live_signals.get_proxies),
+    active=market_open,
+    idle_interval=config.QUOTE_IDLE_INTERVAL
+)
+
 def get_universe_stocks():
     """Fetch stocks from universe service"""
     try:
@@ -61,6 +105,7 @@ def init_scheduler():
     if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
         # Run startup jobs in background
         run_startup_jobs()
+        quote_snapshot.start()
         
         scheduler = BackgroundScheduler(daemon=True)
         eastern = pytz.timezone('US/Eastern')
@@ -113,6 +158,71 @@ def init_scheduler():
         return scheduler
     return None
 
+def refresh_strike(ticker, expiry, current_price=None):
+    """
+    Closest put strike to 90% of the live price, or None if it cannot be refreshed
+    current_price comes from the quote snapshot; without it the price is looked up live.
+    """
+    stock = yf.Ticker(ticker)
+    if current_price is None:
+        try:
+            # Try fast_info first
+            current_price = stock.fast_info['lastPrice']
+        except Exception as e:
+            print(
+                f"Could not get real-time price for {ticker}, error: {e}, skipping strike update")
+            return None
+
+    new_strike, _, _ = find_closest_strike_simple(stock, current_price, expiry)
+    return new_strike
+
+def refresh_strikes(trades):
+    """
+    Refresh strikes for all trades concurrently within STRIKE_REFRESH_TIMEOUT
+    Trades keep their stored strike when the refresh fails or misses the
+    deadline; the latter are flagged with strike_stale. A pool left with
+    running refreshes is replaced so later requests do not queue behind them.
+    Returns:
+        tuple of (number of trades whose refresh missed the deadline, quote snapshot metadata)
+    """
+    # One calendar lookup per request instead of one per trade
+    expiry = get_next_weekly_expiry()
+
+    # Prices from one consistent quote snapshot; tickers it lacks are looked up live
+    tickers = [trade['contract'].split()[0] for trade in trades]
+    snapshot = quote_snapshot.snapshot(tickers)
+    prices = [snapshot.price(ticker, max_age=config.QUOTE_MAX_AGE) for ticker in tickers]
+    quote_snapshot.track(ticker for ticker, price in zip(tickers, prices) if price is None)
+
+    # Submit under the lock so the pool is not retired in between
+    with _strike_refresh_pool_lock:
+        pool = strike_refresh_pool
+        futures = [
+            pool.submit(refresh_strike, ticker, expiry, price)
+            for ticker, price in zip(tickers, prices)
+        ]
+    _, not_done = concurrent.futures.wait(futures, timeout=config.STRIKE_REFRESH_TIMEOUT)
+
+    stale = 0
+    for trade, future in zip(trades, futures):
+        trade['strike_stale'] = future in not_done
+        if future in not_done:
+            future.cancel()
+            stale += 1
+            print(f"Strike refresh for {trade['contract']} missed the {config.STRIKE_REFRESH_TIMEOUT}s deadline, "
+                  f"keeping stored strike {trade['strike']}")
+            continue
+        try:
+            new_strike = future.result()
+        except Exception as e:
+            print(f"Error refreshing strike for {trade['contract']}: {e}")
+            continue
+        if new_strike is not None and new_strike <= trade['strike']:
+            trade['strike'] = new_strike
+    if any(future.running() for future in not_done):
+        retire_strike_refresh_pool(pool)
+    return stale, snapshot.metadata(config.QUOTE_MAX_AGE)
+
 @app.route('/<int:strategy>/signals/<date>/<int:capital>')
 def get_signals_with_allocation(strategy, date, capital):
     try:
@@ -131,45 +241,24 @@ def get_signals_with_allocation(strategy, date, capital):
         if (strategy == 1 and weekday != 3) or (strategy == 2 and weekday != 4):  # 3 is Thursday, 4 is Friday
             return jsonify({"options_trades": []})
 
-        # Get previous day's date in YYYYMMDD format
-        prev_date = (target_date - timedelta(days=1)).strftime('%Y%m%d')
-
-        # Find files for both target date and previous day
-        pattern_today = f'signals/live_signals_{date}_*.json'
-        pattern_yesterday = f'signals/live_signals_{prev_date}_*.json'
-
-        matching_files = glob.glob(pattern_today) + \
-            glob.glob(pattern_yesterday)
-
-        if not matching_files:
-            return jsonify({"error": "No signals file found for the given date or previous day"}), 404
+        # Latest run for the target date, falling back to the previous day
+        prev_date = target_date - timedelta(days=1)
+        run = signal_store.latest(
+            config.SIGNAL_STRATEGY,
+            [target_date.strftime('%Y-%m-%d'), prev_date.strftime('%Y-%m-%d')]
+        )
 
-        # Get the latest file
-        filename = max(matching_files)
+        if run is None:
+            return jsonify({"error": "No signals found for the given date or previous day"}), 404
 
-        with open(filename, 'r') as f:
-            signals = json.load(f)
+        signals = run['payload']
 
         num_trades = len(signals['options_trades'])
         if num_trades == 0:
             return jsonify({"options_trades": []})
 
-        # Update strikes based on current prices
-        for trade in signals['options_trades']:
-            ticker = trade['contract'].split()[0]
-            stock = yf.Ticker(ticker)
-            try:
-                # Try fast_info first
-                current_price = stock.fast_info['lastPrice']
-            except Exception as e:
-                print(
-                    f"Could not get real-time price for {ticker}, error: {e}, skipping strike update")
-                continue
-
-            new_strike, expiry, put_data = find_closest_strike_simple(
-                stock, current_price)
-            if new_strike is not None and new_strike <= trade['strike']:
-                trade['strike'] = new_strike
+        # Update strikes based on current prices, all trades at once under one deadline
+        signals['stale_strikes'], signals['quote_snapshot'] = refresh_strikes(signals['options_trades'])
 
         # Calculate allocation per trade (minimum 20 positions)
         positions = max(20, num_trades)
@@ -0,0 +1,239 @@
+"""
+Vectorized historical backtest of the weekly put-writing rule.
+
+Replays the live signal rule over years of daily closes for the whole
+ticker_list.csv universe: every week, sell a put about 10% out of the money
+on each name whose volatility is high and whose 2 month return is below
+MAX_TWO_MONTH_RETURN, and hold it to the next weekly expiry. There is no
+historical option data, so puts are priced with Black-Scholes using
+trailing realized volatility (times BACKTEST_VOL_PREMIUM) as the implied
+volatility proxy. Every step is a (weeks x tickers) array operation, so
+the whole universe over many years runs in seconds.
+
+Each position is cash secured, so its weekly return is
+(premium - payoff) / strike, and the portfolio holds the selected positions
+in equal weight, in cash when nothing is selected.
+
+Usage:
+    python backtest.py --period 5y --output signals/backtest
+"""
+import argparse
+import json
+import os
+from itertools import cycle
+
+import numpy as np
+import pandas as pd
+
+import config
+from iv_solver import black_scholes_price
+from live_signals import download_closes, get_proxies
+from stage_timer import timed_run, stage
+
+TRADING_DAYS = 252
+WEEKS_PER_YEAR = 52
+
+
+def calculate_risk_metrics(returns, periods=TRADING_DAYS):
+    """
+    Same metrics as pairs portfolio_utils, for returns sampled `periods` times a year
+    """
+    annual_return = (1 + returns.mean()) ** periods - 1
+    annual_vol = returns.std() * np.sqrt(periods)
+    sharpe_ratio = annual_return / annual_vol if annual_vol != 0 else 0
+    max_drawdown = (1 + returns).cumprod().div((1 + returns).cumprod().cummax()) - 1
+    return {
+        'Annual Return': float(annual_return),
+        'Annual Volatility': float(annual_vol),
+        'Sharpe Ratio': float(sharpe_ratio),
+        'Max Drawdown': float(max_drawdown.min())
+    }
+
+
+def weekly_panel(closes, vol_window=None, return_lookback=42):
+    """
+    Sample daily closes at each week's last trading day
+    Args:
+        closes: DataFrame of daily closes, one column per ticker
+        vol_window: Trading days of log returns in the realized volatility
+        return_lookback: Trading days in the 2 month return, as in the live rule
+    Returns:
+        dict of (weeks x tickers) DataFrames: spot, vol and two_month_return,
+        all on the same weekly index
+    """
+    vol_window = vol_window or config.BACKTEST_VOL_WINDOW
+    closes = closes.sort_index()
+    log_returns = np.log(closes / closes.shift(1))
+    realized_vol = log_returns.rolling(vol_window, min_periods=vol_window).std() * np.sqrt(TRADING_DAYS)
+    two_month_return = closes / closes.shift(return_lookback) - 1
+
+    # Week-end labels on Fridays; the value is the last observation of each week
+    weekly = {
+        'spot': closes.resample('W-FRI').last(),
+        'vol': realized_vol.resample('W-FRI').last(),
+        'two_month_return': two_month_return.resample('W-FRI').last()
+    }
+    # Drop weeks without any trading (market closed all week)
+    traded = weekly['spot'].notna().any(axis=1)
+    return {name: frame[traded] for name, frame in weekly.items()}
+
+
+def simulate(panel, moneyness=None, min_iv=None, max_return=None, vol_premium=None,
+             max_positions=None, premium_haircut=None):
+    """
+    Sell one put per selected ticker each week and settle it at the next week's close
+    Args:
+        panel: dict from weekly_panel
+        moneyness: Strike as a fraction of spot, defaults to PUT_TARGET_MONEYNESS
+        min_iv: Minimum volatility proxy to sell, defaults to MIN_IV
+        max_return: Maximum 2 month return to sell, defaults to MAX_TWO_MONTH_RETURN
+        vol_premium: Implied over realized volatility ratio, defaults to BACKTEST_VOL_PREMIUM
+        max_positions: Keep only the highest-volatility names each week, None keeps all
+        premium_haircut: Fraction of premium lost to the bid/ask spread
+    Returns:
+        tuple of (weekly portfolio returns Series, dict of (weeks x tickers) arrays
+        as DataFrames: selected, iv, strike, premium, payoff and position_return)
+    """
+    moneyness = config.PUT_TARGET_MONEYNESS if moneyness is None else moneyness
+    min_iv = config.MIN_IV if min_iv is None else min_iv
+    max_return = config.MAX_TWO_MONTH_RETURN if max_return is None else max_return
+    vol_premium = config.BACKTEST_VOL_PREMIUM if vol_premium is None else vol_premium
+    premium_haircut = config.BACKTEST_PREMIUM_HAIRCUT if premium_haircut is None else premium_haircut
+
+    index, columns = panel['spot'].index, panel['spot'].columns
+    spot = panel['spot'].to_numpy(dtype=float)
+    iv = panel['vol'].to_numpy(dtype=float) * vol_premium
+    two_month_return = panel['two_month_return'].to_numpy(dtype=float)
+
+    # Each week's put expires at the next week's close
+    settle = np.vstack([spot[1:], np.full((1, spot.shape[1]), np.nan)])
+    days = np.diff(index.values).astype('timedelta64[D]').astype(float)
+    t = np.append(days, np.nan)[:, None] / 365
+
+    with np.errstate(invalid='ignore'):
+        selected = (np.isfinite(spot) & np.isfinite(settle) & (spot > 0) & np.isfinite(t)
+                    & (iv > min_iv) & (two_month_return < max_return))
+
+    if max_positions:
+        # Rank by volatility within each week, highest first, like the live ranking
+        score = np.where(selected, iv, -np.inf)
+        rank = np.argsort(np.argsort(-score, axis=1, kind='stable'), axis=1)
+        selected &= rank < max_positions
+
+    strike = spot * moneyness
+    with np.errstate(all='ignore'):
+        premium = black_scholes_price(spot, strike, t, iv, 0.0, False) * (1 - premium_haircut)
+        payoff = np.maximum(strike - settle, 0.0)
+        position_return = np.where(selected, (premium - payoff) / strike, np.nan)
+
+    # Equal weight across the week's positions, cash (zero return) when there are none
+    count = selected.sum(axis=1)
+    total = np.nansum(position_return, axis=1)
+    weekly_return = np.divide(total, count, out=np.zeros(len(index)), where=count > 0)
+
+    # The last week has no settlement yet
+    returns = pd.Series(weekly_return[:-1], index=index[:-1], name='weekly_return')
+
+    def frame(values):
+        return pd.DataFrame(values, index=index, columns=columns)
+
+    positions = {
+        'selected': frame(selected),
+        'iv': frame(iv),
+        'strike': frame(strike),
+        'premium': frame(premium),
+        'payoff': frame(payoff),
+        'position_return': frame(position_return)
+    }
+    return returns, positions
+
+
+def summarize(returns, positions):
+    """Risk metrics of the weekly returns plus trade statistics"""
+    metrics = calculate_risk_metrics(returns, periods=WEEKS_PER_YEAR)
+    selected = positions['selected'].to_numpy()
+    position_return = positions['position_return'].to_numpy()
+    trades = int(selected.sum())
+    metrics.update({
+        'Weeks': int(len(returns)),
+        'Weeks Invested': int((selected.sum(axis=1) > 0).sum()),
+        'Trades': trades,
+        'Average Positions': float(selected.sum(axis=1).mean()) if len(selected) else 0.0,
+        'Assignment Rate': float((positions['payoff'].to_numpy()[selected] > 0).mean()) if trades else 0.0,
+        'Average Trade Return': float(np.nanmean(position_return)) if trades else 0.0
+    })
+    return metrics
+
+
+def save_results(returns, positions, metrics, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    pd.DataFrame({
+        'weekly_return': returns,
+        'cum_return': (1 + returns).cumprod(),
+        'positions': positions['selected'].sum(axis=1).reindex(returns.index)
+    }).to_csv(os.path.join(output_dir, 'weekly_returns.csv'))
+
+    # One row per trade
+    trades = pd.concat(
+        {name: frame.stack() for name, frame in positions.items() if name != 'selected'}, axis=1
+    )
+    trades = trades[positions['selected'].stack().reindex(trades.index, fill_value=False)]
+    trades.index.names = ['week', 'ticker']
+    trades.to_csv(os.path.join(output_dir, 'trades.csv'))
+
+    with open(os.path.join(output_dir, 'performance_metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=4)
+
+
+def run_backtest(period, output_dir, max_positions=None, tickers=None):
+    if tickers is None:
+        with open('ticker_list.csv', 'r') as f:
+            tickers = [line.strip() for line in f if line.strip()]
+    print(f"Backtesting {len(tickers)} tickers over {period}...")
+
+    try:
+        proxies = get_proxies() or [None]
+    except Exception as e:
+        print(f"Error setting up proxies: {e}")
+        proxies = [None]
+
+    with stage('fetch'):
+        closes = download_closes(tickers, cycle(proxies), period=period)
+    if closes.empty:
+        print("No price history downloaded")
+        return None
+
+    with stage('backtest'):
+        panel = weekly_panel(closes)
+        returns, positions = simulate(panel, max_positions=max_positions)
+        metrics = summarize(returns, positions)
+
+    with stage('persist'):
+        save_results(returns, positions, metrics, output_dir)
+
+    print(f"\nWeeks: {metrics['Weeks']}, trades: {metrics['Trades']}, "
+          f"assignment rate: {metrics['Assignment Rate']:.1%}")
+    print(f"Annual Return: {metrics['Annual Return']:.2%}, "
+          f"Annual Volatility: {metrics['Annual Volatility']:.2%}, "
+          f"Sharpe Ratio: {metrics['Sharpe Ratio']:.2f}, "
+          f"Max Drawdown: {metrics['Max Drawdown']:.2%}")
+    print(f"Results saved in {output_dir}")
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest the weekly put-writing rule')
+    parser.add_argument('--period', default=config.BACKTEST_PERIOD,
+                        help='History to download, e.g. 5y')
+    parser.add_argument('--output', default=config.BACKTEST_RESULTS_DIR,
+                        help='Directory for the results')
+    parser.add_argument('--max-positions', type=int, default=None,
+                        help='Keep only the N highest-volatility names each week')
+    args = parser.parse_args()
+
+    with timed_run('option_write_backtest', config.TIMINGS_DIR):
+        run_backtest(args.period, args.output, args.max_positions)
+
+
+if __name__ == "__main__":
+    main()
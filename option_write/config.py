@@ -8,3 +8,79 @@ MAX_RETRIES = 3
 # Threading Parameters
 WEEKLIES_MAX_WORKERS = 10   # Specific to weeklies.py
 LIVE_SIGNALS_MAX_WORKERS = 10  # Specific to live_signals.py
+
+# Signals endpoint strike refresh: worker count and per-request deadline in seconds
+STRIKE_REFRESH_MAX_WORKERS = 8
+STRIKE_REFRESH_TIMEOUT = 10
+
+# Background quote snapshot: seconds between batched refreshes, oldest quote used
+# instead of a live lookup, and tickers per download request
+QUOTE_REFRESH_INTERVAL = 60
+QUOTE_MAX_AGE = 300
+QUOTE_BATCH_SIZE = 100
+
+# Seconds between quote snapshot refreshes outside regular trading hours
+QUOTE_IDLE_INTERVAL = 3600
+
+# Live signal checkpoint: screened tickers are streamed to a JSONL file so an interrupted
+# run resumes where it stopped; entries older than LIVE_SIGNALS_CHECKPOINT_MAX_AGE seconds
+# are rescreened. After LIVE_SIGNALS_DEADLINE seconds (None waits for every ticker) the
+# signals are published from the tickers screened so far and marked partial.
+LIVE_SIGNALS_CHECKPOINT_DIR = 'signals/checkpoints'
+LIVE_SIGNALS_CHECKPOINT_MAX_AGE = 3600
+LIVE_SIGNALS_DEADLINE = 45 * 60
+
+# Put strike selection for live signals: 'moneyness' (closest to PUT_TARGET_MONEYNESS
+# within PUT_MONEYNESS_BAND), 'delta' (closest to PUT_TARGET_DELTA) or 'premium_per_risk'
+# (highest mid / (strike * |delta|)); the delta rules only consider PUT_DELTA_RANGE
+STRIKE_SELECTION = 'moneyness'
+PUT_MONEYNESS_BAND = (0.88, 0.92)
+PUT_TARGET_MONEYNESS = 0.9
+PUT_TARGET_DELTA = -0.15
+PUT_DELTA_RANGE = (-0.30, -0.05)
+
+# Live signal filters: minimum put IV and maximum stock return over ~2 months
+MIN_IV = 0.6
+MAX_TWO_MONTH_RETURN = 0.2
+
+# Two-phase screening: tickers per batched history download; a ticker's chain is skipped
+# when its latest stored IV, at most IV_CACHE_MAX_AGE_DAYS old, is below
+# MIN_IV * IV_PREFILTER_MARGIN (or its IV rank below MIN_IV_RANK * IV_PREFILTER_MARGIN)
+PREFILTER_BATCH_SIZE = 100
+IV_CACHE_MAX_AGE_DAYS = 14
+IV_PREFILTER_MARGIN = 0.7
+
+# Local daily close store for the screener, updated incrementally each run
+PRICE_STORE_FILE = 'signals/prices.feather'
+PRICE_STORE_DAYS = 120
+
+# IV history: one columnar partition per run, calendar days used for IV rank, dates of
+# history a rank needs, and the minimum IV rank to trade (None disables the rank filter).
+# The legacy IV cache file is imported into an empty history once.
+IV_HISTORY_DIR = 'signals/iv_history'
+IV_HISTORY_DAYS = 365
+IV_RANK_MIN_OBSERVATIONS = 4
+MIN_IV_RANK = None
+IV_CACHE_FILE = 'signals/iv_cache.json'
+
+# Weekly options cache: days an expiration pattern is trusted (jittered +/-25%), share of
+# fresh entries re-checked each run, and how often a run checkpoints its progress
+WEEKLIES_CACHE_FILE = 'signals/weeklies_cache.json'
+WEEKLIES_TTL_DAYS = 28
+WEEKLIES_SAMPLE_FRACTION = 0.05
+WEEKLIES_CHECKPOINT_EVERY = 25
+
+# Put-writing backtest: history to replay, trading days in the realized volatility used as
+# the implied volatility proxy, proxy / realized ratio, and share of premium lost to the spread
+BACKTEST_PERIOD = '5y'
+BACKTEST_RESULTS_DIR = 'signals/backtest'
+BACKTEST_VOL_WINDOW = 21
+BACKTEST_VOL_PREMIUM = 1.0
+BACKTEST_PREMIUM_HAIRCUT = 0.0
+
+# Directory for per-stage timing reports, inside the persisted signals volume
+TIMINGS_DIR = 'signals/timings'
+
+# Append-only signal store shared by the live signal job and the API, inside the signals volume
+SIGNAL_DB_PATH = 'signals/signals.db'
+SIGNAL_STRATEGY = 'option_write'
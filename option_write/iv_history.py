@@ -0,0 +1,192 @@
+"""
+Columnar history of screener IVs.
+
+Every live signal run appends one uncompressed Feather partition with the
+selected put of each screened ticker: implied vol, premium, price, strike and
+delta. Readers keep the partitions they have already read in memory and only
+read partitions written since, so the IV rank of today's quotes is an array
+computation over stored history, never a recomputation from option chains.
+
+    history = IVHistory('signals/iv_history')
+    history.append(records)
+    ranks = history.iv_rank({'AAPL': 0.31})
+"""
+import json
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+COLUMNS = ['date', 'run_ts', 'ticker', 'iv', 'premium', 'price', 'strike', 'delta']
+
+# Partitions are named iv_YYYYMMDD_HHMMSS.feather after their run timestamp
+PARTITION_RE = re.compile(r'^iv_(\d{8})_(\d{6})\.feather$')
+
+
+class IVHistory:
+    """
+    Per-run IV partitions in one directory.
+
+    Args:
+        directory: Directory holding the partitions
+        lookback_days: Calendar days of history kept in memory and used for ranks
+    """
+
+    def __init__(self, directory, lookback_days=365):
+        self.directory = directory
+        self.lookback_days = lookback_days
+        self._lock = threading.Lock()
+        self._partitions = {}
+        self._frame = None
+
+    def append(self, records, run_ts=None):
+        """
+        Write one run's IVs as a new partition
+        Args:
+            records: DataFrame or list of dicts with ticker, iv, premium, price, strike, delta
+            run_ts: Run datetime, defaults to now
+        Returns:
+            str path of the partition, or None if there was nothing to write
+        """
+        df = pd.DataFrame(records)
+        df = df[df['iv'].notna()] if 'iv' in df else df.iloc[0:0]
+        if df.empty:
+            return None
+
+        run_ts = run_ts or datetime.now()
+        df = df.assign(date=run_ts.strftime('%Y-%m-%d'), run_ts=run_ts.strftime('%Y-%m-%dT%H:%M:%S'))
+        df = df.reindex(columns=COLUMNS)
+        for column in COLUMNS[3:]:
+            df[column] = df[column].astype('float64')
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"iv_{run_ts.strftime('%Y%m%d_%H%M%S')}.feather")
+        tmp_path = f'{path}.tmp'
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+        return path
+
+    def import_cache(self, path):
+        """
+        Import a legacy {ticker: {'iv', 'date'}} IV cache file once, one partition per date
+        Returns:
+            int number of partitions written
+        """
+        if not os.path.exists(path) or self.partition_names():
+            return 0
+        try:
+            with open(path, 'r') as f:
+                cache = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return 0
+
+        records = pd.DataFrame(
+            [{'ticker': ticker, 'iv': entry['iv'], 'date': entry['date']} for ticker, entry in cache.items()]
+        )
+        if records.empty:
+            return 0
+        count = 0
+        for date, group in records.groupby('date'):
+            if self.append(group.drop(columns='date'), run_ts=datetime.strptime(date, '%Y-%m-%d')):
+                count += 1
+        print(f"Imported {len(records)} cached IVs into {self.directory}")
+        return count
+
+    def partition_names(self):
+        """Partition file names, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if PARTITION_RE.match(name))
+
+    def load(self, today=None):
+        """
+        All stored IVs within lookback_days, reading only partitions not read before
+        Returns:
+            DataFrame with COLUMNS, oldest run first
+        """
+        today = today or datetime.now()
+        cutoff = (today - timedelta(days=self.lookback_days)).strftime('%Y%m%d')
+        names = [name for name in self.partition_names() if PARTITION_RE.match(name).group(1) >= cutoff]
+
+        with self._lock:
+            new_names = [name for name in names if name not in self._partitions]
+            if not new_names and self._frame is not None and list(self._partitions) == names:
+                return self._frame
+
+            for name in new_names:
+                try:
+                    self._partitions[name] = feather.read_feather(os.path.join(self.directory, name))
+                except Exception as e:
+                    print(f"Error reading IV partition {name}: {e}")
+            # Drop partitions that fell out of the lookback window
+            self._partitions = {name: self._partitions[name] for name in names if name in self._partitions}
+            frames = list(self._partitions.values())
+            self._frame = (pd.concat(frames, ignore_index=True) if frames
+                           else pd.DataFrame(columns=COLUMNS))
+            return self._frame
+
+    def latest(self, today=None):
+        """
+        Latest stored IV per ticker
+        Returns:
+            dict of {ticker: {'iv', 'date'}}, the shape of the legacy IV cache
+        """
+        df = self.load(today)
+        if df.empty:
+            return {}
+        last = df.drop_duplicates('ticker', keep='last')
+        return {
+            ticker: {'iv': float(iv), 'date': date}
+            for ticker, iv, date in zip(last['ticker'], last['iv'], last['date'])
+        }
+
+    def daily(self, today=None):
+        """
+        IV history as a (dates x tickers) array, the last run of each date
+        Returns:
+            DataFrame of IVs indexed by date
+        """
+        df = self.load(today)
+        if df.empty:
+            return pd.DataFrame()
+        return df.pivot_table(index='date', columns='ticker', values='iv', aggfunc='last')
+
+    def iv_rank(self, current, min_observations=None, today=None):
+        """
+        IV rank and percentile of current IVs against the stored history
+        Args:
+            current: dict or Series of {ticker: current IV}
+            min_observations: Dates of history needed for a rank, defaults to 1
+        Returns:
+            DataFrame indexed by ticker with iv, iv_rank ((iv - min) / (max - min)),
+            iv_percentile (share of past dates with a lower IV) and observations;
+            rank and percentile are NaN when the history is too short
+        """
+        current = pd.Series(current, dtype='float64')
+        min_observations = min_observations or 1
+        history = self.daily(today).reindex(columns=current.index)
+
+        values = history.to_numpy(dtype=float)
+        if values.size == 0:
+            values = np.full((0, len(current)), np.nan)
+        iv = current.to_numpy()
+        observations = np.isfinite(values).sum(axis=0)
+        with np.errstate(all='ignore'):
+            low = np.nanmin(np.where(np.isfinite(values), values, np.inf), axis=0, initial=np.inf)
+            high = np.nanmax(np.where(np.isfinite(values), values, -np.inf), axis=0, initial=-np.inf)
+            # Today's quote widens the range, so the rank stays within [0, 1]
+            low, high = np.minimum(low, iv), np.maximum(high, iv)
+            rank = np.where(high > low, (iv - low) / (high - low), 0.5)
+            percentile = (values < iv).sum(axis=0) / observations
+
+        enough = (observations >= min_observations) & np.isfinite(iv)
+        return pd.DataFrame({
+            'iv': iv,
+            'iv_rank': np.where(enough, rank, np.nan),
+            'iv_percentile': np.where(enough, percentile, np.nan),
+            'observations': observations
+        }, index=current.index)
@@ -0,0 +1,159 @@
+"""
+Vectorized Black-Scholes implied volatility.
+
+Inverts whole arrays of option prices at once: in-the-money quotes are
+first turned into the equivalent out-of-the-money option with put-call
+parity (its price is pure time value, so it is well conditioned), then a
+closed-form Corrado-Miller initial guess is refined with Halley steps kept
+inside a shrinking [low, high] bracket, falling back to bisection whenever
+a step would leave it. Quotes that cannot be inverted (non-positive inputs, price
+outside the no-arbitrage bounds, or an implied vol above SIGMA_MAX) come
+back as NaN instead of raising.
+
+    iv = implied_volatility(prices, spots, strikes, years)
+"""
+import numpy as np
+from scipy.special import ndtr
+
+SIGMA_MIN = 1e-6
+SIGMA_MAX = 10.0
+MAX_ITERATIONS = 50
+RELATIVE_TOLERANCE = 1e-12
+SQRT_2PI = np.sqrt(2 * np.pi)
+
+
+def _d1_d2(spot, strike, t, r, sigma):
+    sigma_sqrt_t = sigma * np.sqrt(t)
+    d1 = (np.log(spot / strike) + (r + 0.5 * sigma * sigma) * t) / sigma_sqrt_t
+    return d1, d1 - sigma_sqrt_t
+
+
+def black_scholes_price(spot, strike, t, sigma, r=0.0, is_call=False):
+    """Black-Scholes price for arrays of European calls (is_call True) or puts"""
+    d1, d2 = _d1_d2(spot, strike, t, r, sigma)
+    discounted_strike = strike * np.exp(-r * t)
+    call = spot * ndtr(d1) - discounted_strike * ndtr(d2)
+    put = discounted_strike * ndtr(-d2) - spot * ndtr(-d1)
+    return np.where(is_call, call, put)
+
+
+def black_scholes_vega(spot, strike, t, sigma, r=0.0):
+    """Black-Scholes vega per unit of volatility, the same for calls and puts"""
+    d1, _ = _d1_d2(spot, strike, t, r, sigma)
+    return spot * np.exp(-0.5 * d1 * d1) / SQRT_2PI * np.sqrt(t)
+
+
+def black_scholes_greeks(spot, strike, t, sigma, r=0.0, is_call=False):
+    """
+    Black-Scholes Greeks for arrays of European calls (is_call True) or puts
+    Uses the py_vollib conventions: theta per calendar day, vega per 1% of volatility.
+    Returns:
+        dict of delta, gamma, theta and vega arrays
+    """
+    d1, d2 = _d1_d2(spot, strike, t, r, sigma)
+    sqrt_t = np.sqrt(t)
+    pdf_d1 = np.exp(-0.5 * d1 * d1) / SQRT_2PI
+    discounted_strike = strike * np.exp(-r * t)
+    decay = -spot * pdf_d1 * sigma / (2 * sqrt_t)
+    call_theta = decay - r * discounted_strike * ndtr(d2)
+    put_theta = decay + r * discounted_strike * ndtr(-d2)
+    return {
+        'delta': np.where(is_call, ndtr(d1), -ndtr(-d1)),
+        'gamma': pdf_d1 / (spot * sigma * sqrt_t),
+        'theta': np.where(is_call, call_theta, put_theta) / 365,
+        'vega': spot * pdf_d1 * sqrt_t / 100
+    }
+
+
+def _initial_guess(price, spot, strike, t, r, is_call):
+    """Corrado-Miller closed-form approximation, clipped to the search bracket"""
+    discounted_strike = strike * np.exp(-r * t)
+    # Work on the call price; puts are converted with put-call parity
+    call = np.where(is_call, price, price + spot - discounted_strike)
+    half_moneyness = (spot - discounted_strike) / 2
+    radicand = (call - half_moneyness) ** 2 - (spot - discounted_strike) ** 2 / np.pi
+    sigma_sqrt_t = (SQRT_2PI / (spot + discounted_strike)
+                    * (call - half_moneyness + np.sqrt(np.maximum(radicand, 0.0))))
+    guess = sigma_sqrt_t / np.sqrt(t)
+    guess = np.where(np.isfinite(guess) & (guess > 0), guess, 0.5)
+    return np.clip(guess, 10 * SIGMA_MIN, SIGMA_MAX / 2)
+
+
+def implied_volatility(price, spot, strike, t, r=0.0, flag='p'):
+    """
+    Implied volatility for arrays of European options
+    Args:
+        price: Option prices
+        spot: Underlying prices
+        strike: Strike prices
+        t: Years to expiry
+        r: Continuously compounded risk-free rate
+        flag: 'p' for puts, 'c' for calls, or an array of flags
+    Returns:
+        np.ndarray of implied volatilities, NaN where the quote cannot be inverted;
+        a float if every input is a scalar
+    """
+    price, spot, strike, t, r = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (price, spot, strike, t, r)))
+    is_call = np.broadcast_to(np.asarray(flag) == 'c', price.shape)
+    shape = price.shape
+    price, spot, strike, t, r = (np.atleast_1d(x).ravel() for x in (price, spot, strike, t, r))
+    is_call = np.atleast_1d(is_call).ravel()
+
+    iv = np.full(price.shape, np.nan)
+    with np.errstate(all='ignore'):
+        discounted_strike = strike * np.exp(-r * t)
+        lower = np.where(is_call, np.maximum(spot - discounted_strike, 0.0),
+                         np.maximum(discounted_strike - spot, 0.0))
+        upper = np.where(is_call, spot, discounted_strike)
+        valid = (np.isfinite(price) & np.isfinite(spot) & np.isfinite(strike) & np.isfinite(t)
+                 & (price > 0) & (spot > 0) & (strike > 0) & (t > 0)
+                 & (price > lower) & (price < upper))
+
+        # Solve on the out-of-the-money side: same implied vol, price is time value only
+        otm_price = price - lower
+        otm_is_call = discounted_strike > spot
+
+        # Quotes above the price at SIGMA_MAX have no solution in the bracket
+        idx = np.flatnonzero(valid)
+        max_price = black_scholes_price(spot[idx], strike[idx], t[idx], SIGMA_MAX, r[idx], otm_is_call[idx])
+        idx = idx[otm_price[idx] < max_price]
+
+        p, s, k, tt, rr, c = otm_price[idx], spot[idx], strike[idx], t[idx], r[idx], otm_is_call[idx]
+        sigma = _initial_guess(p, s, k, tt, rr, c)
+        low = np.full(sigma.shape, SIGMA_MIN)
+        high = np.full(sigma.shape, SIGMA_MAX)
+        active = np.arange(len(idx))
+
+        for _ in range(MAX_ITERATIONS):
+            if len(active) == 0:
+                break
+            sig = sigma[active]
+            s_a, k_a, t_a, r_a = s[active], k[active], tt[active], rr[active]
+            d1, d2 = _d1_d2(s_a, k_a, t_a, r_a, sig)
+            diff = black_scholes_price(s_a, k_a, t_a, sig, r_a, c[active]) - p[active]
+
+            # Price is increasing in sigma, so the sign of diff shrinks the bracket
+            high[active] = np.where(diff > 0, sig, high[active])
+            low[active] = np.where(diff < 0, sig, low[active])
+
+            converged = np.abs(diff) <= RELATIVE_TOLERANCE * p[active]
+
+            # Halley step: vega and volga = vega * d1 * d2 / sigma
+            vega = s_a * np.exp(-0.5 * d1 * d1) / SQRT_2PI * np.sqrt(t_a)
+            volga = vega * d1 * d2 / sig
+            step = 2 * diff * vega / (2 * vega * vega - diff * volga)
+            candidate = sig - step
+
+            # Bisect when the step is unusable or leaves the bracket
+            lo_a, hi_a = low[active], high[active]
+            bad = ~np.isfinite(candidate) | (candidate <= lo_a) | (candidate >= hi_a)
+            candidate = np.where(bad, 0.5 * (lo_a + hi_a), candidate)
+
+            sigma[active] = np.where(converged, sig, candidate)
+            converged |= np.abs(candidate - sig) <= 1e-12 * np.maximum(sig, 1.0)
+            active = active[~converged]
+
+        iv[idx] = sigma
+
+    return float(iv[0]) if shape == () else iv.reshape(shape)
@@ -1,9 +1,11 @@
 import yfinance as yf
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import pandas_market_calendars as mcal
-from py_vollib.black_scholes import implied_volatility
+from iv_solver import implied_volatility, black_scholes_greeks
 import concurrent.futures
+import threading
 import time
 import json
 import os
@@ -12,59 +14,46 @@ from itertools import cycle
 import config
 import random
 import pytz
+from stage_timer import timed_run, stage, record_retry, bind
+from signal_store import SignalStore
+from iv_history import IVHistory
+from price_store import PriceStore
 
 
 def get_next_weekly_expiry():
-    nyse = mcal.get_calendar('NYSE')
-    today = datetime.today()
-    next_week = today + timedelta(days=7)
-    end_of_next_week = next_week + timedelta(days=(4 - next_week.weekday()))
-    schedule = nyse.schedule(start_date=today, end_date=end_of_next_week)
+    with stage('calendar'):
+        nyse = mcal.get_calendar('NYSE')
+        today = datetime.today()
+        next_week = today + timedelta(days=7)
+        end_of_next_week = next_week + timedelta(days=(4 - next_week.weekday()))
+        schedule = nyse.schedule(start_date=today, end_date=end_of_next_week)
     return schedule.index[-1].strftime('%Y-%m-%d') if not schedule.empty else None
 
 
-def find_closest_strike(stock, current_price):
-    """Find the closest valid put strike to 90% of current price."""
-    expiry = get_next_weekly_expiry()
-    if not expiry:
-        return None, None, None
-
+def fetch_put_chain(stock, expiry):
+    """Fetch the puts for an expiry, keeping only quotes with a usable bid/ask."""
     try:
-        options = stock.option_chain(expiry)
+        with stage('fetch'):
+            options = stock.option_chain(expiry)
         if options is None or not hasattr(options, 'puts') or options.puts.empty:
-            return None, None, None
-
-        # Find closest put strike within 88-92% range
-        lower_bound = current_price * 0.88
-        upper_bound = current_price * 0.92
-        target_strike = current_price * 0.9
-
-        valid_puts = options.puts[
-            (options.puts['strike'] >= lower_bound) &
-            (options.puts['strike'] <= upper_bound)
-        ]
+            return None
 
-        if valid_puts.empty:
-            return None, None, None
+        puts = options.puts
 
         # Filter out invalid bid/ask prices
-        valid_puts = valid_puts[
-            (valid_puts['bid'] > 0.01) &
-            (valid_puts['ask'] > 0.01) &
-            (~pd.isna(valid_puts['bid'])) &
-            (~pd.isna(valid_puts['ask'])) &
-            (valid_puts['ask'] > valid_puts['bid']) &
-            ((valid_puts['ask'] - valid_puts['bid']) / valid_puts['bid'] <= 1)
+        valid_puts = puts[
+            (puts['bid'] > 0.01) &
+            (puts['ask'] > 0.01) &
+            (~pd.isna(puts['bid'])) &
+            (~pd.isna(puts['ask'])) &
+            (puts['ask'] > puts['bid']) &
+            ((puts['ask'] - puts['bid']) / puts['bid'] <= 1)
         ]
 
         if valid_puts.empty:
-            return None, None, None
-
-        # Find the closest strike to target_strike
-        valid_puts['distance'] = abs(valid_puts['strike'] - target_strike)
-        closest_put = valid_puts.loc[valid_puts['distance'].idxmin()]
+            return None
 
-        return closest_put['strike'], expiry, closest_put
+        return valid_puts[['strike', 'bid', 'ask']]
 
     except (requests.RequestException, requests.exceptions.ProxyError,
             requests.exceptions.ConnectTimeout, ConnectionError):
@@ -72,12 +61,97 @@ def find_closest_strike(stock, current_price):
         raise
     except Exception as e:
         # Return None for all other errors (data-related)
-        print(f"Error finding closest strike: {str(e)}")
-        return None, None, None
+        print(f"Error fetching put chain: {str(e)}")
+        return None
+
+
+def build_put_surface(chains):
+    """
+    Price every put of every screened ticker as one array computation
+    Args:
+        chains: list of dicts from get_stock_and_option_data
+    Returns:
+        DataFrame with one row per put: ticker, spot, two_month_return, expiry,
+        strike, bid, ask, mid, iv, delta, gamma, theta, vega, premium_per_risk
+    """
+    if not chains:
+        return pd.DataFrame()
+
+    surface = pd.concat([
+        chain['puts'].assign(
+            ticker=chain['ticker'],
+            spot=chain['current_price'],
+            two_month_return=chain['two_month_return'],
+            expiry=chain['expiry'],
+            days_to_expiry=chain['days_to_expiry']
+        )
+        for chain in chains
+    ], ignore_index=True)
+
+    spot = surface['spot'].to_numpy(dtype=float)
+    strike = surface['strike'].to_numpy(dtype=float)
+    t = surface['days_to_expiry'].to_numpy(dtype=float) / 365
+    mid = (surface['bid'].to_numpy(dtype=float) + surface['ask'].to_numpy(dtype=float)) / 2
+
+    iv = implied_volatility(mid, spot, strike, t, 0.0, 'p')
+    with np.errstate(all='ignore'):
+        greeks = black_scholes_greeks(spot, strike, t, iv, 0.0, False)
+        # Premium per dollar of delta-weighted assignment notional
+        premium_per_risk = mid / (strike * np.abs(greeks['delta']))
+
+    surface['mid'] = mid
+    surface['iv'] = iv
+    for name, values in greeks.items():
+        surface[name] = values
+    surface['premium_per_risk'] = premium_per_risk
+    return surface
+
+
+def select_strikes(surface, rule=None):
+    """
+    Pick one put per ticker from the surface
+    Args:
+        surface: DataFrame from build_put_surface
+        rule: 'moneyness' (closest to PUT_TARGET_MONEYNESS within PUT_MONEYNESS_BAND),
+              'delta' (closest to PUT_TARGET_DELTA) or 'premium_per_risk' (highest
+              premium per risk); the last two only consider puts within PUT_DELTA_RANGE.
+              Defaults to config.STRIKE_SELECTION
+    Returns:
+        DataFrame with the selected put for each ticker that has one, in ticker order
+    """
+    rule = rule or config.STRIKE_SELECTION
+    if surface.empty:
+        return surface
+
+    spot = surface['spot'].to_numpy()
+    strike = surface['strike'].to_numpy()
+    delta = surface['delta'].to_numpy()
+
+    if rule == 'moneyness':
+        lower, upper = config.PUT_MONEYNESS_BAND
+        eligible = (strike >= spot * lower) & (strike <= spot * upper)
+        score = np.abs(strike - spot * config.PUT_TARGET_MONEYNESS)
+    elif rule in ('delta', 'premium_per_risk'):
+        min_delta, max_delta = config.PUT_DELTA_RANGE
+        eligible = np.isfinite(delta) & (delta >= min_delta) & (delta <= max_delta)
+        if rule == 'delta':
+            score = np.abs(delta - config.PUT_TARGET_DELTA)
+        else:
+            score = -surface['premium_per_risk'].to_numpy()
+    else:
+        raise ValueError(f"Unknown strike selection rule: {rule}")
 
-def find_closest_strike_simple(stock, current_price):
+    # Best score per ticker: stable sort by (ticker, score), then first row of each ticker
+    rows = np.flatnonzero(eligible)
+    codes, _ = pd.factorize(surface['ticker'].to_numpy()[rows], sort=True)
+    order = np.lexsort((score[rows], codes))
+    _, first = np.unique(codes[order], return_index=True)
+    return surface.iloc[rows[order[first]]].reset_index(drop=True)
+
+
+def find_closest_strike_simple(stock, current_price, expiry=None):
     """Find the closest valid put strike to 90% of current price, without bid/ask validation."""
-    expiry = get_next_weekly_expiry()
+    expiry = expiry or get_next_weekly_expiry()
     if not expiry:
         return None, None, None
 
@@ -122,8 +196,152 @@ def get_proxies():
         return None
 
 
+def download_closes(tickers, proxy_pool, period='3mo'):
+    """
+    Download closes over `period` for many tickers in batches of PREFILTER_BATCH_SIZE
+    Returns:
+        DataFrame of closes with one column per ticker that returned data
+    """
+    frames = []
+    for start in range(0, len(tickers), config.PREFILTER_BATCH_SIZE):
+        batch = tickers[start:start + config.PREFILTER_BATCH_SIZE]
+        for attempt in range(config.MAX_RETRIES):
+            try:
+                proxy = next(proxy_pool)
+                session = requests.Session()
+                if proxy:
+                    session.proxies = {'http': proxy, 'https': proxy}
+
+                with stage('fetch'):
+                    data = yf.download(batch, period=period, auto_adjust=True,
+                                       progress=False, threads=True, session=session)
+                if data is None or data.empty:
+                    raise ValueError("no data returned")
+
+                closes = data['Close']
+                if isinstance(closes, pd.Series):
+                    closes = closes.to_frame(batch[0])
+                frames.append(closes)
+                break
+
+            except Exception as e:
+                if attempt < config.MAX_RETRIES - 1:
+                    print(f"History batch {start // config.PREFILTER_BATCH_SIZE + 1} - "
+                          f"Error on attempt {attempt + 1}: {str(e)}, retrying...")
+                    record_retry('fetch')
+                    time.sleep(random.uniform(1, 3))
+                    continue
+                print(f"History batch {start // config.PREFILTER_BATCH_SIZE + 1} - "
+                      f"Error after {config.MAX_RETRIES} attempts: {str(e)}")
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1)
+
+
+def compute_price_stats(closes, lookback=42):
+    """
+    Latest close and return over the last `lookback` trading days for every column at once
+    Matches the per-ticker close.iloc[-1] / close.iloc[-min(lookback, len(close))] - 1 on
+    each column's own non-missing closes. Columns without a close on the latest date are left out.
+    Returns:
+        dict of {ticker: (current_price, two_month_return)}
+    """
+    if closes.empty:
+        return {}
+
+    valid = closes.notna()
+    counts = valid.sum()
+    current = closes.ffill().iloc[-1]
+    # 1-based position among each column's valid closes of the lookback base
+    base_position = counts - np.minimum(lookback, counts) + 1
+    base = closes.where(valid & (valid.cumsum() == base_position)).max()
+    two_month_return = current / base - 1
+
+    usable = valid.iloc[-1] & (current > 0)
+    return {
+        ticker: (float(current[ticker]), float(two_month_return[ticker]))
+        for ticker in closes.columns[usable.to_numpy()]
+    }
+
+
+# IVs of every run, kept in memory between runs of the scheduled job
+iv_history = IVHistory(config.IV_HISTORY_DIR, lookback_days=config.IV_HISTORY_DAYS)
+
+# Daily closes of the universe, updated incrementally each run
+price_store = PriceStore(config.PRICE_STORE_FILE, history_days=config.PRICE_STORE_DAYS)
+
+
+def stored_iv_ranks(iv_cache):
+    """IV rank of each ticker's latest stored IV against its own history"""
+    return iv_history.iv_rank(
+        {ticker: cached['iv'] for ticker, cached in iv_cache.items()},
+        min_observations=config.IV_RANK_MIN_OBSERVATIONS
+    )
+
+
+def select_candidates(tickers, price_stats, iv_cache, iv_ranks=None, today=None):
+    """
+    First phase filter: drop tickers that cannot pass the live signal filters
+    A ticker is dropped when it has no current price, its 2 month return already fails
+    MAX_TWO_MONTH_RETURN, or when
+    its latest stored IV, at most IV_CACHE_MAX_AGE_DAYS old, is below MIN_IV * IV_PREFILTER_MARGIN
+    or, with MIN_IV_RANK set, its IV rank is below MIN_IV_RANK * IV_PREFILTER_MARGIN.
+    Tickers without stored IV are kept.
+    Args:
+        iv_cache: dict of {ticker: {'iv', 'date'}} from IVHistory.latest
+        iv_ranks: DataFrame from IVHistory.iv_rank of the stored IVs
+    Returns:
+        list of candidate tickers, in input order
+    """
+    today = today or datetime.now().date()
+    iv_floor = config.MIN_IV * config.IV_PREFILTER_MARGIN
+    rank_floor = (config.MIN_IV_RANK * config.IV_PREFILTER_MARGIN
+                  if config.MIN_IV_RANK is not None else None)
+    ranks = iv_ranks['iv_rank'].to_dict() if iv_ranks is not None else {}
+    candidates = []
+    skipped_price = skipped_return = skipped_iv = 0
+    for ticker in tickers:
+        stats = price_stats.get(ticker)
+        if stats is None:
+            skipped_price += 1
+            continue
+        if stats[1] >= config.MAX_TWO_MONTH_RETURN:
+            skipped_return += 1
+            continue
+
+        cached = iv_cache.get(ticker)
+        if cached is not None:
+            age = (today - datetime.strptime(cached['date'], '%Y-%m-%d').date()).days
+            rank = ranks.get(ticker, np.nan)
+            if age <= config.IV_CACHE_MAX_AGE_DAYS and (
+                    cached['iv'] < iv_floor or (rank_floor is not None and rank < rank_floor)):
+                skipped_iv += 1
+                continue
+
+        candidates.append(ticker)
+
+    print(f"Prefilter kept {len(candidates)} of {len(tickers)} tickers "
+          f"({skipped_price} without a current price, {skipped_return} on 2M return, "
+          f"{skipped_iv} on stored IV below {iv_floor:.0%}"
+          f"{f' or IV rank below {rank_floor:.0%}' if rank_floor is not None else ''})")
+    return candidates
+
+
 def get_stock_and_option_data(args):
-    ticker, proxy_pool = args
+    """
+    Fetch the valid put quotes for one ticker, with retries
+    Price and 2 month return come from the batched price history, so this only fetches the chain.
+    Returns:
+        dict chain, or None if the ticker has no usable puts; the last error is
+        raised when every attempt failed, so the ticker is not taken as screened
+    """
+    ticker, proxy_pool, expiry, price_stats = args
+    current_price, two_month_return = price_stats
+
+    days_to_expiry = (datetime.strptime(expiry, '%Y-%m-%d') - datetime.now()).days
+    if days_to_expiry <= 0:
+        return None
 
     # Add retry logic
     for attempt in range(config.MAX_RETRIES):
@@ -137,91 +355,150 @@ def get_stock_and_option_data(args):
                 session.proxies = {'http': proxy, 'https': proxy}
 
             stock = yf.Ticker(ticker, session=session)
-            hist_data = stock.history(period='3mo')
-
-            if hist_data.empty:
-                if attempt < config.MAX_RETRIES - 1:  # If not the last attempt
-                    print(
-                        f"{ticker} - No data on attempt {attempt + 1}, retrying...")
-                    # Random delay between retries
-                    time.sleep(random.uniform(1, 3))
-                    continue
-                else:
-                    print(
-                        f"{ticker} - No historical data available after {config.MAX_RETRIES} attempts")
-                    return None
-
-            current_price = hist_data['Close'].iloc[-1]
-            if pd.isna(current_price) or current_price <= 0:
-                if attempt < config.MAX_RETRIES - 1:
-                    print(
-                        f"{ticker} - Invalid price on attempt {attempt + 1}, retrying...")
-                    time.sleep(random.uniform(1, 3))
-                    continue
-                else:
-                    print(
-                        f"{ticker} - Invalid price data after {config.MAX_RETRIES} attempts")
-                    return None
-
-            two_month_return = (
-                current_price / hist_data['Close'].iloc[-min(42, len(hist_data))] - 1)
-            strike, expiry, put_data = find_closest_strike(
-                stock, current_price)
-
-            if strike is None:
-                return None
-
-            # Calculate option mid price
-            option_price = (put_data['bid'] + put_data['ask']) / 2
-
-            # Calculate IV
-            days_to_expiry = (datetime.strptime(
-                expiry, '%Y-%m-%d') - datetime.now()).days
-            if days_to_expiry <= 0:
-                return None
-
-            iv = implied_volatility.implied_volatility(
-                option_price,
-                current_price,
-                strike,
-                days_to_expiry / 365,
-                0.0,  # risk-free rate
-                'p'   # put option flag
-            )
-
-            if iv < 0.1 or iv > 5.0:
-                print(f"{ticker} - IV outside valid range: {iv:.1%}")
+            puts = fetch_put_chain(stock, expiry)
+            if puts is None:
                 return None
 
-            print(f"{ticker} - Stock: ${current_price:.2f}, Put Strike: ${strike}, "
-                  f"Bid: ${put_data['bid']:.2f}, Ask: ${put_data['ask']:.2f}, Mid: ${option_price:.2f}, "
-                  f"IV: {iv:.1%}, 2M Return: {two_month_return:.1%}")
-
             return {
                 'ticker': ticker,
                 'current_price': current_price,
                 'two_month_return': two_month_return,
-                'strike': strike,
-                'premium': option_price / current_price,
-                'iv': iv,
-                'expiry': expiry
+                'expiry': expiry,
+                'days_to_expiry': days_to_expiry,
+                'puts': puts
             }
 
         except Exception as e:
             if attempt < config.MAX_RETRIES - 1:
                 print(
                     f"{ticker} - Error on attempt {attempt + 1}: {str(e)}, retrying...")
+                record_retry('fetch')
                 time.sleep(random.uniform(1, 3))
                 continue
             else:
                 print(
                     f"{ticker} - Error after {config.MAX_RETRIES} attempts: {str(e)}")
-                return None
+                raise
 
     return None
 
 
-def generate_live_signals():
+class ChainCheckpoint:
+    """
+    Append-only JSONL record of the tickers a run has finished screening.
+
+    Workers record each ticker as soon as it completes, so a run that dies or
+    hits its deadline loses nothing it already fetched, and a rerun only screens
+    the remaining tickers. Entries older than max_age seconds are dropped when
+    the file is opened, so a later scheduled run starts from fresh quotes.
+    """
+
+    def __init__(self, path, max_age):
+        self.path = path
+        self._lock = threading.Lock()
+        self._chains = {}
+
+        now = time.time()
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Partially written last line of a killed run
+                    if now - entry['fetched_at'] <= max_age:
+                        self._chains[entry['ticker']] = entry
+        except FileNotFoundError:
+            pass
+
+        # Rewrite without the stale entries
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            for entry in self._chains.values():
+                f.write(json.dumps(entry) + '\n')
+        os.replace(tmp_path, path)
+
+    def __contains__(self, ticker):
+        with self._lock:
+            return ticker in self._chains
+
+    def __len__(self):
+        with self._lock:
+            return len(self._chains)
+
+    def record(self, ticker, chain):
+        """Append a finished ticker; chain is None when it had no usable puts"""
+        entry = {'ticker': ticker, 'fetched_at': time.time(), 'chain': None}
+        if chain is not None:
+            entry['chain'] = {
+                'ticker': chain['ticker'],
+                'current_price': float(chain['current_price']),
+                'two_month_return': float(chain['two_month_return']),
+                'expiry': chain['expiry'],
+                'days_to_expiry': int(chain['days_to_expiry']),
+                'puts': chain['puts'].to_dict('list')
+            }
+        with self._lock:
+            self._chains[ticker] = entry
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+
+    def chains(self, tickers):
+        """Recorded chains for the given tickers, in ticker order"""
+        with self._lock:
+            entries = [self._chains.get(ticker) for ticker in tickers]
+        return [
+            dict(entry['chain'], puts=pd.DataFrame(entry['chain']['puts']))
+            for entry in entries if entry is not None and entry['chain'] is not None
+        ]
+
+
+def fetch_chains(tickers, proxy_pool, expiry, price_stats, checkpoint, deadline_at=None):
+    """
+    Screen tickers concurrently, recording each one in the checkpoint as it completes
+    Args:
+        deadline_at: time.monotonic() value to stop waiting at, None waits for all
+    Returns:
+        int number of tickers still unscreened at the deadline
+    """
+    if not tickers:
+        return 0
+
+    def screen(args):
+        # Record from the worker thread, so tickers finishing after the deadline are kept too,
+        # and a finished future is always already in the checkpoint
+        try:
+            checkpoint.record(args[0], get_stock_and_option_data(args))
+        except Exception as e:
+            # Not recorded, so a rerun fetches it again
+            print(f"{args[0]} - Error screening, left for a rerun: {str(e)}")
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=config.LIVE_SIGNALS_MAX_WORKERS)
+    screen = bind(screen)
+    futures = [executor.submit(screen, (ticker, proxy_pool, expiry, price_stats[ticker])) for ticker in tickers]
+
+    timeout = None if deadline_at is None else max(0.0, deadline_at - time.monotonic())
+    done, not_done = concurrent.futures.wait(futures, timeout=timeout)
+    # Queued tickers are dropped, running ones finish in the background
+    executor.shutdown(wait=False, cancel_futures=True)
+    return len(not_done)
+
+
+def generate_live_signals(deadline=None):
+    """
+    Screen the universe and build the put-writing signals
+    Args:
+        deadline: Seconds after which the signals are built from the tickers screened so far,
+                  defaults to config.LIVE_SIGNALS_DEADLINE; None waits for every ticker
+    Returns:
+        dict with options_trades, plus partial, screened and candidates when the
+        deadline cut the screening short
+    """
+    deadline = config.LIVE_SIGNALS_DEADLINE if deadline is None else deadline
+    deadline_at = time.monotonic() + deadline if deadline else None
+
     try:
         with open('ticker_list.csv', 'r') as f:
             TICKERS = [line.strip() for line in f if line.strip()]
@@ -229,12 +506,18 @@ def generate_live_signals():
         print(f"Error reading ticker list: {str(e)}")
         return {"options_trades": []}
 
+    expiry = get_next_weekly_expiry()
+    if not expiry:
+        print("No upcoming weekly expiry found")
+        return {"options_trades": []}
+
     print(
-        f"\nProcessing {len(TICKERS)} tickers for {get_next_weekly_expiry()} expiry...")
+        f"\nProcessing {len(TICKERS)} tickers for {expiry} expiry...")
 
     # Get and set up proxy pool
     try:
-        proxies = get_proxies()
+        with stage('fetch'):
+            proxies = get_proxies()
         if not proxies:
             print("No proxies available, continuing without proxies")
             proxies = [None]
@@ -243,24 +526,97 @@ def generate_live_signals():
         proxies = [None]
 
     proxy_pool = cycle(proxies)
-    ticker_proxy_pairs = [(ticker, proxy_pool) for ticker in TICKERS]
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=config.LIVE_SIGNALS_MAX_WORKERS) as executor:
-        results = list(executor.map(
-            get_stock_and_option_data, ticker_proxy_pairs))
-
-    valid_results = [r for r in results if r is not None]
+    # Phase 1: stored and batched price history plus stored IVs, so chains are only fetched for candidates
+    with stage('prefilter'):
+        closes = price_store.update(
+            TICKERS, lambda tickers, period: download_closes(tickers, proxy_pool, period))
+        price_stats = compute_price_stats(closes)
+        iv_history.import_cache(config.IV_CACHE_FILE)
+        iv_cache = iv_history.latest()
+        candidates = select_candidates(TICKERS, price_stats, iv_cache, stored_iv_ranks(iv_cache))
+
+    # Phase 2: option chains for the candidates not already screened by an interrupted run
+    checkpoint = ChainCheckpoint(
+        os.path.join(config.LIVE_SIGNALS_CHECKPOINT_DIR, f'chains_{expiry}.jsonl'),
+        config.LIVE_SIGNALS_CHECKPOINT_MAX_AGE
+    )
+    remaining = [ticker for ticker in candidates if ticker not in checkpoint]
+    if len(remaining) < len(candidates):
+        print(f"Resuming from checkpoint: {len(candidates) - len(remaining)} tickers already screened")
+
+    unscreened = fetch_chains(remaining, proxy_pool, expiry, price_stats, checkpoint, deadline_at)
+    if unscreened:
+        print(f"Deadline reached with {unscreened} of {len(candidates)} tickers unscreened, "
+              f"building partial signals")
+
+    chains = checkpoint.chains(candidates)
+
+    # IV and Greeks for every put of every ticker in one pass, then one put per ticker
+    with stage('iv_solve'):
+        surface = build_put_surface(chains)
+    with stage('strike_selection'):
+        selected = select_strikes(surface)
+
+    # Rank today's IVs against history before this run is added to it
+    with stage('iv_rank'):
+        ranks = iv_history.iv_rank(
+            pd.Series(selected['iv'].to_numpy(), index=selected['ticker']) if not selected.empty else {},
+            min_observations=config.IV_RANK_MIN_OBSERVATIONS
+        )
+
+    # Remember each ticker's IV, premium and price for later ranks and prefilters
+    with stage('persist'):
+        if not selected.empty:
+            iv_history.append(pd.DataFrame({
+                'ticker': selected['ticker'],
+                'iv': selected['iv'],
+                'premium': selected['mid'] / selected['spot'],
+                'price': selected['spot'],
+                'strike': selected['strike'],
+                'delta': selected['delta']
+            }))
+
+    valid_results = []
+    for put in selected.itertuples(index=False):
+        if np.isnan(put.iv):
+            print(f"{put.ticker} - Could not solve IV from mid ${put.mid:.2f}")
+            continue
+        if put.iv < 0.1 or put.iv > 5.0:
+            print(f"{put.ticker} - IV outside valid range: {put.iv:.1%}")
+            continue
+
+        iv_rank = ranks.at[put.ticker, 'iv_rank']
+        iv_percentile = ranks.at[put.ticker, 'iv_percentile']
+        print(f"{put.ticker} - Stock: ${put.spot:.2f}, Put Strike: ${put.strike}, "
+              f"Bid: ${put.bid:.2f}, Ask: ${put.ask:.2f}, Mid: ${put.mid:.2f}, "
+              f"IV: {put.iv:.1%}, IV Rank: {iv_rank:.0%}, Delta: {put.delta:.2f}, "
+              f"2M Return: {put.two_month_return:.1%}")
+
+        valid_results.append({
+            'ticker': put.ticker,
+            'current_price': put.spot,
+            'two_month_return': put.two_month_return,
+            'strike': put.strike,
+            'premium': put.mid / put.spot,
+            'iv': put.iv,
+            'iv_rank': None if np.isnan(iv_rank) else float(iv_rank),
+            'iv_percentile': None if np.isnan(iv_percentile) else float(iv_percentile),
+            'delta': put.delta,
+            'expiry': put.expiry
+        })
     print(f"\nFound {len(valid_results)} tickers with valid puts")
 
-    filtered_results = [
-        r for r in valid_results
-        if r['iv'] > 0.6 and r['two_month_return'] < 0.2
-    ]
+    with stage('ranking'):
+        filtered_results = [
+            r for r in valid_results
+            if r['iv'] > config.MIN_IV and r['two_month_return'] < config.MAX_TWO_MONTH_RETURN
+            and (config.MIN_IV_RANK is None or r['iv_rank'] is None or r['iv_rank'] >= config.MIN_IV_RANK)
+        ]
+        filtered_results.sort(key=lambda x: x['iv'], reverse=True)
     print(
         f"Found {len(filtered_results)} tickers meeting IV and return criteria")
 
-    filtered_results.sort(key=lambda x: x['iv'], reverse=True)
-
     options_trades = []
     for result in filtered_results:
         options_trades.append({
@@ -269,27 +625,36 @@ def generate_live_signals():
             "expiry": result['expiry'],
             "strike": result['strike'],
             "premium": result['premium'],
-            "iv": round(result['iv'], 3)
+            "iv": round(result['iv'], 3),
+            "iv_rank": round(result['iv_rank'], 3) if result['iv_rank'] is not None else None,
+            "iv_percentile": round(result['iv_percentile'], 3) if result['iv_percentile'] is not None else None,
+            "delta": round(result['delta'], 3)
+        })
+
+    signals = {"options_trades": options_trades}
+    if unscreened:
+        signals.update({
+            "partial": True,
+            "screened": len(candidates) - unscreened,
+            "candidates": len(candidates)
         })
+    return signals
 
-    return {"options_trades": options_trades}
 
+def main(deadline=None):
+    with timed_run('option_write_live_signals', config.TIMINGS_DIR):
+        write_live_signals(deadline)
 
-def main():
-    signals = generate_live_signals()
 
-    # Create signals directory if it doesn't exist
-    if not os.path.exists('signals'):
-        os.makedirs('signals')
+def write_live_signals(deadline=None):
+    signals = generate_live_signals(deadline)
 
-    # Generate filename with US Eastern timestamp
+    # Append to the signal store under the US Eastern trading date
     eastern = pytz.timezone('US/Eastern')
-    timestamp = datetime.now(eastern).strftime('%Y%m%d_%H%M%S')
-    filename = f'signals/live_signals_{timestamp}.json'
+    trading_date = datetime.now(eastern).strftime('%Y-%m-%d')
 
-    # Save signals to JSON file
-    with open(filename, 'w') as f:
-        json.dump(signals, f, indent=2)
+    with stage('persist'):
+        SignalStore(config.SIGNAL_DB_PATH).append(config.SIGNAL_STRATEGY, trading_date, signals)
 
 
 if __name__ == "__main__":
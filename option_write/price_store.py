@@ -0,0 +1,160 @@
+"""
+Local store of daily closes for the screener universe.
+
+Closes are kept as one wide (dates x tickers) uncompressed Feather file.
+Each run only downloads the days since the stored history ends, plus a few
+days of overlap so today's bar and any late corrections are refreshed, and
+the full window for tickers the store has not seen yet. The screener then
+reads price and return arrays for the whole universe without a history
+round trip per ticker.
+
+Closes are split and dividend adjusted, so a split or dividend rebases a
+ticker's whole history. A ticker whose overlapping bars come back different
+gets its full window reloaded instead of new bars appended to the old basis.
+
+    store = PriceStore('signals/prices.feather')
+    closes = store.update(tickers, download)
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+DATE_COLUMN = 'date'
+
+# yfinance periods, shortest first, with the calendar days each one covers
+PERIODS = [('5d', 5), ('1mo', 30), ('3mo', 91), ('6mo', 182), ('1y', 365), ('2y', 730), ('5y', 1826)]
+
+# Trading days re-downloaded before the last stored date
+OVERLAP_DAYS = 3
+
+# Relative change of a stored close that means the adjusted history was rebased
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+def period_for(days):
+    """Shortest yfinance period covering the given number of calendar days"""
+    for period, period_days in PERIODS:
+        if days <= period_days:
+            return period
+    return 'max'
+
+
+def normalize_index(frame):
+    """Downloaded closes indexed by naive dates"""
+    frame = frame.copy()
+    frame.index = pd.to_datetime(frame.index).tz_localize(None).normalize()
+    return frame
+
+
+def rebased_tickers(stored, recent, tolerance=ADJUSTMENT_TOLERANCE):
+    """
+    Tickers whose re-downloaded closes differ from the stored ones on overlapping dates
+    The last stored date is not compared, since it may have been stored intraday.
+    Returns:
+        list of tickers whose stored history is on a different adjustment basis
+    """
+    if stored.empty or recent.empty:
+        return []
+    dates = recent.index[recent.index.isin(stored.index) & (recent.index < stored.index.max())].unique()
+    columns = recent.columns.intersection(stored.columns)
+    if dates.empty or columns.empty:
+        return []
+    old = stored.loc[dates, columns].to_numpy(dtype=float)
+    new = recent.loc[~recent.index.duplicated(keep='last')].loc[dates, columns].to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        changed = np.abs(new - old) > tolerance * np.abs(old)
+    return list(columns[changed.any(axis=0)])
+
+
+class PriceStore:
+    """
+    Daily closes kept up to date incrementally.
+
+    Args:
+        path: Feather file holding the closes
+        history_days: Calendar days of history to keep
+    """
+
+    def __init__(self, path, history_days=120):
+        self.path = path
+        self.history_days = history_days
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Stored closes, or an empty DataFrame"""
+        try:
+            df = feather.read_feather(self.path)
+        except (FileNotFoundError, OSError):
+            return pd.DataFrame()
+        return df.set_index(DATE_COLUMN)
+
+    def save(self, closes):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        df = closes.copy()
+        df.index = pd.to_datetime(df.index)
+        df.index.name = DATE_COLUMN
+        df.columns = df.columns.astype(str)
+        tmp_path = f'{self.path}.tmp'
+        feather.write_feather(df.reset_index(), tmp_path, compression='uncompressed')
+        os.replace(tmp_path, self.path)
+
+    def update(self, tickers, download, today=None):
+        """
+        Bring the closes of the given tickers up to date and return them
+        Args:
+            tickers: Tickers to cover
+            download: Function (tickers, period) -> DataFrame of closes, one column per ticker
+        Returns:
+            DataFrame of closes for the tickers that have any, within history_days
+        """
+        today = today or datetime.now()
+        with self._lock:
+            stored = self.load()
+            stored_tickers = set(stored.columns)
+            known = [ticker for ticker in tickers if ticker in stored_tickers]
+            new = [ticker for ticker in tickers if ticker not in stored_tickers]
+
+            frames = []
+            if known and not stored.empty:
+                # Days since the last stored date, plus a few days of overlap
+                last_date = pd.Timestamp(stored.index.max()).to_pydatetime()
+                gap_days = (today - last_date).days + OVERLAP_DAYS + 2
+                period = period_for(min(gap_days, self.history_days))
+                print(f"Updating stored closes for {len(known)} tickers ({period})")
+                recent = download(known, period)
+                if recent is not None and not recent.empty:
+                    recent = normalize_index(recent)
+                    rebased = rebased_tickers(stored, recent)
+                    if rebased:
+                        # A split or dividend since the last run changed the adjusted history
+                        print(f"Reloading closes for {len(rebased)} rebased tickers")
+                        stored = stored.drop(columns=rebased)
+                        recent = recent.drop(columns=rebased)
+                        new += rebased
+                    frames.append(recent)
+            else:
+                new = list(tickers)
+            if new:
+                print(f"Downloading closes for {len(new)} new tickers")
+                frames.append(download(new, period_for(self.history_days)))
+
+            closes = stored
+            for frame in frames:
+                if frame is None or frame.empty:
+                    continue
+                frame = normalize_index(frame)
+                # Downloaded values replace stored ones for the same date
+                closes = frame.combine_first(closes) if not closes.empty else frame
+
+            if closes.empty:
+                return closes
+            closes = closes.sort_index()
+            closes = closes[closes.index >= pd.Timestamp(today - timedelta(days=self.history_days)).normalize()]
+            self.save(closes)
+
+        columns = [ticker for ticker in tickers if ticker in closes.columns]
+        return closes[columns]
@@ -0,0 +1,246 @@
+"""
+Append-only signal store on embedded SQLite.
+
+Every signal run is one row: strategy, trading date, run timestamp and the
+JSON payload the service used to write to a timestamped file. Lookups by
+strategy, trading date and run timestamp are index scans, so finding the
+latest run for a date stays constant time as history grows instead of
+globbing and re-parsing files on every request.
+
+    store = SignalStore('signals/signals.db')
+    store.append('pairs', '2024-12-27', records)
+    run = store.latest('pairs', '2024-12-27')
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+import pytz
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signal_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    strategy TEXT NOT NULL,
+    trading_date TEXT NOT NULL,
+    run_ts TEXT NOT NULL,
+    source TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_signal_runs_date ON signal_runs (strategy, trading_date, run_ts);
+CREATE INDEX IF NOT EXISTS idx_signal_runs_ts ON signal_runs (strategy, run_ts);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_signal_runs_source ON signal_runs (source);
+"""
+
+# Legacy files are named live_signals_YYYYMMDD_HHMMSS.<ext>
+LEGACY_FILE_RE = re.compile(r'^live_signals_(\d{4})(\d{2})(\d{2})_(\d{2})(\d{2})(\d{2})\.(csv|json)$')
+
+RUN_TS_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+class SignalStore:
+    """
+    Signal runs for one service, shared by its producers and readers.
+
+    Each thread gets its own connection; WAL mode lets readers keep serving
+    while a producer appends. Rows are never updated or deleted.
+    """
+
+    def __init__(self, path, timezone='US/Eastern'):
+        self.path = path
+        self.tz = pytz.timezone(timezone)
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def now(self):
+        """Current run timestamp in the store's timezone"""
+        return datetime.now(self.tz).strftime(RUN_TS_FORMAT)
+
+    @staticmethod
+    def _record(row, include_payload=True):
+        record = {
+            'id': row['id'],
+            'strategy': row['strategy'],
+            'trading_date': row['trading_date'],
+            'run_ts': row['run_ts']
+        }
+        if include_payload:
+            record['payload'] = json.loads(row['payload'])
+        return record
+
+    def append(self, strategy, trading_date, payload, run_ts=None, source=None):
+        """
+        Append one signal run
+        Args:
+            strategy: Strategy name, e.g. 'pairs'
+            trading_date: YYYY-MM-DD date the signals are for
+            payload: JSON-serializable signals
+            run_ts: Run timestamp, defaults to now
+            source: Optional unique source identifier, used by backfill
+        Returns:
+            int id of the new run
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'INSERT INTO signal_runs (strategy, trading_date, run_ts, source, payload) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (strategy, trading_date, run_ts or self.now(), source, json.dumps(payload, default=str))
+            )
+        return cursor.lastrowid
+
+    def get(self, run_id):
+        """Run by id, or None"""
+        row = self._connect().execute('SELECT * FROM signal_runs WHERE id = ?', (run_id,)).fetchone()
+        return self._record(row) if row else None
+
+    def latest(self, strategy, trading_date=None, include_payload=True):
+        """
+        Latest run for a trading date, or for any date if trading_date is None
+        A list of dates picks the latest date that has a run, then its latest run.
+        Returns:
+            dict with id, strategy, trading_date, run_ts and payload, or None
+        """
+        if trading_date is None:
+            query = 'SELECT * FROM signal_runs WHERE strategy = ? ORDER BY run_ts DESC, id DESC LIMIT 1'
+            params = (strategy,)
+        else:
+            dates = [trading_date] if isinstance(trading_date, str) else list(trading_date)
+            if not dates:
+                return None
+            query = (f"SELECT * FROM signal_runs WHERE strategy = ? AND trading_date IN ({','.join('?' * len(dates))}) "
+                     'ORDER BY trading_date DESC, run_ts DESC, id DESC LIMIT 1')
+            params = (strategy, *dates)
+        row = self._connect().execute(query, params).fetchone()
+        return self._record(row, include_payload) if row else None
+
+    def latest_by_date(self, strategy, dates, include_payload=True):
+        """
+        Latest run for each of several trading dates in one query
+        Returns:
+            dict of {trading_date: run} for the dates that have runs
+        """
+        dates = list(dates)
+        if not dates:
+            return {}
+        rows = self._connect().execute(
+            f"SELECT * FROM signal_runs WHERE strategy = ? AND trading_date IN ({','.join('?' * len(dates))}) "
+            'ORDER BY trading_date, run_ts, id',
+            (strategy, *dates)
+        ).fetchall()
+        # Later rows overwrite earlier ones, leaving the latest run per date
+        return {row['trading_date']: self._record(row, include_payload) for row in rows}
+
+    def runs(self, strategy, start_date=None, end_date=None, latest_only=False, include_payload=True):
+        """
+        Runs with trading dates in [start_date, end_date], oldest first
+        Args:
+            latest_only: Keep only the latest run for each trading date
+        """
+        query = 'SELECT * FROM signal_runs WHERE strategy = ?'
+        params = [strategy]
+        if start_date is not None:
+            query += ' AND trading_date >= ?'
+            params.append(start_date)
+        if end_date is not None:
+            query += ' AND trading_date <= ?'
+            params.append(end_date)
+        rows = self._connect().execute(query + ' ORDER BY trading_date, run_ts, id', params).fetchall()
+        if latest_only:
+            rows = list({row['trading_date']: row for row in rows}.values())
+        return [self._record(row, include_payload) for row in rows]
+
+    def previous(self, strategy, run_id=None):
+        """
+        Run before the given run, for comparing consecutive runs
+        With run_id None this is the latest run, i.e. the one a new run
+        should be compared against.
+        """
+        if run_id is None:
+            return self.latest(strategy)
+        current = self._connect().execute('SELECT run_ts FROM signal_runs WHERE id = ?', (run_id,)).fetchone()
+        if current is None:
+            return None
+        row = self._connect().execute(
+            'SELECT * FROM signal_runs WHERE strategy = ? AND (run_ts < ? OR (run_ts = ? AND id < ?)) '
+            'ORDER BY run_ts DESC, id DESC LIMIT 1',
+            (strategy, current['run_ts'], current['run_ts'], run_id)
+        ).fetchone()
+        return self._record(row) if row else None
+
+    def dates(self, strategy):
+        """Trading dates with at least one run, newest first"""
+        rows = self._connect().execute(
+            'SELECT DISTINCT trading_date FROM signal_runs WHERE strategy = ? ORDER BY trading_date DESC',
+            (strategy,)
+        ).fetchall()
+        return [row['trading_date'] for row in rows]
+
+    def import_file(self, strategy, path, trading_date, run_ts, load):
+        """
+        Import one legacy file as a run once, keyed by its file name like backfill
+        Returns:
+            bool whether the file was imported by this call
+        """
+        source = f'{strategy}:{os.path.basename(path)}'
+        if not os.path.exists(path) or self._connect().execute(
+                'SELECT 1 FROM signal_runs WHERE source = ?', (source,)).fetchone():
+            return False
+        self.append(strategy, trading_date, load(path), run_ts=run_ts, source=source)
+        print(f"Imported {os.path.basename(path)} into {self.path}")
+        return True
+
+    def backfill(self, strategy, directory, load, local_time=False):
+        """
+        Import legacy live_signals_YYYYMMDD_HHMMSS files once
+        Files already imported are skipped, so this is safe to call on every start.
+        Args:
+            directory: Directory holding the legacy files
+            load: Function mapping a file path to its payload
+            local_time: File names carry the server's local time instead of the
+                        store's timezone; run timestamps are converted so imported
+                        runs sort with the ones stamped by now()
+        Returns:
+            int number of files imported
+        """
+        if not os.path.isdir(directory):
+            return 0
+        imported = {row['source'] for row in self._connect().execute(
+            'SELECT source FROM signal_runs WHERE strategy = ? AND source IS NOT NULL', (strategy,))}
+
+        count = 0
+        for name in sorted(os.listdir(directory)):
+            match = LEGACY_FILE_RE.match(name)
+            source = f'{strategy}:{name}'
+            if not match or source in imported:
+                continue
+            run_time = datetime(*(int(part) for part in match.groups()[:6]))
+            if local_time:
+                # A naive datetime converts from the server's local timezone
+                run_time = run_time.astimezone(self.tz)
+            try:
+                payload = load(os.path.join(directory, name))
+            except Exception as e:
+                print(f"Error importing {name} into the signal store: {e}")
+                continue
+            self.append(strategy, run_time.strftime('%Y-%m-%d'), payload,
+                        run_ts=run_time.strftime(RUN_TS_FORMAT), source=source)
+            count += 1
+        if count:
+            print(f"Imported {count} legacy {strategy} signal files into {self.path}")
+        return count
@@ -0,0 +1,149 @@
+"""
+Lightweight per-stage timing for the signal pipelines.
+
+Wrap a run in timed_run() and its steps in stage(); every stage gets its
+call count, retry count, summed time, slowest call and wall-clock span
+(first start to last end, which is what matters when calls overlap in a
+thread pool). A JSON report is written when the run finishes. Outside a
+timed run, stage() and record_retry() do nothing.
+
+    with timed_run('live_signals'):
+        with stage('fetch'):
+            ...
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+_current_run = contextvars.ContextVar('current_run', default=None)
+
+
+class RunTimer:
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._end = None
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    def _stage(self, name):
+        if name not in self.stages:
+            self.stages[name] = {
+                'calls': 0,
+                'retries': 0,
+                'total_seconds': 0.0,
+                'max_seconds': 0.0,
+                'first_start': None,
+                'last_end': None
+            }
+        return self.stages[name]
+
+    def record(self, name, start, end):
+        with self._lock:
+            record = self._stage(name)
+            elapsed = end - start
+            record['calls'] += 1
+            record['total_seconds'] += elapsed
+            record['max_seconds'] = max(record['max_seconds'], elapsed)
+            if record['first_start'] is None or start < record['first_start']:
+                record['first_start'] = start
+            if record['last_end'] is None or end > record['last_end']:
+                record['last_end'] = end
+
+    def retry(self, name, count=1):
+        with self._lock:
+            self._stage(name)['retries'] += count
+
+    def finish(self):
+        self._end = time.perf_counter()
+
+    def report(self):
+        end = self._end if self._end is not None else time.perf_counter()
+        with self._lock:
+            stages = {}
+            for name, record in self.stages.items():
+                span = (record['last_end'] - record['first_start']) if record['calls'] else 0.0
+                stages[name] = {
+                    'calls': record['calls'],
+                    'retries': record['retries'],
+                    'total_seconds': round(record['total_seconds'], 4),
+                    'max_seconds': round(record['max_seconds'], 4),
+                    'wall_seconds': round(span, 4)
+                }
+        return {
+            'run': self.name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_seconds': round(end - self._start, 4),
+            'stages': stages
+        }
+
+    def write_report(self, output_dir='timings'):
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{self.name}_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+@contextmanager
+def timed_run(name, output_dir='timings'):
+    """Time a whole run and write its report to output_dir when it ends"""
+    timer = RunTimer(name)
+    token = _current_run.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_run.reset(token)
+        timer.finish()
+        try:
+            path = timer.write_report(output_dir)
+            print(f"Timing report for {name} saved to {path}")
+        except Exception as e:
+            print(f"Error writing timing report for {name}: {e}")
+
+
+@contextmanager
+def stage(name):
+    """Time a block as one call of the named stage of the current run"""
+    timer = _current_run.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.record(name, start, time.perf_counter())
+
+
+def record_retry(name, count=1):
+    """Count a retry against the named stage of the current run"""
+    timer = _current_run.get()
+    if timer is not None:
+        timer.retry(name, count)
+
+
+def bind(func):
+    """
+    Bind func to the current run so calls from worker threads are recorded.
+
+    Thread pools do not inherit context variables, so pass bind(func) to
+    executor.submit/map instead of func.
+    """
+    timer = _current_run.get()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current_run.set(timer)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_run.reset(token)
+
+    return wrapper
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Service modules are imported flat, the way the service runs them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
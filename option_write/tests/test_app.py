@@ -0,0 +1,42 @@
+import concurrent.futures
+import threading
+
+import pytest
+
+import config
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    # The app creates its signal store relative to the working directory on import
+    monkeypatch.chdir(tmp_path)
+    import app
+    monkeypatch.setattr(app, 'strike_refresh_pool', concurrent.futures.ThreadPoolExecutor(max_workers=1))
+    monkeypatch.setattr(config, 'STRIKE_REFRESH_TIMEOUT', 0.2)
+    monkeypatch.setattr(app, 'get_next_weekly_expiry', lambda: '2026-10-23')
+    yield app
+    app.strike_refresh_pool.shutdown(wait=False)
+
+
+def test_blocked_refresh_does_not_starve_later_requests(service, monkeypatch):
+    release = threading.Event()
+
+    def refresh_strike(ticker, expiry, current_price=None):
+        if ticker == 'STUCK':
+            release.wait(5)
+        return 90.0
+
+    monkeypatch.setattr(service, 'refresh_strike', refresh_strike)
+    try:
+        trades = [{'contract': 'STUCK 2026-10-23 95 P', 'strike': 95.0}]
+        stale, _ = service.refresh_strikes(trades)
+        assert stale == 1
+        assert trades[0]['strike_stale'] and trades[0]['strike'] == 95.0
+
+        # The only worker of the original pool is still blocked
+        trades = [{'contract': 'AAPL 2026-10-23 95 P', 'strike': 95.0}]
+        stale, _ = service.refresh_strikes(trades)
+        assert stale == 0
+        assert trades[0] == {'contract': 'AAPL 2026-10-23 95 P', 'strike': 90.0, 'strike_stale': False}
+    finally:
+        release.set()
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from scipy.stats import norm
+
+from iv_solver import implied_volatility
+
+
+def reference_price(flag, spot, strike, t, r, sigma):
+    """Textbook Black-Scholes, independent of the solver's own pricing"""
+    d1 = (np.log(spot / strike) + (r + 0.5 * sigma ** 2) * t) / (sigma * np.sqrt(t))
+    d2 = d1 - sigma * np.sqrt(t)
+    call = spot * norm.cdf(d1) - strike * np.exp(-r * t) * norm.cdf(d2)
+    put = strike * np.exp(-r * t) * norm.cdf(-d2) - spot * norm.cdf(-d1)
+    return np.where(flag == 'c', call, put)
+
+
+def test_round_trip_on_synthetic_prices():
+    rng = np.random.default_rng(0)
+    n = 20000
+    spot = rng.uniform(5, 500, n)
+    strike = spot * rng.uniform(0.7, 1.3, n)
+    t = rng.uniform(1, 60, n) / 365
+    r = rng.uniform(0.0, 0.05, n)
+    sigma = rng.uniform(0.05, 3.0, n)
+    flags = np.where(rng.random(n) < 0.5, 'p', 'c')
+    prices = reference_price(flags, spot, strike, t, r, sigma)
+
+    # Keep quotes with at least half a cent of time value, like a listed quote;
+    # below that the price carries no information about volatility
+    discounted_strike = strike * np.exp(-r * t)
+    intrinsic = np.where(flags == 'c', np.maximum(spot - discounted_strike, 0),
+                         np.maximum(discounted_strike - spot, 0))
+    keep = prices - intrinsic >= 0.005
+
+    iv = implied_volatility(prices[keep], spot[keep], strike[keep], t[keep], r[keep], flags[keep])
+
+    assert np.isfinite(iv).all()
+    assert np.abs(iv - sigma[keep]).max() < 1e-6
+
+
+def test_scalar_input_returns_float():
+    price = float(reference_price(np.array('p'), 100.0, 90.0, 0.05, 0.0, 0.4))
+
+    iv = implied_volatility(price, 100.0, 90.0, 0.05)
+
+    assert isinstance(iv, float)
+    assert iv == pytest.approx(0.4, abs=1e-9)
+
+
+def test_bad_quotes_are_nan():
+    # Zero, negative, NaN, above the upper bound, expired, below intrinsic
+    iv = implied_volatility([0.0, -1.0, np.nan, 150.0, 0.5, 5.0],
+                            [100, 100, 100, 100, 100, 100],
+                            [90, 90, 90, 120, 90, 120],
+                            [0.02, 0.02, 0.02, 0.02, 0.0, 0.02])
+
+    assert iv.shape == (6,)
+    assert np.isnan(iv).all()
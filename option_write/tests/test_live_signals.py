@@ -0,0 +1,39 @@
+from collections import namedtuple
+from itertools import cycle
+
+import pandas as pd
+import requests
+
+import live_signals
+
+Options = namedtuple('Options', ['calls', 'puts'])
+
+
+class FakeTicker:
+    def __init__(self, ticker, session=None):
+        self.ticker = ticker
+
+    def option_chain(self, expiry):
+        if self.ticker == 'DOWN':
+            raise requests.ConnectionError('proxy unreachable')
+        if self.ticker == 'NOPUTS':
+            return Options(None, pd.DataFrame(columns=['strike', 'bid', 'ask']))
+        return Options(None, pd.DataFrame({'strike': [90.0, 95.0], 'bid': [1.0, 2.0], 'ask': [1.1, 2.2]}))
+
+
+def test_failed_fetches_are_not_checkpointed(tmp_path, monkeypatch):
+    monkeypatch.setattr(live_signals.yf, 'Ticker', FakeTicker)
+    monkeypatch.setattr(live_signals.time, 'sleep', lambda seconds: None)
+    path = str(tmp_path / 'checkpoint.jsonl')
+    tickers = ['AAPL', 'DOWN', 'NOPUTS']
+    price_stats = {ticker: (100.0, 0.01) for ticker in tickers}
+
+    checkpoint = live_signals.ChainCheckpoint(path, max_age=3600)
+    assert live_signals.fetch_chains(tickers, cycle([None]), '2099-01-02', price_stats, checkpoint) == 0
+
+    assert 'AAPL' in checkpoint and 'NOPUTS' in checkpoint
+    assert 'DOWN' not in checkpoint
+    # A rerun only has the failed ticker left to screen
+    rerun = live_signals.ChainCheckpoint(path, max_age=3600)
+    assert [ticker for ticker in tickers if ticker not in rerun] == ['DOWN']
+    assert [chain['ticker'] for chain in rerun.chains(tickers)] == ['AAPL']
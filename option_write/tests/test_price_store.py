@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import pandas as pd
+
+from price_store import PriceStore
+
+
+def closes(dates, **columns):
+    return pd.DataFrame(columns, index=pd.to_datetime(dates))
+
+
+def test_rebased_ticker_is_reloaded(tmp_path):
+    store = PriceStore(str(tmp_path / 'prices.feather'), history_days=30)
+    store.save(closes(['2026-10-12', '2026-10-13', '2026-10-14'],
+                      AAPL=[100.0, 102.0, 104.0], MSFT=[400.0, 401.0, 402.0]))
+    downloads = []
+
+    def download(tickers, period):
+        downloads.append((sorted(tickers), period))
+        if len(downloads) == 1:
+            # AAPL split 2-for-1 on the 15th, so its adjusted history halved
+            return closes(['2026-10-13', '2026-10-14', '2026-10-15'],
+                          AAPL=[51.0, 52.0, 53.0], MSFT=[401.0, 402.0, 403.0])
+        return closes(['2026-10-12', '2026-10-13', '2026-10-14', '2026-10-15'],
+                      AAPL=[50.0, 51.0, 52.0, 53.0])
+
+    result = store.update(['AAPL', 'MSFT'], download, today=datetime(2026, 10, 15, 16))
+
+    assert downloads == [(['AAPL', 'MSFT'], '1mo'), (['AAPL'], '1mo')]
+    assert result['AAPL'].tolist() == [50.0, 51.0, 52.0, 53.0]
+    assert result['MSFT'].tolist() == [400.0, 401.0, 402.0, 403.0]
+    assert store.load()['AAPL'].tolist() == [50.0, 51.0, 52.0, 53.0]
+
+
+def test_intraday_last_bar_is_not_a_rebase(tmp_path):
+    store = PriceStore(str(tmp_path / 'prices.feather'), history_days=30)
+    # The 14th was stored mid-session
+    store.save(closes(['2026-10-13', '2026-10-14'], AAPL=[102.0, 103.5]))
+    downloads = []
+
+    def download(tickers, period):
+        downloads.append(period)
+        return closes(['2026-10-13', '2026-10-14', '2026-10-15'], AAPL=[102.0, 104.0, 105.0])
+
+    result = store.update(['AAPL'], download, today=datetime(2026, 10, 15, 16))
+
+    assert downloads == ['1mo']
+    assert result['AAPL'].tolist() == [102.0, 104.0, 105.0]
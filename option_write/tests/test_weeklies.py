@@ -0,0 +1,58 @@
+import json
+
+import pandas as pd
+import pytest
+
+import config
+import weeklies
+
+
+class FakeTicker:
+    expirations = {}
+
+    def __init__(self, ticker, session=None):
+        self.options = tuple(self.expirations.get(ticker, ()))
+
+
+@pytest.fixture
+def run_weeklies(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, 'WEEKLIES_CACHE_FILE', str(tmp_path / 'weeklies_cache.json'))
+    monkeypatch.setattr(weeklies, 'get_proxies', lambda: [None])
+    monkeypatch.setattr(weeklies.time, 'sleep', lambda seconds: None)
+    monkeypatch.setattr(weeklies.yf, 'Ticker', FakeTicker)
+
+    def run(expirations):
+        FakeTicker.expirations = expirations
+        pd.DataFrame({'Ticker': list(expirations)}).to_csv('marketcaps.csv', index=False)
+        weeklies.find_weekly_tickers()
+        with open(config.WEEKLIES_CACHE_FILE) as f:
+            return json.load(f)
+
+    return run
+
+
+def test_empty_options_are_not_cached(run_weeklies):
+    cache = run_weeklies({
+        'EMPTY': [],
+        'MONTHLY': ['2026-11-20', '2026-12-18'],
+        'WEEKLY': ['2026-10-23', '2026-10-30', '2026-11-06'],
+    })
+
+    assert 'EMPTY' not in cache
+    assert cache['MONTHLY']['weekly'] is False
+    assert cache['WEEKLY']['weekly'] is True
+    with open('ticker_list.csv') as f:
+        assert f.read().split() == ['WEEKLY']
+
+
+def test_empty_options_do_not_replace_cached_entry(run_weeklies):
+    run_weeklies({'AAPL': ['2026-10-23', '2026-10-30', '2026-11-06']})
+    # Expire the entry so the next run checks it again
+    cache = weeklies.load_weeklies_cache()
+    cache['AAPL']['ttl_days'] = 0
+    weeklies.save_weeklies_cache(cache)
+
+    cache = run_weeklies({'AAPL': []})
+
+    assert cache['AAPL']['weekly'] is True
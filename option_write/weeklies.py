@@ -7,7 +7,10 @@ import time
 import logging
 import concurrent.futures
 import random
+import json
+import os
 import config
+from stage_timer import timed_run, stage, record_retry, bind
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +30,12 @@ def get_proxies():
 
 
 def has_weekly_options(args):
+    """
+    Check a ticker's expiration pattern
+    Returns:
+        dict cache entry with weekly flag, first expirations and gaps in days,
+        or None if the ticker could not be checked
+    """
     ticker, proxy_pool = args
 
     for attempt in range(config.MAX_RETRIES):
@@ -40,15 +49,21 @@ def has_weekly_options(args):
                 session.proxies = {'http': proxy, 'https': proxy}
 
             stock = yf.Ticker(ticker, session=session)
-            expirations = stock.options
+            with stage('fetch'):
+                expirations = stock.options
 
             if len(expirations) < 3:
                 if attempt < config.MAX_RETRIES - 1:
                     logger.info(
                         f"{ticker} - No options data on attempt {attempt + 1}, retrying...")
+                    record_retry('fetch')
                     time.sleep(random.uniform(1, 3))
                     continue
-                return None
+                if not expirations:
+                    # Rate limits and proxy failures also come back empty, so don't cache it
+                    logger.info(f"{ticker} - No options data after {config.MAX_RETRIES} attempts")
+                    return None
+                return make_cache_entry(False, list(expirations), [])
 
             # Convert expiration strings to datetime objects
             exp_dates = [datetime.strptime(exp, '%Y-%m-%d')
@@ -58,15 +73,16 @@ def has_weekly_options(args):
             diff1 = (exp_dates[1] - exp_dates[0]).days
             diff2 = (exp_dates[2] - exp_dates[1]).days
 
-            if diff1 <= 14 and diff2 <= 14:
+            weekly = diff1 <= 14 and diff2 <= 14
+            if weekly:
                 logger.info(f"{ticker} has weekly options")
-                return ticker
-            return None
+            return make_cache_entry(weekly, list(expirations[:3]), [diff1, diff2])
 
         except Exception as e:
             if attempt < config.MAX_RETRIES - 1:
                 logger.error(
                     f"{ticker} - Error on attempt {attempt + 1}: {str(e)}, retrying...")
+                record_retry('fetch')
                 time.sleep(random.uniform(1, 3))
                 continue
             else:
@@ -77,7 +93,72 @@ def has_weekly_options(args):
     return None
 
 
+def make_cache_entry(weekly, expirations, gaps):
+    # Jitter the TTL so entries checked in the same run do not all expire together
+    ttl_days = config.WEEKLIES_TTL_DAYS * random.uniform(0.75, 1.25)
+    return {
+        'weekly': weekly,
+        'expirations': expirations,
+        'gaps': gaps,
+        'last_checked': datetime.now().isoformat(timespec='seconds'),
+        'ttl_days': round(ttl_days, 1)
+    }
+
+
+def load_weeklies_cache():
+    """Per-ticker expiration pattern cache: {ticker: entry}"""
+    try:
+        with open(config.WEEKLIES_CACHE_FILE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_atomic(path, write):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def save_weeklies_cache(cache):
+    write_atomic(config.WEEKLIES_CACHE_FILE, lambda f: json.dump(cache, f))
+
+
+def tickers_to_check(tickers, cache, now=None):
+    """
+    Tickers that need a fresh expiration check
+    New tickers and entries past their TTL, plus a rotating sample of
+    WEEKLIES_SAMPLE_FRACTION of the remaining entries, least recently checked first,
+    so changes in listings are still picked up between expiries.
+    """
+    now = now or datetime.now()
+    due, fresh = [], []
+    for ticker in tickers:
+        entry = cache.get(ticker)
+        if entry is None:
+            due.append(ticker)
+            continue
+        age_days = (now - datetime.fromisoformat(entry['last_checked'])).total_seconds() / 86400
+        if age_days >= entry['ttl_days']:
+            due.append(ticker)
+        else:
+            fresh.append(ticker)
+
+    sample_size = int(len(fresh) * config.WEEKLIES_SAMPLE_FRACTION)
+    fresh.sort(key=lambda ticker: cache[ticker]['last_checked'])
+    return due + fresh[:sample_size]
+
+
 def main():
+    with timed_run('weeklies', config.TIMINGS_DIR):
+        find_weekly_tickers()
+
+
+def find_weekly_tickers():
     # Read market caps CSV with proper header parsing
     df = pd.read_csv('marketcaps.csv')
     tickers = df['Ticker'].tolist()
@@ -85,7 +166,8 @@ def main():
 
     # Set up proxy pool
     try:
-        proxies = get_proxies()
+        with stage('fetch'):
+            proxies = get_proxies()
         if not proxies:
             raise ValueError("No proxies fetched")
         proxy_pool = cycle(proxies)
@@ -93,29 +175,41 @@ def main():
         logger.error(f"Error setting up proxies: {e}")
         proxy_pool = cycle([None])
 
+    # Only new, expired and sampled tickers are checked; the rest come from the cache
+    cache = load_weeklies_cache()
+    to_check = tickers_to_check(tickers, cache)
+    logger.info(f"Checking {len(to_check)} of {len(tickers)} tickers, "
+                f"{len(tickers) - len(to_check)} served from cache")
+
     # Create list of (ticker, proxy_pool) tuples for processing
-    tasks = [(ticker, proxy_pool) for ticker in tickers]
-    weekly_tickers = []
+    tasks = [(ticker, proxy_pool) for ticker in to_check]
 
     # Process tickers concurrently
     completed = 0
     total = len(tasks)
     with concurrent.futures.ThreadPoolExecutor(max_workers=config.WEEKLIES_MAX_WORKERS) as executor:
-        futures = [executor.submit(has_weekly_options, task) for task in tasks]
+        futures = {executor.submit(bind(has_weekly_options), task): task[0] for task in tasks}
 
         for future in concurrent.futures.as_completed(futures):
             completed += 1
             if completed % 10 == 0:  # Log progress every 10 tickers
                 logger.info(f"Progress: {completed}/{total} tickers processed")
 
-            result = future.result()
-            if result:
-                weekly_tickers.append(result)
+            entry = future.result()
+            if entry is not None:
+                cache[futures[future]] = entry
+
+            # Checkpoint so a crashed run resumes with only the unchecked tickers
+            if completed % config.WEEKLIES_CHECKPOINT_EVERY == 0:
+                with stage('persist'):
+                    save_weeklies_cache(cache)
+
+    weekly_tickers = [ticker for ticker in tickers if cache.get(ticker, {}).get('weekly')]
 
     # Save results to CSV
-    with open('ticker_list.csv', 'w') as f:
-        for ticker in weekly_tickers:
-            f.write(f"{ticker}\n")
+    with stage('persist'):
+        save_weeklies_cache(cache)
+        write_atomic('ticker_list.csv', lambda f: f.writelines(f"{ticker}\n" for ticker in weekly_tickers))
 
     logger.info(f"Found {len(weekly_tickers)} tickers with weekly options")
 
@@ -0,0 +1,222 @@
+"""
+Benchmark the pairs engine on synthetic data.
+
+Generates correlated price series for a grid of history lengths and pair
+counts, times each engine stage and records peak memory, then writes the
+results to a JSON file so runs can be compared over time. Runs fully
+offline, no market data is downloaded.
+
+Usage:
+    python benchmark.py --years 1 5 20 --pairs 1 10 100
+"""
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from pairs_trader import PairsTrader
+from portfolio_utils import create_portfolio_df, calculate_risk_metrics
+from metrics_engine import compute_horizon_metrics, compute_rolling_metrics, portfolio_returns_frame
+
+STAGES = [
+    'calculate_signals',
+    'calculate_weekly_options_payoff',
+    'backtest',
+    'create_portfolio_df',
+    'calculate_risk_metrics',
+    'metrics_engine',
+]
+
+# Stages main.py actually runs end to end; backtest already includes the
+# signal and options stages, which are timed separately for attribution
+PIPELINE_STAGES = ['backtest', 'create_portfolio_df', 'calculate_risk_metrics']
+
+
+def generate_pair_data(n_days, n_pairs, seed=42, late_start_fraction=0.2):
+    """
+    Generate synthetic correlated daily prices for n_pairs pairs.
+
+    Each pair gets its own correlation (0.5-0.95) and volatilities (20-80%).
+    A fraction of pairs start part way through the sample, like pairs added
+    after a listing, so the NaN handling paths are exercised as well.
+
+    Returns:
+        list of (ticker1, ticker2, returns_df, prices_df, vol_ratio) tuples
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=n_days)
+
+    pairs = []
+    for i in range(n_pairs):
+        ticker1, ticker2 = f'A{i:03d}', f'B{i:03d}'
+        rho = rng.uniform(0.5, 0.95)
+        vols = rng.uniform(0.2, 0.8, size=2) / np.sqrt(252)
+
+        z1 = rng.standard_normal(n_days)
+        z2 = rho * z1 + np.sqrt(1 - rho ** 2) * rng.standard_normal(n_days)
+        returns = np.column_stack([z1 * vols[0], z2 * vols[1]]) + 0.0003
+        prices = 100 * np.cumprod(1 + returns, axis=0)
+
+        start = 0
+        if rng.random() < late_start_fraction:
+            start = int(rng.integers(0, n_days // 2))
+
+        prices_df = pd.DataFrame(prices[start:], index=index[start:], columns=[ticker1, ticker2])
+        returns_df = prices_df.pct_change()
+        vol_ratio = returns_df[ticker1].std() / returns_df[ticker2].std()
+        pairs.append((ticker1, ticker2, returns_df, prices_df, vol_ratio))
+
+    return pairs
+
+
+class StageRecorder:
+    """Accumulate wall time and peak traced memory per stage"""
+
+    def __init__(self, track_memory):
+        self.track_memory = track_memory
+        self.stages = {stage: {'seconds': 0.0, 'calls': 0, 'peak_mb': 0.0} for stage in STAGES}
+
+    def run(self, stage, func, *args):
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+
+        record = self.stages[stage]
+        record['seconds'] += elapsed
+        record['calls'] += 1
+        if self.track_memory:
+            peak = (tracemalloc.get_traced_memory()[1] - baseline) / 1e6
+            record['peak_mb'] = max(record['peak_mb'], peak)
+        return result
+
+
+def run_engine(pairs, recorder):
+    """Run every engine stage the way main.py does, recording each one"""
+    pair_results = {}
+    all_dates = set()
+
+    for ticker1, ticker2, returns_df, prices_df, vol_ratio in pairs:
+        trader = PairsTrader(ticker1=ticker1, ticker2=ticker2, vol_ratio=vol_ratio)
+
+        signals = recorder.run('calculate_signals', trader.calculate_signals, returns_df)
+        recorder.run('calculate_weekly_options_payoff', trader.calculate_weekly_options_payoff, prices_df, signals)
+        strategy_returns, signals, options_df = recorder.run('backtest', trader.backtest, returns_df, prices_df)
+
+        all_dates.update(returns_df.index)
+        pair_results[f'{ticker1}_{ticker2}'] = {
+            'strategy_returns': strategy_returns,
+            'signals': signals,
+            'options_df': options_df,
+            'volatility': strategy_returns['total_return'].std() * np.sqrt(252)
+        }
+
+    portfolio_df = recorder.run('create_portfolio_df', create_portfolio_df, pair_results, all_dates)
+
+    def per_series_metrics():
+        for result in pair_results.values():
+            calculate_risk_metrics(result['strategy_returns']['total_return'])
+        for strategy in ['equal_weighted', 'inv_vol_weighted']:
+            calculate_risk_metrics(portfolio_df[f'{strategy}_return'])
+
+    def engine_metrics():
+        returns_df = portfolio_returns_frame(portfolio_df)
+        compute_horizon_metrics(returns_df)
+        compute_rolling_metrics(returns_df)
+
+    recorder.run('calculate_risk_metrics', per_series_metrics)
+    recorder.run('metrics_engine', engine_metrics)
+
+
+def benchmark(years, n_pairs, repeat=1, track_memory=True, seed=42):
+    """Benchmark one (years, pairs) configuration, keeping the fastest repeat per stage"""
+    n_days = int(years * 252)
+    pairs = generate_pair_data(n_days, n_pairs, seed=seed)
+
+    best = None
+    for _ in range(repeat):
+        recorder = StageRecorder(track_memory=False)
+        run_engine(pairs, recorder)
+        if best is None:
+            best = recorder.stages
+        else:
+            for stage, record in recorder.stages.items():
+                best[stage]['seconds'] = min(best[stage]['seconds'], record['seconds'])
+
+    # Memory is measured in a separate pass so tracing overhead does not skew the timings
+    if track_memory:
+        tracemalloc.start()
+        try:
+            recorder = StageRecorder(track_memory=True)
+            run_engine(pairs, recorder)
+        finally:
+            tracemalloc.stop()
+        for stage, record in recorder.stages.items():
+            best[stage]['peak_mb'] = record['peak_mb']
+
+    return {
+        'years': years,
+        'pairs': n_pairs,
+        'days': n_days,
+        'total_seconds': sum(best[stage]['seconds'] for stage in PIPELINE_STAGES),
+        'stages': best
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pairs engine on synthetic data')
+    parser.add_argument('--years', type=float, nargs='+', default=[1, 5],
+                        help='History lengths in years (1-20)')
+    parser.add_argument('--pairs', type=int, nargs='+', default=[1, 10],
+                        help='Pair counts (1-500)')
+    parser.add_argument('--repeat', type=int, default=1, help='Timing repeats per configuration')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-memory', action='store_true', help='Skip the peak memory pass')
+    parser.add_argument('--output-dir', default='benchmarks')
+    parser.add_argument('--label', default='', help='Free-form label stored with the results')
+    args = parser.parse_args()
+
+    for years in args.years:
+        if not 1 <= years <= 20:
+            parser.error('--years values must be between 1 and 20')
+    for n_pairs in args.pairs:
+        if not 1 <= n_pairs <= 500:
+            parser.error('--pairs values must be between 1 and 500')
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'label': args.label,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'seed': args.seed,
+        'runs': []
+    }
+
+    for years in args.years:
+        for n_pairs in args.pairs:
+            print(f"\nBenchmarking {years:g} years x {n_pairs} pairs...")
+            result = benchmark(years, n_pairs, repeat=args.repeat,
+                               track_memory=not args.no_memory, seed=args.seed)
+            report['runs'].append(result)
+            for stage, record in result['stages'].items():
+                print(f"  {stage:<34} {record['seconds']:>9.3f}s  peak {record['peak_mb']:>8.1f} MB")
+            print(f"  {'pipeline total':<34} {result['total_seconds']:>9.3f}s")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    filename = os.path.join(args.output_dir, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(filename, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nBenchmark results saved to {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,3 +21,26 @@ DEFAULT_PARAMS = {
     'max_position': 1,
     'vol_premium_multiplier': 0.015
 }
+
+# Dashboard option chain lookups: worker count and per-request deadline in seconds
+OPTION_CHAIN_MAX_WORKERS = 8
+OPTION_CHAIN_TIMEOUT = 10
+
+# Seconds a per-date order plan (weights, strikes, premiums, expiries) is reused across capital values
+ORDER_PLAN_TTL = 300
+
+# Directory for per-stage timing reports, inside the persisted signals volume
+TIMINGS_DIR = 'signals/timings'
+
+# Append-only signal store shared by the live signal job and the dashboard, inside the signals volume
+SIGNAL_DB_PATH = 'signals/signals.db'
+SIGNAL_STRATEGY = 'pairs'
+
+# Background quote snapshot: seconds between batched refreshes, oldest quote used
+# instead of a live lookup, and tickers per download request
+QUOTE_REFRESH_INTERVAL = 60
+QUOTE_MAX_AGE = 300
+QUOTE_BATCH_SIZE = 100
+
+# Seconds between quote snapshot refreshes outside regular trading hours
+QUOTE_IDLE_INTERVAL = 3600
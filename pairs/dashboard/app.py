@@ -1,5 +1,6 @@
 from flask import Flask, render_template, request, jsonify, send_file
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import glob
 import os
@@ -7,31 +8,109 @@ import sys
 import yfinance as yf
 import pandas_market_calendars as mcal
 from apscheduler.schedulers.background import BackgroundScheduler
-import subprocess
 import pytz
 import threading
+import time
+import functools
+import concurrent.futures
+from functools import lru_cache
+import hashlib
+import json
+from collections import OrderedDict
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config import DEFAULT_PARAMS
+from config import (PAIRS, DEFAULT_PARAMS, OPTION_CHAIN_MAX_WORKERS, OPTION_CHAIN_TIMEOUT, ORDER_PLAN_TTL,
+                    SIGNAL_DB_PATH, SIGNAL_STRATEGY, QUOTE_REFRESH_INTERVAL, QUOTE_MAX_AGE, QUOTE_BATCH_SIZE,
+                    QUOTE_IDLE_INTERVAL)
+from results_store import (results_columns, results_version, load_portfolio_results,
+                           load_risk_metrics, rolling_metrics_columns, load_rolling_metrics)
+from metrics_engine import ROLLING_WINDOWS
+from portfolio_utils import create_performance_plot
+from series_utils import downsample_series
+import main as pairs_backtest
+import live_signals
+from jobs import JobRunner
+from signal_index import SignalIndex
+from signal_store import SignalStore
+from quote_snapshot import QuoteSnapshot, download_last_prices, market_open
+from data_utils import download_lock
+
+RESULTS_DIR = './results'
+SIGNALS_DIR = './signals'
+BACKTEST_CACHE_SIZE = 32
+ORDER_PLAN_CACHE_SIZE = 16
+DEFAULT_SERIES_POINTS = 1000
 
 app = Flask(__name__)
 
+# Live signal runs, with any legacy CSV files imported on first start; the files
+# were named after the server's local time, new runs are stamped in US/Eastern
+signal_store = SignalStore(SIGNAL_DB_PATH)
+signal_store.backfill(SIGNAL_STRATEGY, SIGNALS_DIR, lambda path: pd.read_csv(path).to_dict('records'),
+                      local_time=True)
+
+
+def import_previous_signals(path):
+    """
+    Import the legacy previous_signals.csv, the state the old live run compared against
+    The run is stamped with the latest signal timestamp in the file, so a newer
+    legacy or live run still takes precedence as the previous run.
+    """
+    if not os.path.exists(path):
+        return False
+    df = pd.read_csv(path)
+    if df.empty:
+        return False
+    run_time = pd.to_datetime(df['timestamp'], utc=True).max().tz_convert(signal_store.tz)
+    return signal_store.import_file(SIGNAL_STRATEGY, path, run_time.strftime('%Y-%m-%d'),
+                                    run_time.strftime('%Y-%m-%dT%H:%M:%S'), lambda _: df.to_dict('records'))
+
+import_previous_signals(os.path.join(SIGNALS_DIR, 'previous_signals.csv'))
+signal_index = SignalIndex(signal_store, SIGNAL_STRATEGY)
+
+# Shared pool for option chain downloads made on the request path
+option_chain_pool = concurrent.futures.ThreadPoolExecutor(max_workers=OPTION_CHAIN_MAX_WORKERS)
+_option_chain_pool_lock = threading.Lock()
+
+
+def retire_option_chain_pool(pool):
+    """
+    Replace a pool whose workers are stuck on lookups past their deadline
+    The chain download cannot be interrupted, so the old pool is shut down
+    without waiting and its workers exit once their downloads return.
+    """
+    global option_chain_pool
+    with _option_chain_pool_lock:
+        if option_chain_pool is not pool:
+            return
+        option_chain_pool = concurrent.futures.ThreadPoolExecutor(max_workers=OPTION_CHAIN_MAX_WORKERS)
+    pool.shutdown(wait=False)
+
+def fetch_last_prices(tickers, session=None):
+    """Quote snapshot downloads share the download lock with the in-process jobs"""
+    with download_lock:
+        return download_last_prices(tickers, session)
+
+# Last prices of every pair leg, refreshed in the background for the live signal run
+quote_snapshot = QuoteSnapshot(
+    lambda: [pair[leg] for pair in PAIRS for leg in ('ticker1', 'ticker2')],
+    interval=QUOTE_REFRESH_INTERVAL,
+    batch_size=QUOTE_BATCH_SIZE,
+    fetch=fetch_last_prices,
+    active=market_open,
+    idle_interval=QUOTE_IDLE_INTERVAL
+)
+
+# Engine jobs run in-process so the 15:50 run does not pay interpreter and import start-up
+job_runner = JobRunner()
+job_runner.register('backtest', pairs_backtest.main)
+job_runner.register('live_signals', functools.partial(live_signals.main, quotes=quote_snapshot))
+
 def run_startup_jobs():
     """Run startup jobs in background thread"""
     print("Running startup jobs in background...")
-    def run_jobs():
-        try:
-            print(f"Running main.py at {datetime.now(pytz.timezone('US/Eastern'))}")
-            subprocess.run(['python', '../main.py'])
-            print("main.py completed")
-        except Exception as e:
-            print(f"Error running main.py: {e}")
-
-    # Start jobs in a separate thread
-    job_thread = threading.Thread(target=run_jobs)
-    job_thread.daemon = True  # Thread will exit when main program exits
-    job_thread.start()
+    job_runner.run_async('backtest')
 
 def init_scheduler():
     """Initialize the APScheduler"""
@@ -42,36 +121,34 @@ def init_scheduler():
     sched = BackgroundScheduler(daemon=True)
     et_tz = pytz.timezone('US/Eastern')
 
-    # Define the job functions
-    def run_main():
-        print(f"Running main.py at {datetime.now(et_tz)}")
-        subprocess.run(['python', '../main.py'])
-
-    def run_live_signals():
-        print(f"Running live_signals.py at {datetime.now(et_tz)}")
-        subprocess.run(['python', '../live_signals.py'])
-
     # Run startup jobs in background
     run_startup_jobs()
+    quote_snapshot.start()
 
-    # Schedule main.py to run at 4:15 PM ET on weekdays
+    # Schedule the backtest to run at 4:15 PM ET on weekdays
     sched.add_job(
-        run_main,
+        job_runner.run,
+        args=['backtest'],
         trigger='cron',
         day_of_week='mon-fri',
         hour=16,
         minute=15,
-        timezone=et_tz
+        timezone=et_tz,
+        max_instances=1,
+        coalesce=True
     )
 
-    # Schedule live_signals.py to run at 3:50 PM ET on weekdays
+    # Schedule live signals to run at 3:50 PM ET on weekdays
     sched.add_job(
-        run_live_signals,
+        job_runner.run,
+        args=['live_signals'],
         trigger='cron',
         day_of_week='mon-fri',
         hour=15,
         minute=50,
-        timezone=et_tz
+        timezone=et_tz,
+        max_instances=1,
+        coalesce=True
     )
 
     sched.start()
@@ -80,38 +157,81 @@ def init_scheduler():
 
 scheduler = init_scheduler()
 
+# Serialized backtest responses keyed by (results version, endpoint, query)
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+_plot_lock = threading.Lock()
+
+# Latest portfolio weights and the results version they were read from
+_weights_cache = {}
+_weights_cache_lock = threading.Lock()
+
+# Capital-independent order plans keyed by (signal run id, results version)
+_order_plan_cache = OrderedDict()
+# Per-key [lock, requests using it], so concurrent requests for one key build one plan
+_order_plan_key_locks = {}
+_order_plan_lock = threading.Lock()
+
+
+def get_cached_response(cache_key):
+    """Return a cached response body or None"""
+    with _response_cache_lock:
+        body = _response_cache.get(cache_key)
+        if body is not None:
+            _response_cache.move_to_end(cache_key)
+        return body
+
+def put_cached_response(cache_key, body):
+    """Cache a response body, evicting entries for older results versions"""
+    with _response_cache_lock:
+        _response_cache[cache_key] = body
+        for key in [key for key in _response_cache if key[0] != cache_key[0]]:
+            del _response_cache[key]
+        while len(_response_cache) > BACKTEST_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+def json_response(body, etag):
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def not_modified(etag):
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    return response
+
 
 def load_signals(date_str):
     """Load signals for a specific date"""
-    signals_dir = './signals'
-    # Find the file for the specified date
-    date_pattern = date_str.replace('-', '')
-    matching_files = glob.glob(f"{signals_dir}/live_signals_{date_pattern}*.csv")
-    
-    if not matching_files:
-        return None
-    
-    # Use the latest file if multiple exist for the same date
-    latest_file = max(matching_files)
-    return pd.read_csv(latest_file)
+    # Uses the latest file if multiple exist for the same date
+    signals_df, _ = signal_index.load(date_str)
+    return signals_df
 
 def load_portfolio_weights():
-    """Load the latest weights from portfolio results"""
-    results_path = './results/portfolio_results.csv'
+    """Load the latest weights from portfolio results, cached per results version"""
+    version = results_version(RESULTS_DIR)
+    with _weights_cache_lock:
+        if version is not None and _weights_cache.get('version') == version:
+            return dict(_weights_cache['weights'])
+
     try:
-        df = pd.read_csv(results_path)
+        # Read only the weight columns from the memory-mapped results
+        weight_cols = [col for col in results_columns(RESULTS_DIR) if col.endswith('_weight') and not col.startswith('equal_') and not col.startswith('inv_vol_')]
+        df = load_portfolio_results(RESULTS_DIR, columns=weight_cols)
         # Get second last row for weights
         weights = df.iloc[-2]
-        # Extract only weight columns
-        weight_cols = [col for col in df.columns if col.endswith('_weight') and not col.startswith('equal_') and not col.startswith('inv_vol_')]
         weights = weights[weight_cols].to_dict()
         # Clean up column names to match pair format
         weights = {col.replace('_weight', '').replace('_', '/'): val for col, val in weights.items()}
-        return weights
+        with _weights_cache_lock:
+            _weights_cache.update(version=version, weights=weights)
+        return dict(weights)
     except Exception as e:
         print(f"Error loading portfolio weights: {e}")
         return {}
 
+@lru_cache(maxsize=64)
 def get_next_option_expiry(date_str, week='this'):
     """
     Get the exact expiry date for options, accounting for shortened trading weeks
@@ -204,143 +324,201 @@ def validate_option_strike(ticker, current_price, expiry_date, option_type='put'
         print(f"Error validating option strike for {ticker}: {e}")
         return None, None
 
-def calculate_orders(signals_df, total_capital):
-    """Calculate specific orders based on signals"""
-    max_position = DEFAULT_PARAMS['max_position']
-    orders = []
-    
+def lookup_option_strikes(signals_df):
+    """
+    Resolve expiry, strike and premium for every options row concurrently
+    Chain downloads are fanned out on a shared pool and bounded by
+    OPTION_CHAIN_TIMEOUT for the whole request; rows that miss the deadline
+    are treated like rows without a valid strike. Lookups still queued at
+    the deadline are cancelled, and a pool left with running ones is
+    replaced so later requests do not queue behind them.
+    Returns:
+        tuple of ({row index: (expiry_date, strike_price, premium)}, number of rows that timed out)
+    """
+    options_rows = signals_df[signals_df['trade_type'] == 'options']
+    lookups = {}
+    expiries = {}
+    for idx, row in options_rows.iterrows():
+        # Get exact expiry date
+        expiry_date = get_next_option_expiry(
+            row['timestamp'].split()[0],
+            'this' if row['expiry'] == 'this_week' else 'next'
+        )
+        if not expiry_date:
+            continue
+        expiries[idx] = expiry_date
+        lookups[idx] = (row['pair'].split('/')[0], row['ticker1_price'], expiry_date, row['option_type'])
+
+    # Submit under the lock so the pool is not retired in between
+    with _option_chain_pool_lock:
+        pool = option_chain_pool
+        futures = {idx: pool.submit(validate_option_strike, *args) for idx, args in lookups.items()}
+
+    if not futures:
+        return {}, 0
+
+    done, not_done = concurrent.futures.wait(futures.values(), timeout=OPTION_CHAIN_TIMEOUT)
+    strikes = {}
+    timed_out = 0
+    for idx, future in futures.items():
+        if future in not_done:
+            future.cancel()
+            print(f"Option chain lookup for {signals_df.loc[idx, 'pair']} missed the {OPTION_CHAIN_TIMEOUT}s deadline")
+            strikes[idx] = (expiries[idx], None, None)
+            timed_out += 1
+        else:
+            strike_price, premium = future.result()
+            strikes[idx] = (expiries[idx], strike_price, premium)
+    if any(future.running() for future in not_done):
+        retire_option_chain_pool(pool)
+    return strikes, timed_out
+
+def prepare_orders(signals_df):
+    """
+    Capital-independent part of order generation
+    Joins portfolio weights and resolves option expiries, strikes and premiums.
+    Returns:
+        dict plan to be sized with scale_orders
+    """
     # Load portfolio weights
     portfolio_weights = load_portfolio_weights()
-    
-    # Track pairs that need position squaring
-    active_pairs = set()
-    
-    for _, row in signals_df.iterrows():
-        pair = row['pair']
-        ticker1, ticker2 = pair.split('/')
-        
-        if row['trade_type'] == 'pairs':
-            active_pairs.add(pair)
-            
-            # Get pair weight from portfolio weights
-            pair_weight = portfolio_weights.get(pair, 0)
-            
-            # Calculate position sizes with weight
-            pair_capital = total_capital * pair_weight * row['position_size'] * max_position
-            
-            if row['position'] != 0:
-                # Calculate number of shares for ticker1
-                shares1 = int(pair_capital / row['ticker1_price'])
-                # Calculate number of shares for ticker2 using vol_ratio
-                shares2 = int(pair_capital * row['vol_ratio'] / row['ticker2_price'])
-                
-                action1 = "BUY" if row['position'] > 0 else "SELL"
-                action2 = "SELL" if row['position'] > 0 else "BUY"
-                
-                orders.append({
-                    'pair': pair,
-                    'type': 'PAIRS',
-                    'ticker': ticker1,
-                    'action': action1,
-                    'shares': abs(shares1),
-                    'price': row['ticker1_price'],
-                    'notional': abs(shares1 * row['ticker1_price'])
-                })
-                
-                orders.append({
-                    'pair': pair,
-                    'type': 'PAIRS',
-                    'ticker': ticker2,
-                    'action': action2,
-                    'shares': abs(shares2),
-                    'price': row['ticker2_price'],
-                    'notional': abs(shares2 * row['ticker2_price'])
-                })
+
+    # Fetch all option chains at once rather than one after another
+    signals_df = signals_df.reset_index(drop=True)
+    option_strikes, timed_out = lookup_option_strikes(signals_df)
+
+    return {
+        'signals': signals_df,
+        'tickers': signals_df['pair'].str.split('/', expand=True),
+        'pair_weight': signals_df['pair'].map(portfolio_weights).fillna(0),
+        'option_strikes': option_strikes,
+        'complete': timed_out == 0
+    }
+
+def scale_orders(plan, total_capital):
+    """Size a prepared order plan to the given capital"""
+    max_position = DEFAULT_PARAMS['max_position']
+    signals_df = plan['signals']
+    tickers = plan['tickers']
+    pair_weight = plan['pair_weight']
+    option_strikes = plan['option_strikes']
+
+    # Size every row at once: capital scaling and share rounding
+    pair_capital = (total_capital * pair_weight * signals_df['position_size'] * max_position).fillna(0)
+    is_pairs = signals_df['trade_type'] == 'pairs'
+    is_trade = is_pairs & (signals_df['position'] != 0)
+
+    # int() truncation towards zero, as the per-row version did
+    shares1 = np.trunc(pair_capital / signals_df['ticker1_price']).where(is_trade, 0).fillna(0).astype(int)
+    shares2 = np.trunc(pair_capital * signals_df['vol_ratio'] / signals_df['ticker2_price']).where(is_trade, 0).fillna(0).astype(int)
+    long_position = signals_df['position'] > 0
+    action1 = np.where(is_trade, np.where(long_position, 'BUY', 'SELL'), 'SQUARE')
+    action2 = np.where(is_trade, np.where(long_position, 'SELL', 'BUY'), 'SQUARE')
+
+    legs = []
+    for leg, ticker, action, shares, price in (
+            (0, tickers[0], action1, shares1, signals_df['ticker1_price']),
+            (1, tickers[1], action2, shares2, signals_df['ticker2_price'])):
+        leg_df = pd.DataFrame({
+            'row': signals_df.index,
+            'leg': leg,
+            'pair': signals_df['pair'],
+            'type': 'PAIRS',
+            'ticker': ticker,
+            'action': action,
+            'shares': shares.abs(),
+            'price': price,
+            'notional': (shares * price).abs()
+        })
+        legs.append(leg_df[is_pairs])
+
+    pairs_orders = pd.concat(legs).sort_values(['row', 'leg'], kind='stable')
+    orders_by_row = {}
+    for order in pairs_orders.drop(columns='leg').to_dict('records'):
+        orders_by_row.setdefault(order.pop('row'), []).append(order)
+
+    # Only the options rows that needed external data are handled per row
+    stock_shares = np.trunc(pair_capital / signals_df['ticker1_price']).fillna(0).astype(int)
+    for idx, (expiry_date, strike_price, premium) in option_strikes.items():
+        if strike_price is None:
+            continue
+        row = signals_df.loc[idx]
+        contracts = abs(int(stock_shares[idx])) // 100
+        orders_by_row[idx] = [{
+            'pair': row['pair'],
+            'type': 'OPTIONS',
+            'ticker': f"{tickers.at[idx, 0]} {row['option_type'].upper()}",
+            'action': 'SELL',
+            'shares': contracts,
+            'price': strike_price,
+            'notional': contracts * 100 * strike_price,
+            'expiry': expiry_date,
+            'premium': premium,
+            'premium_target': row['premium_target']
+        }]
+
+    return [order for row in sorted(orders_by_row) for order in orders_by_row[row]]
+
+def calculate_orders(signals_df, total_capital):
+    """Calculate specific orders based on signals"""
+    return scale_orders(prepare_orders(signals_df), total_capital)
+
+def get_orders(date_str, total_capital):
+    """
+    Calculate orders for a date, reusing the capital-independent plan
+    Plans are cached per signal run and results version for
+    ORDER_PLAN_TTL seconds, so a new capital only recomputes share and
+    contract counts. Concurrent requests for the same date wait for one
+    plan instead of each fetching option chains. Plans with timed out
+    chain lookups are not cached.
+    Returns:
+        tuple of (signals DataFrame, orders) or (None, None) if there are no signals
+    """
+    signals_df, signals_key = signal_index.load(date_str)
+    if signals_df is None:
+        return None, None
+
+    cache_key = (signals_key, results_version(RESULTS_DIR))
+    with _order_plan_lock:
+        key_lock = _order_plan_key_locks.setdefault(cache_key, [threading.Lock(), 0])
+        key_lock[1] += 1
+
+    try:
+        with key_lock[0]:
+            with _order_plan_lock:
+                cached = _order_plan_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < ORDER_PLAN_TTL:
+                plan = cached[1]
             else:
-                # Add square position orders if needed
-                orders.append({
-                    'pair': pair,
-                    'type': 'PAIRS',
-                    'ticker': ticker1,
-                    'action': "SQUARE",
-                    'shares': 0,
-                    'price': row['ticker1_price'],
-                    'notional': 0
-                })
-                orders.append({
-                    'pair': pair,
-                    'type': 'PAIRS',
-                    'ticker': ticker2,
-                    'action': "SQUARE",
-                    'shares': 0,
-                    'price': row['ticker2_price'],
-                    'notional': 0
-                })
-        
-        elif row['trade_type'] == 'options':
-            # Get exact expiry date
-            expiry_date = get_next_option_expiry(
-                row['timestamp'].split()[0],
-                'this' if row['expiry'] == 'this_week' else 'next'
-            )
-            
-            if not expiry_date:
-                continue
-                
-            # Validate option strike
-            strike_price, premium = validate_option_strike(
-                ticker1,
-                row['ticker1_price'],
-                expiry_date,
-                row['option_type']
-            )
-            
-            if strike_price is None:
-                continue
-                
-            # Get pair weight from portfolio weights
-            pair_weight = portfolio_weights.get(pair, 0)
-            
-            # Calculate options contracts based on stock position with weight
-            pair_capital = total_capital * pair_weight * row['position_size'] * max_position
-            stock_shares = int(pair_capital / row['ticker1_price'])
-            contracts = abs(stock_shares) // 100
-            
-            orders.append({
-                'pair': pair,
-                'type': 'OPTIONS',
-                'ticker': f"{ticker1} {row['option_type'].upper()}",
-                'action': 'SELL',
-                'shares': contracts,
-                'price': strike_price,
-                'notional': contracts * 100 * strike_price,
-                'expiry': expiry_date,
-                'premium': premium,
-                'premium_target': row['premium_target']
-            })
-    
-    return orders
+                plan = prepare_orders(signals_df)
+                with _order_plan_lock:
+                    if plan['complete']:
+                        _order_plan_cache[cache_key] = (time.monotonic(), plan)
+                        _order_plan_cache.move_to_end(cache_key)
+                        while len(_order_plan_cache) > ORDER_PLAN_CACHE_SIZE:
+                            _order_plan_cache.popitem(last=False)
+                    else:
+                        _order_plan_cache.pop(cache_key, None)
+    finally:
+        # The last request holding the key lock removes it, so the table only has keys in use
+        with _order_plan_lock:
+            key_lock[1] -= 1
+            if key_lock[1] == 0:
+                del _order_plan_key_locks[cache_key]
+
+    return plan['signals'], scale_orders(plan, total_capital)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
-    available_dates = []
-    signals_dir = './signals'
-    
-    # Get available dates from signal files
-    for file in glob.glob(f"{signals_dir}/live_signals_*.csv"):
-        date_str = os.path.basename(file).split('_')[2][:8]  # Extract YYYYMMDD
-        date_obj = datetime.strptime(date_str, '%Y%m%d')
-        available_dates.append(date_obj.strftime('%Y-%m-%d'))
-    
-    available_dates = sorted(set(available_dates), reverse=True)
+    # Get available dates from the signal file index
+    available_dates = signal_index.dates()
     
     if request.method == 'POST':
         date = request.form.get('date')
         total_capital = float(request.form.get('capital', 1000000))
         
-        signals_df = load_signals(date)
+        signals_df, orders = get_orders(date, total_capital)
         if signals_df is not None:
-            orders = calculate_orders(signals_df, total_capital)
             return render_template('orders.html', 
                                 orders=orders, 
                                 dates=available_dates,
@@ -368,7 +546,7 @@ def get_pair_trade_signals(date, capital):
         formatted_date = date_obj.strftime('%Y-%m-%d')
         total_capital = float(capital)
         
-        signals_df = load_signals(formatted_date)
+        signals_df, orders = get_orders(formatted_date, total_capital)
         if signals_df is None:
             return jsonify({'error': 'No signals found for specified date'}), 404
             
@@ -380,8 +558,6 @@ def get_pair_trade_signals(date, capital):
             'options_trades': []
         }
         
-        orders = calculate_orders(signals_df, total_capital)
-        
         # Group orders by pair and type
         pairs_map = {}
         options_list = []
@@ -427,15 +603,23 @@ def get_pair_trade_signals(date, capital):
 def backtest_performance():
     """
     REST endpoint to serve the backtest performance plot
+    The plot is rendered on first request after each backtest and reused
+    until the results change.
     Returns:
         Portfolio performance plot image
     """
     try:
-        image_path = './results/portfolio_performance.png'
-        
+        version = results_version(RESULTS_DIR)
+        if version is None:
+            return jsonify({'error': 'Portfolio results not found'}), 404
+
+        image_path = os.path.join(RESULTS_DIR, f'portfolio_performance_{version}.png')
         if not os.path.exists(image_path):
-            return jsonify({'error': 'Portfolio performance image not found'}), 404
-            
+            with _plot_lock:
+                # Another request may have rendered it while we waited
+                if not os.path.exists(image_path):
+                    render_performance_plot(version)
+
         return send_file(
             image_path,
             mimetype='image/png',
@@ -445,6 +629,75 @@ def backtest_performance():
     except Exception as e:
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
+def render_performance_plot(version):
+    """Render the performance plot for a results version and drop older renders"""
+    cum_cols = [col for col in results_columns(RESULTS_DIR) if col.endswith('_cum_return')]
+    df = load_portfolio_results(RESULTS_DIR, columns=cum_cols).set_index('date')
+    pair_names = [col[:-len('_cum_return')] for col in cum_cols
+                  if not col.startswith(('equal_weighted', 'inv_vol_weighted'))]
+
+    filename = f'portfolio_performance_{version}.png'
+    tmp_name = f'.{filename}.tmp.png'
+    create_performance_plot(df, pair_names, RESULTS_DIR, filename=tmp_name)
+    os.replace(os.path.join(RESULTS_DIR, tmp_name), os.path.join(RESULTS_DIR, filename))
+
+    for old_file in glob.glob(os.path.join(RESULTS_DIR, 'portfolio_performance_*.png')):
+        if os.path.basename(old_file) != filename:
+            os.remove(old_file)
+
+@app.route('/backtest/series')
+def backtest_series():
+    """
+    REST endpoint to serve cumulative return series downsampled with LTTB
+    Query parameters:
+        points: Maximum points per series (default 1000)
+        series: Optional comma-separated series names, defaults to every pair and both portfolios
+    Returns:
+        JSON with {series: {dates: [...], values: [...]}}
+    """
+    try:
+        version = results_version(RESULTS_DIR)
+        if version is None:
+            return jsonify({'error': 'Portfolio results not found'}), 404
+
+        points = request.args.get('points', DEFAULT_SERIES_POINTS, type=int)
+        if points < 3:
+            return jsonify({'error': 'points must be at least 3'}), 400
+        series = request.args.get('series')
+        series = tuple(name.strip() for name in series.split(',') if name.strip()) if series else None
+
+        cache_key = (version, 'series', points, series)
+        etag = hashlib.md5(repr(cache_key).encode()).hexdigest()
+        if request.if_none_match.contains(etag):
+            return not_modified(etag)
+
+        body = get_cached_response(cache_key)
+        if body is None:
+            available = [col[:-len('_cum_return')] for col in results_columns(RESULTS_DIR)
+                         if col.endswith('_cum_return')]
+            names = list(series) if series else available
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                return jsonify({'error': f'Unknown series: {", ".join(unknown)}'}), 400
+
+            df = load_portfolio_results(RESULTS_DIR, columns=[f'{name}_cum_return' for name in names])
+            dates = df['date'].to_numpy()
+            data = {'points': points, 'version': version, 'series': {}}
+            for name in names:
+                sampled_dates, values = downsample_series(dates, df[f'{name}_cum_return'].to_numpy(), points)
+                data['series'][name] = {
+                    'dates': pd.DatetimeIndex(sampled_dates).strftime('%Y-%m-%d').tolist(),
+                    'values': values.tolist()
+                }
+            body = json.dumps(data)
+            put_cached_response(cache_key, body)
+
+        return json_response(body, etag)
+
+    except Exception as e:
+        print(f"Error in backtest_series: {str(e)}")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
 @app.route('/backtest/results')
 def show_results():
     """
@@ -458,33 +711,192 @@ def show_results():
 def backtest_data():
     """
     REST endpoint to serve the backtest results in tabular format
+    Query parameters:
+        start, end: Optional YYYY-MM-DD bounds (inclusive)
+        columns: Optional comma-separated column names, date is always included
+        page: 1-based page number (default 1)
+        page_size: Rows per page, 0 returns every row (default 0)
     Returns:
-        JSON formatted portfolio results data
+        JSON formatted portfolio results data with an ETag keyed by the results version
     """
     try:
-        csv_path = './results/portfolio_results.csv'
-        
-        if not os.path.exists(csv_path):
+        version = results_version(RESULTS_DIR)
+        if version is None:
             return jsonify({'error': 'Portfolio results file not found'}), 404
-            
-        # Read CSV file and convert to simple list of dictionaries
-        df = pd.read_csv(csv_path)
-        
-        # Basic data cleaning - replace NaN with 0
-        df = df.fillna(0)
-        
-        # Convert to simple dictionary format
-        data = {
-            'columns': df.columns.tolist(),
-            'data': df.values.tolist()
-        }
-        
-        return jsonify(data)
-        
+
+        start = request.args.get('start')
+        end = request.args.get('end')
+        columns = request.args.get('columns')
+        columns = [col.strip() for col in columns.split(',') if col.strip()] if columns else None
+        page = request.args.get('page', 1, type=int)
+        page_size = request.args.get('page_size', 0, type=int)
+        if page < 1 or page_size < 0:
+            return jsonify({'error': 'page must be >= 1 and page_size must be >= 0'}), 400
+
+        cache_key = (version, 'data', start, end, tuple(columns) if columns else None, page, page_size)
+        etag = hashlib.md5(repr(cache_key).encode()).hexdigest()
+        if request.if_none_match.contains(etag):
+            return not_modified(etag)
+
+        body = get_cached_response(cache_key)
+        if body is None:
+            if columns:
+                unknown = set(columns) - set(results_columns(RESULTS_DIR))
+                if unknown:
+                    return jsonify({'error': f'Unknown columns: {", ".join(sorted(unknown))}'}), 400
+
+            df = load_portfolio_results(RESULTS_DIR, columns=columns)
+
+            # Filter on the date range before touching any other column
+            mask = pd.Series(True, index=df.index)
+            if start:
+                mask &= df['date'] >= pd.Timestamp(start)
+            if end:
+                mask &= df['date'] <= pd.Timestamp(end)
+            df = df[mask]
+
+            total_rows = len(df)
+            if page_size:
+                df = df.iloc[(page - 1) * page_size:page * page_size]
+
+            df['date'] = df['date'].dt.strftime('%Y-%m-%d')
+
+            # Basic data cleaning - replace NaN with 0
+            df = df.fillna(0)
+
+            # Convert to simple dictionary format
+            data = {
+                'columns': df.columns.tolist(),
+                'data': df.values.tolist(),
+                'page': page,
+                'page_size': page_size,
+                'total_rows': total_rows,
+                'total_pages': -(-total_rows // page_size) if page_size else 1,
+                'version': version
+            }
+            body = json.dumps(data)
+            put_cached_response(cache_key, body)
+
+        return json_response(body, etag)
+
+    except ValueError as e:
+        return jsonify({'error': f'Invalid input format: {str(e)}'}), 400
     except Exception as e:
         print(f"Error in backtest_data: {str(e)}")  # Log the actual error
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
+@app.route('/backtest/metrics')
+def backtest_metrics():
+    """
+    REST endpoint to serve multi-horizon and latest rolling risk metrics
+    Returns:
+        JSON with {series: {horizon: metrics}} and the latest rolling window values
+    """
+    try:
+        version = results_version(RESULTS_DIR)
+        if version is None:
+            return jsonify({'error': 'Risk metrics not found'}), 404
+        if request.if_none_match.contains(version):
+            response = app.response_class(status=304)
+            response.set_etag(version)
+            return response
+
+        try:
+            horizons = load_risk_metrics(RESULTS_DIR)
+            rolling_df = load_rolling_metrics(RESULTS_DIR)
+        except FileNotFoundError:
+            return jsonify({'error': 'Risk metrics not found'}), 404
+
+        # Latest available value of every rolling column
+        latest = rolling_df.drop(columns='date').ffill().iloc[-1]
+        rolling = {}
+        for series in horizons:
+            rolling[series] = {}
+            for window in ROLLING_WINDOWS:
+                values = {metric: latest.get(f'{series}_{window}d_{metric}') for metric in ('return', 'vol', 'sharpe')}
+                rolling[series][f'{window}d'] = {k: (None if pd.isna(v) else float(v)) for k, v in values.items()}
+
+        response = jsonify({
+            'horizons': horizons,
+            'rolling': rolling,
+            'as_of': rolling_df['date'].iloc[-1].strftime('%Y-%m-%d'),
+            'version': version
+        })
+        response.set_etag(version)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    except Exception as e:
+        print(f"Error in backtest_metrics: {str(e)}")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@app.route('/backtest/metrics/rolling')
+def backtest_rolling_metrics():
+    """
+    REST endpoint to serve rolling metric time series
+    Query parameters:
+        series: Comma-separated series names (pair names, equal_weighted, inv_vol_weighted)
+        window: Rolling window in days (63, 126 or 252, default 252)
+        metric: return, vol or sharpe (default sharpe)
+    Returns:
+        JSON with dates and one list of values per series
+    """
+    try:
+        window = request.args.get('window', 252, type=int)
+        metric = request.args.get('metric', 'sharpe')
+        series = [name.strip() for name in request.args.get('series', 'equal_weighted,inv_vol_weighted').split(',') if name.strip()]
+        if window not in ROLLING_WINDOWS or metric not in ('return', 'vol', 'sharpe'):
+            return jsonify({'error': 'Invalid window or metric'}), 400
+
+        try:
+            available = set(rolling_metrics_columns(RESULTS_DIR))
+        except FileNotFoundError:
+            return jsonify({'error': 'Risk metrics not found'}), 404
+
+        columns = [f'{name}_{window}d_{metric}' for name in series]
+        unknown = [name for name, col in zip(series, columns) if col not in available]
+        if unknown:
+            return jsonify({'error': f'Unknown series: {", ".join(unknown)}'}), 400
+
+        df = load_rolling_metrics(RESULTS_DIR, columns=columns).dropna(how='all', subset=columns)
+        return jsonify({
+            'dates': df['date'].dt.strftime('%Y-%m-%d').tolist(),
+            'series': {name: df[col].astype(object).where(df[col].notna(), None).tolist()
+                       for name, col in zip(series, columns)},
+            'window': window,
+            'metric': metric
+        })
+
+    except Exception as e:
+        print(f"Error in backtest_rolling_metrics: {str(e)}")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+@app.route('/jobs')
+@app.route('/jobs/<name>')
+def job_status(name=None):
+    """
+    REST endpoint for scheduled job status
+    Returns:
+        JSON with state, last start/finish, last duration and result per job
+    """
+    if name is not None and name not in job_runner:
+        return jsonify({'error': f'Unknown job: {name}'}), 404
+    return jsonify(job_runner.status(name))
+
+@app.route('/quotes')
+def get_quotes():
+    """
+    REST endpoint for the background quote snapshot
+    Returns:
+        JSON with the last price, bar time and fetch time per ticker plus staleness metadata
+    """
+    snapshot = quote_snapshot.snapshot()
+    return jsonify({
+        'running': quote_snapshot.running,
+        'metadata': snapshot.metadata(QUOTE_MAX_AGE),
+        'quotes': snapshot.quotes
+    })
+
 if __name__ == '__main__':
     try:
         app.run(debug=True, port=5002, host='0.0.0.0')
@@ -0,0 +1,102 @@
+import threading
+import time
+import traceback
+from datetime import datetime
+
+import pytz
+
+
+class JobRunner:
+    """
+    Run scheduled jobs in-process and keep their status.
+
+    Jobs are plain callables from the already-imported engine, so a run pays
+    no interpreter or import start-up cost and reuses any module-level caches.
+    Each job has its own lock: a run that starts while the previous one is
+    still going is skipped rather than stacked behind it.
+    """
+
+    def __init__(self, timezone='US/Eastern'):
+        self.tz = pytz.timezone(timezone)
+        self._jobs = {}
+        self._status_lock = threading.Lock()
+
+    def register(self, name, func):
+        self._jobs[name] = {
+            'func': func,
+            'lock': threading.Lock(),
+            'status': {
+                'name': name,
+                'state': 'idle',
+                'runs': 0,
+                'skipped': 0,
+                'last_started': None,
+                'last_finished': None,
+                'last_duration_seconds': None,
+                'last_result': None,
+                'last_error': None
+            }
+        }
+
+    def _update(self, name, **fields):
+        with self._status_lock:
+            self._jobs[name]['status'].update(fields)
+
+    def run(self, name):
+        """
+        Run a job in the calling thread.
+
+        Returns:
+            True if the job ran, False if it was skipped because it was already running
+        """
+        job = self._jobs[name]
+        if not job['lock'].acquire(blocking=False):
+            print(f"Job {name} is already running, skipping this run")
+            with self._status_lock:
+                job['status']['skipped'] += 1
+            return False
+
+        try:
+            started = datetime.now(self.tz)
+            print(f"Running {name} at {started}")
+            self._update(name, state='running', last_started=started.isoformat(timespec='seconds'))
+            start = time.perf_counter()
+            result, error = 'success', None
+            try:
+                job['func']()
+            except Exception as e:
+                result, error = 'error', f"{type(e).__name__}: {e}"
+                print(f"Error running {name}: {e}")
+                traceback.print_exc()
+
+            duration = time.perf_counter() - start
+            with self._status_lock:
+                job['status']['runs'] += 1
+            self._update(
+                name,
+                state='idle',
+                last_finished=datetime.now(self.tz).isoformat(timespec='seconds'),
+                last_duration_seconds=round(duration, 2),
+                last_result=result,
+                last_error=error
+            )
+            print(f"{name} finished with {result} in {duration:.1f}s")
+            return True
+        finally:
+            job['lock'].release()
+
+    def run_async(self, name):
+        """Run a job in a daemon thread"""
+        thread = threading.Thread(target=self.run, args=(name,), name=f'job-{name}')
+        thread.daemon = True  # Thread will exit when main program exits
+        thread.start()
+        return thread
+
+    def status(self, name=None):
+        with self._status_lock:
+            if name is not None:
+                return dict(self._jobs[name]['status'])
+            return {job_name: dict(job['status']) for job_name, job in self._jobs.items()}
+
+    def __contains__(self, name):
+        return name in self._jobs
@@ -0,0 +1,57 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class SignalIndex:
+    """
+    Date lookups of live signals backed by the signal store.
+
+    The store answers "latest run for a date" from its index, so a request
+    costs one indexed query instead of a directory scan. Parsed DataFrames of
+    recently requested runs are kept in a small LRU keyed by run id; runs are
+    append-only, so an id always maps to the same signals.
+    """
+
+    def __init__(self, store, strategy, cache_size=16):
+        self.store = store
+        self.strategy = strategy
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._frames = OrderedDict()
+
+    def dates(self):
+        """Available dates as YYYY-MM-DD strings, newest first"""
+        return self.store.dates(self.strategy)
+
+    def latest_run_id(self, date_str):
+        """Id of the latest run for a YYYY-MM-DD date, or None"""
+        run = self.store.latest(self.strategy, date_str, include_payload=False)
+        return run['id'] if run else None
+
+    def load(self, date_str):
+        """
+        Load the latest signals for a YYYY-MM-DD date
+        Returns:
+            tuple of (DataFrame, cache key) or (None, None) if there are no signals
+        """
+        run_id = self.latest_run_id(date_str)
+        if run_id is None:
+            return None, None
+
+        with self._lock:
+            df = self._frames.get(run_id)
+            if df is not None:
+                self._frames.move_to_end(run_id)
+                return df.copy(), run_id
+
+        run = self.store.get(run_id)
+        if run is None:
+            return None, None
+        df = pd.DataFrame(run['payload'])
+        with self._lock:
+            self._frames[run_id] = df
+            while len(self._frames) > self.cache_size:
+                self._frames.popitem(last=False)
+        return df.copy(), run_id
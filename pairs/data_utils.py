@@ -1,10 +1,23 @@
+import threading
+
 import yfinance as yf
 import pandas as pd
 import numpy as np
 
+# The dashboard runs the backtest, the live signal job and the quote snapshot as
+# threads of one process, so every yf.download in the process goes through one lock
+download_lock = threading.Lock()
+
+
+def download(*args, **kwargs):
+    """yf.download behind the process-wide download lock"""
+    with download_lock:
+        return yf.download(*args, **kwargs)
+
+
 def prepare_pair_data(ticker1, ticker2, start_date, end_date):
-    ticker1_data = yf.download(ticker1, start=start_date, end=end_date)
-    ticker2_data = yf.download(ticker2, start=start_date, end=end_date)
+    ticker1_data = download(ticker1, start=start_date, end=end_date)
+    ticker2_data = download(ticker2, start=start_date, end=end_date)
     
     # Align data
     common_dates = ticker1_data.index.intersection(ticker2_data.index)
@@ -4,13 +4,18 @@ import numpy as np
 from datetime import datetime, timedelta
 import pytz
 from pairs_trader import PairsTrader
-from config import PAIRS, DEFAULT_PARAMS
+from config import PAIRS, DEFAULT_PARAMS, TIMINGS_DIR, SIGNAL_DB_PATH, SIGNAL_STRATEGY, QUOTE_MAX_AGE
+from stage_timer import timed_run, stage
+from signal_store import SignalStore
+from data_utils import download
 import os
 
 
 class LiveSignalGenerator:
-    def __init__(self):
+    def __init__(self, quotes=None):
         self.pairs = PAIRS
+        # Optional QuoteSnapshot; fresh quotes replace the intraday download
+        self.quotes = quotes
         self.lookback_days = max(
             # Ensure enough data for calculations
             DEFAULT_PARAMS['z_score_window'] * 2,
@@ -20,6 +25,7 @@ class LiveSignalGenerator:
 
         # Create signals directory if it doesn't exist
         os.makedirs('signals', exist_ok=True)
+        self.store = SignalStore(SIGNAL_DB_PATH)
 
     def get_live_data(self, ticker, lookback_days):
         """Fetch historical + current day data for a ticker"""
@@ -34,12 +40,23 @@ class LiveSignalGenerator:
         end_date = datetime.now(self.et_tz)
         start_date = end_date - timedelta(days=lookback_days)
 
-        # Get historical daily data using the mapped ticker
-        hist_df = yf.download(live_ticker, start=start_date, end=end_date)
+        # Latest price from the quote snapshot when it is fresh enough
+        latest_price = None
+        if self.quotes is not None:
+            latest_price = self.quotes.snapshot([ticker]).price(ticker, max_age=QUOTE_MAX_AGE)
 
-        # Get today's intraday data (1-minute intervals)
-        ticker_obj = yf.Ticker(ticker)
-        today_df = ticker_obj.history(period='1d', interval='1m')
+        with stage('fetch'):
+            # Get historical daily data using the mapped ticker
+            hist_df = download(live_ticker, start=start_date, end=end_date)
+
+            # Get today's intraday data (1-minute intervals) only without a snapshot quote
+            if latest_price is None:
+                ticker_obj = yf.Ticker(ticker)
+                today_df = ticker_obj.history(period='1d', interval='1m')
+            else:
+                today_df = pd.DataFrame({'Open': [latest_price], 'High': [latest_price],
+                                         'Low': [latest_price], 'Close': [latest_price],
+                                         'Volume': [float('nan')]})
 
         if not today_df.empty:
             # Use the latest price to update today's data
@@ -124,12 +141,13 @@ class LiveSignalGenerator:
         current_time = datetime.now(self.et_tz)
         signals = []
 
-        # Load previous signals if available
-        try:
-            previous_signals = pd.read_csv('signals/previous_signals.csv')
+        # Load the previous run from the signal store if available
+        previous_run = self.store.previous(SIGNAL_STRATEGY)
+        if previous_run is not None:
+            previous_signals = pd.DataFrame(previous_run['payload'])
             previous_signals['timestamp'] = pd.to_datetime(
                 previous_signals['timestamp'])
-        except FileNotFoundError:
+        else:
             previous_signals = None
 
         for pair in self.pairs:
@@ -145,7 +163,8 @@ class LiveSignalGenerator:
                     ticker1=ticker1, ticker2=ticker2, vol_ratio=vol_ratio)
 
                 # Get latest signals
-                pair_signals = trader.calculate_signals(returns_df)
+                with stage('signals'):
+                    pair_signals = trader.calculate_signals(returns_df)
                 latest_signals = pair_signals.iloc[-1]
 
                 # Get latest prices
@@ -223,11 +242,14 @@ class LiveSignalGenerator:
         # Reorder columns
         signals_df = signals_df[column_order]
 
-        # Save current signals for next comparison
-        signals_df.to_csv('signals/previous_signals.csv', index=False)
-
         return signals_df
 
+    def save_signals(self, signals_df):
+        """Append signals to the signal store, where the next run compares against them"""
+        trading_date = datetime.now(self.et_tz).strftime('%Y-%m-%d')
+        records = signals_df.astype({'timestamp': str}).to_dict('records')
+        return self.store.append(SIGNAL_STRATEGY, trading_date, records)
+
     def format_signals_report(self, signals_df):
         """Format signals into a readable report"""
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -262,18 +284,19 @@ class LiveSignalGenerator:
         return "\n".join(report)
 
 
-def main():
+def main(quotes=None):
     """Main function to generate and display live signals"""
-    generator = LiveSignalGenerator()
-    signals_df = generator.generate_signals()
-    report = generator.format_signals_report(signals_df)
+    with timed_run('pairs_live_signals', TIMINGS_DIR):
+        generator = LiveSignalGenerator(quotes=quotes)
+        signals_df = generator.generate_signals()
+        report = generator.format_signals_report(signals_df)
 
-    # Print report
-    print(report)
+        # Print report
+        print(report)
 
-    # Save signals to CSV
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    signals_df.to_csv(f'signals/live_signals_{timestamp}.csv', index=False)
+        # Save signals to the signal store
+        with stage('persist'):
+            generator.save_signals(signals_df)
 
     return signals_df, report
 
@@ -4,7 +4,9 @@ from tqdm import tqdm  # for progress bar
 from pairs_trader import PairsTrader
 from data_utils import prepare_pair_data
 from portfolio_utils import create_portfolio_df, save_results, calculate_risk_metrics
-from config import PAIRS
+from metrics_engine import compute_horizon_metrics, portfolio_returns_frame
+from config import PAIRS, TIMINGS_DIR
+from stage_timer import timed_run, stage
 import pandas as pd
 import pytz
 
@@ -32,11 +34,21 @@ def print_summary(portfolio_df, pair_results):
             print(f"  {pair_name}: {weight:.2%}")
         print(f"  Total Weight: {total_weight:.2%}")
 
+    # Full-sample metrics of each pair's own strategy returns and of the portfolios,
+    # every series in one vectorized pass; dates a pair has no return for are skipped
+    pair_returns = pd.DataFrame({pair_name: result['strategy_returns']['total_return']
+                                 for pair_name, result in pair_results.items()})
+    pair_metrics = compute_horizon_metrics(pair_returns, horizons=('full',))
+    all_metrics = compute_horizon_metrics(
+        portfolio_returns_frame(portfolio_df), horizons=('full',))
+
     # Print individual pair statistics
     print("\n=== Individual Pair Performance ===")
     for pair_name, result in pair_results.items():
-        returns = result['strategy_returns']['total_return']
-        metrics = calculate_risk_metrics(returns)
+        metrics = pair_metrics[pair_name]['full']
+        if metrics is None:
+            print(f"\n{pair_name}: skipped, fewer than two strategy returns")
+            continue
         print(f"\n{pair_name}:")
         print(f"  Annual Return: {metrics['Annual Return']:.2%}")
         print(f"  Annual Volatility: {metrics['Annual Volatility']:.2%}")
@@ -51,8 +63,7 @@ def print_summary(portfolio_df, pair_results):
     # Print portfolio statistics
     print("\n=== Portfolio Performance ===")
     for strategy in ['equal_weighted', 'inv_vol_weighted']:
-        returns = portfolio_df[f'{strategy}_return']
-        metrics = calculate_risk_metrics(returns)
+        metrics = all_metrics[strategy]['full']
         print(f"\n{strategy.replace('_', ' ').title()}:")
         print(f"  Annual Return: {metrics['Annual Return']:.2%}")
         print(f"  Annual Volatility: {metrics['Annual Volatility']:.2%}")
@@ -75,7 +86,7 @@ def print_summary(portfolio_df, pair_results):
     print(corr_matrix.round(2))
 
 
-def main():
+def run_backtest():
     # Set date range
     end_date = datetime.now(pytz.timezone('US/Eastern'))
     start_date = end_date - timedelta(days=5*365)
@@ -93,14 +104,16 @@ def main():
         pair_name = f"{ticker1}_{ticker2}"
 
         print(f"\nProcessing {pair_name}")
-        returns_df, prices_df, vol_ratio = prepare_pair_data(
-            ticker1, ticker2, start_date, end_date)
+        with stage('fetch'):
+            returns_df, prices_df, vol_ratio = prepare_pair_data(
+                ticker1, ticker2, start_date, end_date)
         all_dates.update(returns_df.index)
 
         trader = PairsTrader(
             ticker1=ticker1, ticker2=ticker2, vol_ratio=vol_ratio)
-        strategy_returns, signals, options_df = trader.backtest(
-            returns_df, prices_df)
+        with stage('signals'):
+            strategy_returns, signals, options_df = trader.backtest(
+                returns_df, prices_df)
 
         pair_results[pair_name] = {
             'strategy_returns': strategy_returns,
@@ -115,10 +128,12 @@ def main():
         print(f"  Annual Return: {pair_metrics['Annual Return']:.2%}")
 
     print("\nCreating portfolio and calculating returns...")
-    portfolio_df = create_portfolio_df(pair_results, all_dates)
+    with stage('portfolio'):
+        portfolio_df = create_portfolio_df(pair_results, all_dates)
 
     print("\nSaving results...")
-    save_results(portfolio_df, pair_results)
+    with stage('persist'):
+        save_results(portfolio_df, pair_results)
 
     # Print final summary
     print_summary(portfolio_df, pair_results)
@@ -126,5 +141,10 @@ def main():
     print("\nBacktest completed! Results saved in the 'results' directory.")
 
 
+def main():
+    with timed_run('pairs_backtest', TIMINGS_DIR):
+        run_backtest()
+
+
 if __name__ == "__main__":
     main()
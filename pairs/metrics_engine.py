@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+ROLLING_WINDOWS = (63, 126, 252)
+HORIZONS = {'1y': 252, '3y': 756, '5y': 1260}
+METRIC_NAMES = ('Annual Return', 'Annual Volatility', 'Sharpe Ratio', 'Max Drawdown')
+
+
+class PrefixSums:
+    """
+    Cumulative sums over a (days x series) returns matrix.
+
+    Every window statistic is then a difference of two rows, so any number of
+    windows over any number of series costs O(1) per window instead of a full
+    pass over the returns. NaN returns (e.g. before a pair starts trading) are
+    excluded from the counts, matching the pandas behaviour of
+    calculate_risk_metrics.
+    """
+
+    def __init__(self, returns_df):
+        self.index = pd.DatetimeIndex(returns_df.index)
+        self.columns = list(returns_df.columns)
+
+        values = returns_df.to_numpy(dtype=float)
+        self.valid = ~np.isnan(values)
+        filled = np.where(self.valid, values, 0.0)
+
+        # Prefix arrays have a leading zero row: window [a, b) is P[b] - P[a]
+        zeros = np.zeros((1, values.shape[1]))
+        self.count = np.vstack([zeros, np.cumsum(self.valid, axis=0)])
+        self.sum = np.vstack([zeros, np.cumsum(filled, axis=0)])
+        self.sum_sq = np.vstack([zeros, np.cumsum(filled ** 2, axis=0)])
+        self.log_wealth = np.vstack([zeros, np.cumsum(np.log1p(filled), axis=0)])
+
+    def __len__(self):
+        return len(self.index)
+
+    def window_stats(self, start, end):
+        """
+        Annualised return, volatility and Sharpe ratio for windows [start, end).
+
+        start and end are equal-length integer arrays of row positions; the
+        result arrays have shape (len(start), n_series).
+        """
+        start = np.atleast_1d(start)
+        end = np.atleast_1d(end)
+
+        n = np.take(self.count, end, axis=0) - np.take(self.count, start, axis=0)
+        total = np.take(self.sum, end, axis=0) - np.take(self.sum, start, axis=0)
+        total_sq = np.take(self.sum_sq, end, axis=0) - np.take(self.sum_sq, start, axis=0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, total / n, np.nan)
+            var = np.where(n > 1, (total_sq - n * mean ** 2) / (n - 1), np.nan)
+            annual_return = (1 + mean) ** TRADING_DAYS - 1
+            annual_vol = np.sqrt(np.clip(var, 0, None)) * np.sqrt(TRADING_DAYS)
+            sharpe = np.where(annual_vol > 0, annual_return / annual_vol, 0.0)
+        sharpe = np.where(np.isnan(annual_vol), np.nan, sharpe)
+
+        return n, annual_return, annual_vol, sharpe
+
+    def max_drawdown(self, start):
+        """
+        Maximum drawdown of every series from row start to the end of the sample.
+
+        One cumulative max over the log-wealth slice covers all series at once.
+        Only days with a valid return can set a peak or a trough.
+        """
+        if start >= len(self):
+            return np.full(len(self.columns), np.nan)
+        wealth = self.log_wealth[start + 1:]
+        valid = self.valid[start:]
+        peaks = np.maximum.accumulate(np.where(valid, wealth, -np.inf), axis=0)
+        with np.errstate(invalid='ignore'):
+            drawdown = np.where(valid & np.isfinite(peaks), np.expm1(wealth - peaks), np.nan)
+        all_nan = ~np.any(~np.isnan(drawdown), axis=0)
+        drawdown[:, all_nan] = 0.0
+        result = np.nanmin(drawdown, axis=0)
+        result[all_nan] = np.nan
+        return result
+
+
+def horizon_start(prefix, horizon):
+    """Row index where a fixed horizon ('full', 'YTD', or a HORIZONS key) starts"""
+    n = len(prefix)
+    if horizon == 'full':
+        return 0
+    if horizon == 'YTD':
+        year_start = pd.Timestamp(year=prefix.index[-1].year, month=1, day=1)
+        return int(prefix.index.searchsorted(year_start))
+    return max(0, n - HORIZONS[horizon])
+
+
+def compute_horizon_metrics(returns_df, horizons=('full', 'YTD', '1y', '3y', '5y')):
+    """
+    Risk metrics for every series over each fixed horizon.
+
+    Args:
+        returns_df: DataFrame of daily returns, one column per series
+        horizons: Horizon names, see horizon_start
+    Returns:
+        dict of {series: {horizon: {metric: value}}}, values are None when a
+        series has fewer than two returns in the horizon
+    """
+    prefix = PrefixSums(returns_df)
+    n_days = len(prefix)
+    starts = np.array([horizon_start(prefix, h) for h in horizons])
+
+    n, annual_return, annual_vol, sharpe = prefix.window_stats(starts, np.full(len(starts), n_days))
+    drawdowns = np.vstack([prefix.max_drawdown(start) for start in starts])
+
+    metrics = {}
+    for j, series in enumerate(prefix.columns):
+        metrics[series] = {}
+        for i, horizon in enumerate(horizons):
+            if n[i, j] < 2:
+                metrics[series][horizon] = None
+                continue
+            values = (annual_return[i, j], annual_vol[i, j], sharpe[i, j], drawdowns[i, j])
+            metrics[series][horizon] = {name: float(value) for name, value in zip(METRIC_NAMES, values)}
+    return metrics
+
+
+def compute_rolling_metrics(returns_df, windows=ROLLING_WINDOWS):
+    """
+    Rolling annual return, volatility and Sharpe ratio for every series.
+
+    A window is reported only once it holds `window` valid returns, like the
+    pandas rolling default.
+
+    Returns:
+        DataFrame indexed like returns_df with '{series}_{window}d_{metric}' columns
+    """
+    prefix = PrefixSums(returns_df)
+    ends = np.arange(1, len(prefix) + 1)
+
+    frames = {}
+    for window in windows:
+        starts = np.maximum(ends - window, 0)
+        n, annual_return, annual_vol, sharpe = prefix.window_stats(starts, ends)
+        full = n == window
+        for metric, values in (('return', annual_return), ('vol', annual_vol), ('sharpe', sharpe)):
+            values = np.where(full, values, np.nan)
+            for j, series in enumerate(prefix.columns):
+                frames[f'{series}_{window}d_{metric}'] = values[:, j]
+
+    return pd.DataFrame(frames, index=returns_df.index)
+
+
+def portfolio_returns_frame(portfolio_df):
+    """Collect pair and portfolio daily returns into one frame named by series"""
+    pair_cols = [col for col in portfolio_df.columns
+                 if col.endswith('_return') and not col.endswith('_cum_return')
+                 and not col.startswith(('equal_weighted', 'inv_vol_weighted'))]
+    returns = {col[:-len('_return')]: portfolio_df[col] for col in pair_cols}
+    returns['equal_weighted'] = portfolio_df['equal_weighted_return']
+    returns['inv_vol_weighted'] = portfolio_df['inv_vol_weighted_return']
+    return pd.DataFrame(returns, index=portfolio_df.index)
@@ -1,8 +1,9 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import json
 import os
+from results_store import save_portfolio_results, save_risk_metrics
+from metrics_engine import compute_horizon_metrics, compute_rolling_metrics, portfolio_returns_frame
 
 def calculate_risk_metrics(returns):
     annual_return = (1 + returns.mean()) ** 252 - 1
@@ -101,48 +102,60 @@ def calculate_inv_vol_weights(row, pair_vols):
     
     return pd.Series(weights)
 
-def save_results(portfolio_df, pair_results, output_dir='results'):
+def save_results(portfolio_df, pair_results, output_dir='results', render_plot=False):
     os.makedirs(output_dir, exist_ok=True)
     
-    # Save portfolio results
-    portfolio_df.to_csv(f'{output_dir}/portfolio_results.csv')
+    # Rolling and multi-horizon metrics for every pair and both portfolios in one pass.
+    # Written before the portfolio results so a new results version never points at stale metrics.
+    returns_df = portfolio_returns_frame(portfolio_df)
+    horizon_metrics = compute_horizon_metrics(returns_df)
+    save_risk_metrics(horizon_metrics, compute_rolling_metrics(returns_df), output_dir)
+
+    # Save portfolio results (Feather for readers, CSV kept as an export)
+    save_portfolio_results(portfolio_df, output_dir)
     
     # Save performance metrics
     metrics = {
-        'equal_weighted': calculate_risk_metrics(portfolio_df['equal_weighted_return']),
-        'inverse_vol_weighted': calculate_risk_metrics(portfolio_df['inv_vol_weighted_return'])
+        'equal_weighted': horizon_metrics['equal_weighted']['full'],
+        'inverse_vol_weighted': horizon_metrics['inv_vol_weighted']['full']
     }
     
     with open(f'{output_dir}/performance_metrics.json', 'w') as f:
         json.dump(metrics, f, indent=4)
     
-    # Create visualization
-    create_performance_plot(portfolio_df, pair_results, output_dir)
+    # The dashboard renders the plot lazily, only render here when asked to
+    if render_plot:
+        create_performance_plot(portfolio_df, pair_results, output_dir)
+
+def create_performance_plot(portfolio_df, pair_names, output_dir, filename='portfolio_performance.png'):
+    # Object-oriented Figure API with the Agg canvas: no pyplot global state,
+    # so the dashboard can render from a worker thread
+    from matplotlib.figure import Figure
 
-def create_performance_plot(portfolio_df, pair_results, output_dir):
-    plt.figure(figsize=(15, 10))
+    fig = Figure(figsize=(15, 10))
+    ax = fig.add_subplot()
     
     # Plot individual pair returns
-    for pair_name in pair_results.keys():
+    for pair_name in pair_names:
         cum_returns = portfolio_df[f'{pair_name}_cum_return']
         valid_data = cum_returns.dropna()
         if not valid_data.empty:
-            plt.plot(valid_data.index, valid_data, alpha=0.3, linestyle='--', label=f'{pair_name}')
+            ax.plot(valid_data.index, valid_data, alpha=0.3, linestyle='--', label=f'{pair_name}')
     
     # Plot portfolio returns
-    plt.plot(portfolio_df['equal_weighted_cum_return'], 
-             linewidth=2, label='Equal-Weighted Portfolio', color='brown')
-    plt.plot(portfolio_df['inv_vol_weighted_cum_return'], 
-             linewidth=2, label='Inverse-Vol Weighted Portfolio', color='magenta')
-    
-    plt.title('Portfolio Performance')
-    plt.xlabel('Date')
-    plt.ylabel('Cumulative Return')
-    plt.legend(bbox_to_anchor=(0.5, -0.15), loc='lower center', ncol=3)
-    plt.grid(True)
-    plt.tight_layout()
-    
-    # Save and display the plot
-    plt.savefig(f'{output_dir}/portfolio_performance.png')
-    # plt.show()  # This will display the plot
-    plt.close()
\ No newline at end of file
+    ax.plot(portfolio_df['equal_weighted_cum_return'], 
+            linewidth=2, label='Equal-Weighted Portfolio', color='brown')
+    ax.plot(portfolio_df['inv_vol_weighted_cum_return'], 
+            linewidth=2, label='Inverse-Vol Weighted Portfolio', color='magenta')
+    
+    ax.set_title('Portfolio Performance')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Cumulative Return')
+    ax.legend(bbox_to_anchor=(0.5, -0.15), loc='lower center', ncol=3)
+    ax.grid(True)
+    fig.tight_layout()
+    
+    # Save the plot
+    path = os.path.join(output_dir, filename)
+    fig.savefig(path)
+    return path
@@ -0,0 +1,131 @@
+import os
+import json
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+RESULTS_FILE = 'portfolio_results.feather'
+RESULTS_CSV = 'portfolio_results.csv'
+ROLLING_METRICS_FILE = 'rolling_metrics.feather'
+RISK_METRICS_FILE = 'risk_metrics.json'
+DATE_COLUMN = 'date'
+
+
+def results_path(output_dir='results'):
+    return os.path.join(output_dir, RESULTS_FILE)
+
+
+def _write_feather(df, path):
+    """Write a date-indexed frame to an uncompressed Feather file atomically"""
+    df = df.copy()
+    df.index = pd.to_datetime(df.index)
+    df.index.name = DATE_COLUMN
+    df = df.reset_index()
+
+    tmp_path = f'{path}.tmp'
+    # Uncompressed so the file can be memory-mapped without decoding
+    feather.write_feather(df, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def _read_feather(path, columns=None):
+    if columns is not None:
+        columns = [DATE_COLUMN] + [col for col in columns if col != DATE_COLUMN]
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def save_portfolio_results(portfolio_df, output_dir='results', export_csv=True):
+    """
+    Save portfolio results as an uncompressed Arrow/Feather file.
+
+    The file is written to a temporary path and swapped in atomically so that
+    readers holding a memory map never see a partially written file. The CSV
+    is kept only as a human-readable export.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    path = results_path(output_dir)
+    _write_feather(portfolio_df, path)
+
+    if export_csv:
+        portfolio_df.to_csv(os.path.join(output_dir, RESULTS_CSV))
+
+    return path
+
+
+def results_version(output_dir='results'):
+    """
+    Return a version string for the stored results, or None if there are none.
+
+    The version changes whenever save_portfolio_results swaps in a new file,
+    so it can be used as a cache key by readers.
+    """
+    for name in (RESULTS_FILE, RESULTS_CSV):
+        try:
+            stat = os.stat(os.path.join(output_dir, name))
+        except FileNotFoundError:
+            continue
+        return f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+    return None
+
+
+def results_columns(output_dir='results'):
+    """Return the column names of the stored results without reading any data"""
+    path = results_path(output_dir)
+    if not os.path.exists(path):
+        csv_path = os.path.join(output_dir, RESULTS_CSV)
+        columns = pd.read_csv(csv_path, nrows=0).columns.tolist()
+        return [DATE_COLUMN] + columns[1:]
+
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def load_portfolio_results(output_dir='results', columns=None):
+    """
+    Load portfolio results with optional column projection.
+
+    Args:
+        output_dir: Directory holding the backtest results
+        columns: Optional list of columns to read, the date column is always included
+    Returns:
+        pd.DataFrame with a 'date' column followed by the requested columns
+    """
+    path = results_path(output_dir)
+    if os.path.exists(path):
+        return _read_feather(path, columns)
+
+    # Fall back to the CSV export for results written before the Feather format
+    csv_path = os.path.join(output_dir, RESULTS_CSV)
+    df = pd.read_csv(csv_path, parse_dates=[0])
+    df = df.rename(columns={df.columns[0]: DATE_COLUMN})
+    if columns is not None:
+        df = df[[DATE_COLUMN] + [col for col in columns if col != DATE_COLUMN]]
+    return df
+
+
+def save_risk_metrics(horizon_metrics, rolling_df, output_dir='results'):
+    """Save horizon metrics as JSON and the rolling metrics as Feather"""
+    os.makedirs(output_dir, exist_ok=True)
+    _write_feather(rolling_df, os.path.join(output_dir, ROLLING_METRICS_FILE))
+
+    path = os.path.join(output_dir, RISK_METRICS_FILE)
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump(horizon_metrics, f, indent=4)
+    os.replace(f'{path}.tmp', path)
+
+
+def load_risk_metrics(output_dir='results'):
+    with open(os.path.join(output_dir, RISK_METRICS_FILE), 'r') as f:
+        return json.load(f)
+
+
+def rolling_metrics_columns(output_dir='results'):
+    path = os.path.join(output_dir, ROLLING_METRICS_FILE)
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def load_rolling_metrics(output_dir='results', columns=None):
+    """Load rolling metrics with optional column projection"""
+    return _read_feather(os.path.join(output_dir, ROLLING_METRICS_FILE), columns)
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Select points with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are always kept. The points in between are split
+    into threshold - 2 buckets, and from each bucket the point forming the
+    largest triangle with the previously selected point and the average of the
+    next bucket is kept. This preserves peaks and troughs far better than
+    taking every n-th point.
+
+    Args:
+        x: 1-D array of increasing x values
+        y: 1-D array of y values, same length as x
+        threshold: Number of points to return
+    Returns:
+        np.ndarray of selected integer positions, in increasing order
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket boundaries over the interior points 1..n-2
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket, or the last point for the final bucket
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Twice the triangle area for every candidate in the bucket at once
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+
+    return selected
+
+
+def downsample_series(dates, values, points):
+    """
+    Downsample a date-indexed series to at most `points` points with LTTB.
+
+    NaN values are dropped first so series that start late are not distorted.
+
+    Returns:
+        tuple of (dates, values) arrays
+    """
+    dates = np.asarray(dates)
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    dates, values = dates[valid], values[valid]
+    if len(values) == 0:
+        return dates, values
+
+    x = dates.astype('datetime64[ns]').astype(np.int64).astype(float)
+    idx = lttb_indices(x, values, points)
+    return dates[idx], values[idx]
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Service modules are imported flat, the way the service runs them
+PAIRS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PAIRS_DIR)
+sys.path.insert(0, os.path.join(PAIRS_DIR, 'dashboard'))
@@ -0,0 +1,101 @@
+import concurrent.futures
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    # The app creates its signal store relative to the working directory on import
+    monkeypatch.chdir(tmp_path)
+    import app
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(app, 'option_chain_pool', pool)
+    monkeypatch.setattr(app, 'OPTION_CHAIN_TIMEOUT', 0.2)
+    monkeypatch.setattr(app, 'get_next_option_expiry', lambda date, which: '2026-10-23')
+    yield app
+    app.option_chain_pool.shutdown(wait=False)
+
+
+def options_signals(ticker):
+    return pd.DataFrame([{
+        'pair': f'{ticker}/SPY',
+        'trade_type': 'options',
+        'timestamp': '2026-10-19 15:50:00',
+        'expiry': 'this_week',
+        'ticker1_price': 100.0,
+        'option_type': 'put'
+    }])
+
+
+def test_blocked_lookup_does_not_starve_later_requests(dashboard, monkeypatch):
+    release = threading.Event()
+
+    def validate_option_strike(ticker, current_price, expiry_date, option_type='put'):
+        if ticker == 'STUCK':
+            release.wait(5)
+        return 90.0, 1.25
+
+    monkeypatch.setattr(dashboard, 'validate_option_strike', validate_option_strike)
+    try:
+        strikes, timed_out = dashboard.lookup_option_strikes(options_signals('STUCK'))
+        assert timed_out == 1
+        assert strikes[0] == ('2026-10-23', None, None)
+
+        # The only worker of the original pool is still blocked
+        strikes, timed_out = dashboard.lookup_option_strikes(options_signals('AAPL'))
+        assert timed_out == 0
+        assert strikes[0] == ('2026-10-23', 90.0, 1.25)
+    finally:
+        release.set()
+
+
+def test_previous_signals_file_is_imported_once(dashboard, tmp_path, monkeypatch):
+    from signal_store import SignalStore
+    store = SignalStore(str(tmp_path / 'signals.db'))
+    monkeypatch.setattr(dashboard, 'signal_store', store)
+    path = tmp_path / 'previous_signals.csv'
+    path.write_text('timestamp,trade_type,pair,position\n'
+                    '2024-12-27 23:31:17.104963-05:00,pairs,NVDA/AMD,1.0\n'
+                    '2024-12-27 23:31:17.104963-05:00,options,MSTR/IBIT,-1.0\n')
+
+    assert dashboard.import_previous_signals(str(path))
+    assert not dashboard.import_previous_signals(str(path))
+
+    previous = store.previous('pairs')
+    assert (previous['trading_date'], previous['run_ts']) == ('2024-12-27', '2024-12-27T23:31:17')
+    assert [row['pair'] for row in previous['payload']] == ['NVDA/AMD', 'MSTR/IBIT']
+
+
+def test_order_plans_for_one_key_are_built_one_at_a_time(dashboard, monkeypatch):
+    signals = options_signals('AAPL')
+    monkeypatch.setattr(dashboard.signal_index, 'load', lambda date: (signals, 'run-1'))
+    monkeypatch.setattr(dashboard, 'results_version', lambda directory: 'v1')
+    monkeypatch.setattr(dashboard, 'scale_orders', lambda plan, capital: [])
+    started = [threading.Event() for _ in range(3)]
+    running, overlap = [], []
+
+    def prepare_orders(signals_df):
+        started[len(overlap)].set()
+        running.append(1)
+        overlap.append(len(running))
+        time.sleep(0.2)
+        running.pop()
+        # Timed out chain lookups keep the plan out of the cache
+        return {'signals': signals_df, 'complete': False}
+
+    monkeypatch.setattr(dashboard, 'prepare_orders', prepare_orders)
+    threads = [threading.Thread(target=dashboard.get_orders, args=('2026-10-19', 100000)) for _ in range(3)]
+    threads[0].start()
+    started[0].wait(5)
+    threads[1].start()
+    # The third request arrives after the first finished, while the second builds its plan
+    started[1].wait(5)
+    threads[2].start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(overlap) == 3 and max(overlap) == 1
+    assert dashboard._order_plan_key_locks == {}
@@ -0,0 +1,29 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import data_utils
+
+
+def test_downloads_are_serialized(monkeypatch):
+    index = pd.date_range('2026-10-12', periods=5)
+    active, overlap = [], []
+
+    def fake_download(ticker, **kwargs):
+        active.append(ticker)
+        overlap.append(len(active))
+        time.sleep(0.02)
+        active.remove(ticker)
+        return pd.DataFrame({'Adj Close': np.arange(1.0, 6.0)}, index=index)
+
+    monkeypatch.setattr(data_utils.yf, 'download', fake_download)
+    threads = [threading.Thread(target=data_utils.prepare_pair_data, args=('AAPL', 'MSFT', None, None))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(overlap) == 1
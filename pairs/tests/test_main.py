@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+import main
+from portfolio_utils import calculate_risk_metrics
+
+
+def pair_result(returns):
+    return {'strategy_returns': pd.DataFrame({'total_return': returns}), 'signals': pd.DataFrame()}
+
+
+def test_pair_lines_use_each_pairs_strategy_returns(capsys):
+    rng = np.random.default_rng(7)
+    first = pd.Series(rng.normal(0, 0.01, 300), index=pd.bdate_range('2024-01-01', periods=300))
+    second = pd.Series(rng.normal(0, 0.02, 200), index=pd.bdate_range('2024-04-01', periods=200))
+    first.iloc[0] = np.nan
+    dates = first.index.union(second.index)
+    portfolio_df = pd.DataFrame({
+        'equal_weighted_return': first.reindex(dates).fillna(0),
+        'inv_vol_weighted_return': first.reindex(dates).fillna(0),
+        'active_pairs': 1
+    }, index=dates)
+
+    main.print_summary(portfolio_df, {
+        'AAA/BBB': pair_result(first),
+        'CCC/DDD': pair_result(second),
+        'EEE/FFF': pair_result(first.iloc[:2])
+    })
+    output = capsys.readouterr().out
+    pairs = output[output.index('Individual Pair Performance'):output.index('Portfolio Performance')]
+
+    for name, returns in (('AAA/BBB', first), ('CCC/DDD', second)):
+        metrics = calculate_risk_metrics(returns)
+        assert f"{name}:\n  Annual Return: {metrics['Annual Return']:.2%}" in pairs
+        assert f"Max Drawdown: {metrics['Max Drawdown']:.2%}" in pairs
+    assert 'EEE/FFF: skipped, fewer than two strategy returns' in pairs
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from metrics_engine import HORIZONS, TRADING_DAYS, compute_horizon_metrics, compute_rolling_metrics
+from portfolio_utils import calculate_risk_metrics
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(42)
+    index = pd.bdate_range('2023-06-01', periods=400)
+    frame = pd.DataFrame({
+        'steady': rng.normal(0.0005, 0.01, len(index)),
+        'late': rng.normal(0.0, 0.02, len(index)),
+        'gappy': rng.normal(-0.0002, 0.015, len(index)),
+    }, index=index)
+    # A pair that starts trading later and one with missing days
+    frame.iloc[:150, 1] = np.nan
+    frame.iloc[::17, 2] = np.nan
+    return frame
+
+
+def assert_metrics_close(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name, value in expected.items():
+        assert actual[name] == pytest.approx(value, rel=1e-9, abs=1e-12), name
+
+
+def test_horizon_metrics_match_calculate_risk_metrics(returns):
+    metrics = compute_horizon_metrics(returns, horizons=('full', 'YTD', '1y'))
+
+    ytd = returns.index[returns.index >= pd.Timestamp(year=returns.index[-1].year, month=1, day=1)]
+    windows = {'full': returns, 'YTD': returns.loc[ytd], '1y': returns.iloc[-HORIZONS['1y']:]}
+    for series in returns.columns:
+        for horizon, window in windows.items():
+            assert_metrics_close(metrics[series][horizon], calculate_risk_metrics(window[series]))
+
+
+def test_horizon_metrics_need_two_returns(returns):
+    returns = returns.copy()
+    returns.iloc[:-1, 0] = np.nan
+
+    metrics = compute_horizon_metrics(returns, horizons=('full',))
+
+    assert metrics['steady']['full'] is None
+
+
+def test_rolling_metrics_match_pandas_rolling(returns):
+    rolling = compute_rolling_metrics(returns, windows=(21, 63))
+
+    for series in returns.columns:
+        for window in (21, 63):
+            reference = returns[series].rolling(window)
+            annual_return = (1 + reference.mean()) ** TRADING_DAYS - 1
+            annual_vol = reference.std() * np.sqrt(TRADING_DAYS)
+            sharpe = annual_return / annual_vol
+            for metric, expected in (('return', annual_return), ('vol', annual_vol), ('sharpe', sharpe)):
+                actual = rolling[f'{series}_{window}d_{metric}']
+                pd.testing.assert_series_equal(actual, expected, check_names=False, rtol=1e-7, atol=1e-10)
@@ -0,0 +1,82 @@
+import threading
+from datetime import datetime
+
+import pytz
+
+from quote_snapshot import ProxySessions, QuoteSnapshot, market_open
+
+EASTERN = pytz.timezone('US/Eastern')
+
+
+def eastern(*args):
+    return EASTERN.localize(datetime(*args)).timestamp()
+
+
+def test_put_during_refresh_is_kept():
+    fetching, release = threading.Event(), threading.Event()
+
+    def fetch(batch, session):
+        fetching.set()
+        release.wait(5)
+        return {'AAPL': (100.0, 0), 'MSFT': (400.0, 0)}
+
+    quotes = QuoteSnapshot(lambda: ['AAPL', 'MSFT'], fetch=fetch)
+    refresh = threading.Thread(target=quotes.refresh)
+    refresh.start()
+    fetching.wait(5)
+    # Published by a reader while the refresh is downloading
+    quotes.put({'SPY': 500.0})
+    release.set()
+    refresh.join(5)
+
+    snapshot = quotes.snapshot()
+    assert snapshot.price('SPY') == 500.0
+    assert snapshot.price('AAPL') == 100.0
+    assert snapshot.price('MSFT') == 400.0
+
+
+def test_market_open_follows_the_exchange_calendar():
+    assert market_open(eastern(2026, 10, 19, 10, 0))
+    assert not market_open(eastern(2026, 10, 19, 9, 29))
+    assert not market_open(eastern(2026, 10, 19, 16, 0))
+    # Saturday and Thanksgiving
+    assert not market_open(eastern(2026, 10, 17, 12, 0))
+    assert not market_open(eastern(2026, 11, 26, 12, 0))
+
+
+def test_refreshes_are_spaced_out_while_inactive(monkeypatch):
+    active = [False]
+    quotes = QuoteSnapshot(lambda: ['AAPL'], interval=60, idle_interval=3600,
+                           fetch=lambda batch, session: {'AAPL': (100.0, 0)}, active=lambda: active[0])
+    assert quotes.due()
+    quotes.refresh()
+    assert not quotes.due()
+
+    active[0] = True
+    assert quotes.due()
+
+    active[0] = False
+    now = quotes._refreshed_at + 3600
+    monkeypatch.setattr('quote_snapshot.time.time', lambda: now)
+    assert quotes.due()
+
+
+def test_proxy_sessions_rotate_through_the_proxies():
+    calls = []
+
+    def get_proxies():
+        calls.append(1)
+        return ['http://proxy1:80', 'http://proxy2:80']
+
+    sessions = ProxySessions(get_proxies)
+    proxies = [sessions().proxies.get('https') for _ in range(3)]
+
+    assert proxies == ['http://proxy1:80', 'http://proxy2:80', 'http://proxy1:80']
+    assert len(calls) == 1
+
+
+def test_proxy_sessions_go_direct_without_proxies():
+    def get_proxies():
+        raise ValueError('Failed to fetch proxies')
+
+    assert ProxySessions(get_proxies)().proxies == {}
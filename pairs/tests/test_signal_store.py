@@ -0,0 +1,31 @@
+import time
+
+import pytest
+
+from signal_store import SignalStore
+
+
+@pytest.fixture
+def utc_server(monkeypatch):
+    monkeypatch.setenv('TZ', 'UTC')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_imported_runs_sort_with_new_runs(tmp_path, utc_server):
+    signals_dir = tmp_path / 'signals'
+    signals_dir.mkdir()
+    # Written by the old job at 15:50 US/Eastern on a server running in UTC
+    (signals_dir / 'live_signals_20261019_195000.csv').write_text('pair\nAAPL/MSFT\n')
+
+    store = SignalStore(str(tmp_path / 'signals.db'))
+    assert store.backfill('pairs', str(signals_dir), lambda path: ['legacy'], local_time=True) == 1
+    new_id = store.append('pairs', '2026-10-19', ['new'], run_ts='2026-10-19T15:55:00')
+
+    imported = store.runs('pairs')[0]
+    assert (imported['trading_date'], imported['run_ts']) == ('2026-10-19', '2026-10-19T15:50:00')
+    assert store.latest('pairs')['id'] == new_id
+    assert store.latest('pairs', '2026-10-19')['payload'] == ['new']
+    assert [run['payload'] for run in store.runs('pairs')] == [['legacy'], ['new']]
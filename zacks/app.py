@@ -2,6 +2,7 @@ from flask import Flask, jsonify
 import requests
 import yfinance as yf
 import pandas as pd
+import numpy as np
 from scipy.stats import zscore
 from pandas_market_calendars import get_calendar
 from datetime import datetime, timedelta
@@ -9,14 +10,19 @@ from itertools import cycle
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 import time
+import functools
+import threading
+from collections import OrderedDict
 import random
 import logging
 import config
 import concurrent.futures
 import json
-import glob
 import pytz
 import os
+from stage_timer import timed_run, stage, record_retry, bind
+from signal_store import SignalStore
+from quote_snapshot import QuoteSnapshot, ProxySessions, market_open
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -24,6 +30,23 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+def load_json(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# Portfolio runs, with any legacy JSON files imported on first start
+signal_store = SignalStore(config.SIGNAL_DB_PATH)
+signal_store.backfill(config.SIGNAL_STRATEGY, 'signals', load_json)
+
+def held_tickers():
+    """Long and short tickers of the portfolios that can still be held"""
+    start_date = (datetime.now() - timedelta(weeks=config.HELD_PORTFOLIO_WEEKS)).strftime('%Y-%m-%d')
+    tickers = set()
+    for run in signal_store.runs(config.SIGNAL_STRATEGY, start_date=start_date, latest_only=True):
+        tickers.update(run['payload']['portfolio']['long'])
+        tickers.update(run['payload']['portfolio']['short'])
+    return tickers
+
 def get_proxies():
     proxy_url = f"https://proxy.webshare.io/api/v2/proxy/list/download/{config.WEBSHARE_API_KEY}/-/any/sourceip/direct/-/"
     response = requests.get(proxy_url)
@@ -33,7 +56,27 @@ def get_proxies():
     else:
         raise ValueError(f"Failed to fetch proxies. Status code: {response.status_code}")
 
+# Last prices of the held tickers, refreshed in the background through the proxies
+quote_snapshot = QuoteSnapshot(
+    held_tickers,
+    interval=config.QUOTE_REFRESH_INTERVAL,
+    batch_size=config.QUOTE_BATCH_SIZE,
+    session_factory=ProxySessions(get_proxies),
+    active=market_open,
+    idle_interval=config.QUOTE_IDLE_INTERVAL
+)
+
 def get_last_trading_days(weeks=1, end_date=None):
+    if isinstance(end_date, str):
+        # The calendar of a given date never changes, so string dates are cached
+        return list(_last_trading_days_for_date(weeks, end_date))
+    return _last_trading_days(weeks, end_date)
+
+@functools.lru_cache(maxsize=256)
+def _last_trading_days_for_date(weeks, end_date):
+    return tuple(_last_trading_days(weeks, end_date))
+
+def _last_trading_days(weeks, end_date):
     nyse = get_calendar('NYSE')
     eastern = pytz.timezone('US/Eastern')
     
@@ -76,6 +119,7 @@ def get_last_trading_days(weeks=1, end_date=None):
     return list(reversed(weekly_last_days))
 
 def fetch_stock_data(args):
+    """Market cap and turnover for one ticker from stock.info and its history, for tickers the batched path missed"""
     ticker, proxy_pool = args
     logger.info(f"Starting to fetch data for {ticker}")
     for attempt in range(config.MAX_RETRIES):
@@ -88,11 +132,13 @@ def fetch_stock_data(args):
                 session.proxies = {'http': proxy, 'https': proxy}
 
             stock = yf.Ticker(ticker, session=session)
-            info = stock.info
+            with stage('fetch'):
+                info = stock.info
 
             if info.get('marketCap', 0) > 0:
                 try:
-                    hist = stock.history(period="3mo")
+                    with stage('fetch'):
+                        hist = stock.history(period="3mo")
                     avg_turnover = hist['Volume'].mean() * hist['Close'].mean() if not hist.empty else 0
                 except Exception as hist_error:
                     logger.warning(f"HISTORY ERROR: {ticker} - {str(hist_error)}")
@@ -104,6 +150,7 @@ def fetch_stock_data(args):
             else:
                 if attempt < config.MAX_RETRIES - 1:
                     logger.warning(f"{ticker} - No market cap data on attempt {attempt + 1}, retrying...")
+                    record_retry('fetch')
                     time.sleep(random.uniform(3, 6))
                     continue
                 logger.warning(f"FAILED TICKER: {ticker} - No market cap data after {config.MAX_RETRIES} attempts")
@@ -112,6 +159,7 @@ def fetch_stock_data(args):
         except Exception as e:
             if attempt < config.MAX_RETRIES - 1:
                 logger.error(f"{ticker} - Error on attempt {attempt + 1}: {str(e)}, retrying...")
+                record_retry('fetch')
                 time.sleep(random.uniform(3, 6))
                 continue
             else:
@@ -120,38 +168,80 @@ def fetch_stock_data(args):
 
     return ticker, 0, 0
 
-def calculate_scores_and_rank(data):
-    df = pd.DataFrame(data, columns=['Ticker', 'MarketCap', 'AvgTurnover'])
-    # Filter out entries with zero values
-    df = df[(df['MarketCap'] > 0) & (df['AvgTurnover'] > 0)]
-    
-    if len(df) > 0:
-        df['MarketCapZ'] = zscore(df['MarketCap'])
-        df['AvgTurnoverZ'] = zscore(df['AvgTurnover'])
-        df['FinalScore'] = (df['MarketCapZ'] + df['AvgTurnoverZ']) / 2
-        return df.sort_values(by='FinalScore', ascending=False).head(800)['Ticker'].tolist()
-    return []
-
-def save_portfolio_to_json(portfolio_data):
-    # Create signals directory if it doesn't exist
-    os.makedirs('signals', exist_ok=True)
-    
+def download_turnover(tickers, proxies):
+    """
+    Average daily turnover over 3 months for many tickers, in batched volume and close downloads
+    Matches the per-ticker hist['Volume'].mean() * hist['Close'].mean().
+    Returns:
+        dict of {ticker: avg_turnover} for tickers that returned data
+    """
+    proxy_pool = cycle(proxies)
+    turnover = {}
+    for start in range(0, len(tickers), config.DOWNLOAD_BATCH_SIZE):
+        batch = tickers[start:start + config.DOWNLOAD_BATCH_SIZE]
+        batch_number = start // config.DOWNLOAD_BATCH_SIZE + 1
+        for attempt in range(config.MAX_RETRIES):
+            try:
+                proxy = next(proxy_pool)
+                session = requests.Session()
+                if proxy:
+                    session.proxies = {'http': proxy, 'https': proxy}
+
+                with stage('fetch'):
+                    data = yf.download(batch, period='3mo', auto_adjust=True,
+                                       progress=False, threads=True, session=session)
+                if data is None or data.empty:
+                    raise ValueError("no data returned")
+
+                volume, close = data['Volume'], data['Close']
+                if isinstance(close, pd.Series):
+                    volume, close = volume.to_frame(batch[0]), close.to_frame(batch[0])
+                batch_turnover = volume.mean() * close.mean()
+                turnover.update(batch_turnover[batch_turnover > 0].to_dict())
+                logger.info(f"Turnover batch {batch_number}: {int((batch_turnover > 0).sum())}/{len(batch)} tickers")
+                break
+
+            except Exception as e:
+                if attempt < config.MAX_RETRIES - 1:
+                    logger.error(f"Turnover batch {batch_number} - Error on attempt {attempt + 1}: {str(e)}, retrying...")
+                    record_retry('fetch')
+                    time.sleep(random.uniform(3, 6))
+                    continue
+                logger.error(f"Turnover batch {batch_number} - Error after {config.MAX_RETRIES} attempts: {str(e)}")
+    return turnover
+
+def calculate_scores_and_rank(tickers, market_cap, avg_turnover, top_n=800):
+    """
+    Rank tickers by the mean of their market cap and turnover z-scores
+    Args:
+        tickers: Ticker symbols
+        market_cap: Market caps, aligned with tickers
+        avg_turnover: Average daily turnovers, aligned with tickers
+    Returns:
+        list of the top_n tickers, best first
+    """
+    tickers = np.asarray(tickers, dtype=object)
+    market_cap = np.asarray(market_cap, dtype=float)
+    avg_turnover = np.asarray(avg_turnover, dtype=float)
+
+    # Filter out entries with missing or zero values
+    valid = (market_cap > 0) & (avg_turnover > 0)
+    if not valid.any():
+        return []
+
+    score = (zscore(market_cap[valid]) + zscore(avg_turnover[valid])) / 2
+    order = np.argsort(-score, kind='stable')[:top_n]
+    return tickers[valid][order].tolist()
+
+def save_portfolio(portfolio_data):
     # Use the date from portfolio_data instead of current time
     trading_date = portfolio_data['date']  # This is the actual trading date
-    
-    # Get current time in US Eastern for the timestamp part
-    eastern = pytz.timezone('US/Eastern')
-    current_time = datetime.now(eastern)
-    
-    # Format filename using trading date but current time for uniqueness
-    filename = f"signals/live_signals_{trading_date.replace('-', '')}_{current_time.strftime('%H%M%S')}.json"
-    
-    # Save to file
-    with open(filename, 'w') as f:
-        json.dump(portfolio_data, f)
-    
-    logger.info(f"Saved portfolio to {filename}")
-    return filename
+
+    # Append to the signal store, stamped with the current US Eastern time
+    run_id = signal_store.append(config.SIGNAL_STRATEGY, trading_date, portfolio_data)
+
+    logger.info(f"Saved portfolio for {trading_date} to the signal store (run {run_id})")
+    return run_id
 
 def init_scheduler():
     if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
@@ -160,8 +250,10 @@ def init_scheduler():
 
         def scheduled_job():
             try:
-                result = main()
-                save_portfolio_to_json(result)
+                with timed_run('zacks_portfolio', config.TIMINGS_DIR):
+                    result = main()
+                    with stage('persist'):
+                        save_portfolio(result)
             except Exception as e:
                 logger.error(f"Error in scheduled job: {e}")
 
@@ -177,6 +269,7 @@ def init_scheduler():
         )
 
         scheduler.start()
+        quote_snapshot.start()
         return scheduler
     return None
 
@@ -186,7 +279,8 @@ def main():
         # Set up proxy pool
         try:
             logger.info("Fetching proxies...")
-            proxies = get_proxies()
+            with stage('fetch'):
+                proxies = get_proxies()
             if not proxies:
                 raise ValueError("No proxies fetched")
             logger.info(f"Successfully fetched {len(proxies)} proxies")
@@ -197,31 +291,44 @@ def main():
 
         # Get universe from zacks_data service
         logger.info("Fetching universe from zacks_data service...")
-        response = requests.get(f'{config.ZACKS_DATA_URL}/tickers')
-        universe_data = response.json()
+        with stage('fetch'):
+            response = requests.get(f'{config.ZACKS_DATA_URL}/tickers')
+            universe_data = response.json()
         tickers = [stock['symbol'] for stock in universe_data['stocks']]
         logger.info(f"Fetched {len(tickers)} tickers from universe")
 
+        # Market cap from the universe data, turnover from batched downloads
+        market_caps = {stock['symbol']: float(stock.get('market_cap') or 0) for stock in universe_data['stocks']}
+        logger.info(f"Downloading turnover for {len(tickers)} tickers in batches of {config.DOWNLOAD_BATCH_SIZE}...")
+        turnover = download_turnover(tickers, proxies)
+
+        stock_data = [
+            (ticker, market_caps[ticker], turnover[ticker])
+            for ticker in tickers
+            if market_caps.get(ticker, 0) > 0 and ticker in turnover
+        ]
+        missing = [ticker for ticker in tickers if market_caps.get(ticker, 0) <= 0 or ticker not in turnover]
+        logger.info(f"Batched data for {len(stock_data)} tickers, {len(missing)} fall back to per-ticker fetches")
+
         # Create tasks list with tickers and proxy pools
         tasks = []
         # Advance the cycle differently for each ticker
-        for i, ticker in enumerate(tickers):
+        for i, ticker in enumerate(missing):
             # Create a new cycle starting from a different position for each ticker
             shifted_proxies = proxies[i % len(proxies):] + proxies[:i % len(proxies)]
             tasks.append((ticker, cycle(shifted_proxies)))
 
         # Process tickers concurrently
-        logger.info(f"Processing {len(tickers)} tickers with {config.MAX_WORKERS} workers...")
-        stock_data = []
+        logger.info(f"Processing {len(tasks)} tickers with {config.MAX_WORKERS} workers...")
         successful_downloads = 0
         failed_downloads = 0
         with concurrent.futures.ThreadPoolExecutor(max_workers=config.MAX_WORKERS) as executor:
-            futures = [executor.submit(fetch_stock_data, task) for task in tasks]
+            futures = [executor.submit(bind(fetch_stock_data), task) for task in tasks]
             completed = 0
             for future in concurrent.futures.as_completed(futures):
                 completed += 1
                 if completed % 10 == 0:
-                    logger.info(f"Progress: {completed}/{len(tickers)} tickers processed")
+                    logger.info(f"Progress: {completed}/{len(tasks)} tickers processed")
                 result = future.result()
                 if result and result[1] > 0 and result[2] > 0:
                     successful_downloads += 1
@@ -233,23 +340,27 @@ def main():
 
         # Calculate scores and get top tickers
         logger.info("Calculating scores and ranking stocks...")
-        top_tickers = calculate_scores_and_rank(stock_data)
+        with stage('ranking'):
+            symbols, market_cap, avg_turnover = zip(*stock_data) if stock_data else ((), (), ())
+            top_tickers = calculate_scores_and_rank(symbols, market_cap, avg_turnover)
         logger.info(f"Found {len(top_tickers)} qualified stocks")
 
         # Get last trading day
         logger.info("Getting last trading day...")
-        trading_days = get_last_trading_days(1)
+        with stage('calendar'):
+            trading_days = get_last_trading_days(1)
         logger.info(f"Trading day: {trading_days[0]}")
 
         # Get portfolio for the date
         portfolios = {}
         date = trading_days[0]
         logger.info(f"Fetching portfolio for date: {date}")
-        response = requests.post(
-            f'{config.ZACKS_DATA_URL}/portfolio/{date}',
-            json={'tickers': top_tickers}
-        )
-        portfolio = response.json()['portfolio']
+        with stage('fetch'):
+            response = requests.post(
+                f'{config.ZACKS_DATA_URL}/portfolio/{date}',
+                json={'tickers': top_tickers}
+            )
+            portfolio = response.json()['portfolio']
         logger.info(f"Portfolio for {date}:")
         logger.info(f"Long positions ({len(portfolio['long'])} stocks): {', '.join(portfolio['long'])}")
         logger.info(f"Short positions ({len(portfolio['short'])} stocks): {', '.join(portfolio['short'])}")
@@ -267,62 +378,86 @@ def main():
         logger.error(f"Error in main function: {str(e)}")
         raise
 
+def aggregate_position_weights(portfolios):
+    """Equal-weighted overlap of the portfolios, each half long and half short"""
+    position_weights = {}
+    for portfolio in portfolios:
+        portfolio_weight = 1.0 / len(portfolios)  # Equal weight for each portfolio
+
+        # Calculate weights within the portfolio
+        long_stocks = portfolio['portfolio']['long']
+        short_stocks = portfolio['portfolio']['short']
+
+        # Equal weight between long and short sides
+        if long_stocks:  # Only process if there are long positions
+            stock_weight = portfolio_weight * 0.5 / len(long_stocks)  # Half of portfolio weight divided by number of stocks
+            for ticker in long_stocks:
+                position_weights[ticker] = position_weights.get(ticker, 0) + stock_weight
+
+        if short_stocks:  # Only process if there are short positions
+            stock_weight = portfolio_weight * 0.5 / len(short_stocks)  # Half of portfolio weight divided by number of stocks
+            for ticker in short_stocks:
+                position_weights[ticker] = position_weights.get(ticker, 0) - stock_weight
+    return position_weights
+
+# Aggregated weights keyed by the ids of the portfolio runs they were built from.
+# Runs are append-only, so a new run for any of the dates gives a new key.
+position_weights_cache = OrderedDict()
+position_weights_lock = threading.Lock()
+
+def get_position_weights(trading_days):
+    """
+    Aggregated position weights of the latest portfolio runs for the trading days
+    Returns:
+        dict of {ticker: weight}, or None if there are no portfolios
+    """
+    # Run ids only; payloads are loaded on a cache miss
+    runs = signal_store.latest_by_date(config.SIGNAL_STRATEGY, trading_days, include_payload=False)
+    run_ids = tuple(runs[trade_date]['id'] for trade_date in trading_days if trade_date in runs)
+    if not run_ids:
+        return None
+
+    with position_weights_lock:
+        weights = position_weights_cache.get(run_ids)
+        if weights is not None:
+            position_weights_cache.move_to_end(run_ids)
+            return weights
+
+    portfolios = [signal_store.get(run_id)['payload'] for run_id in run_ids]
+    weights = aggregate_position_weights(portfolios)
+    with position_weights_lock:
+        position_weights_cache[run_ids] = weights
+        while len(position_weights_cache) > config.ALLOCATION_CACHE_SIZE:
+            position_weights_cache.popitem(last=False)
+    return weights
+
 @app.route('/signals/<date>/<int:capital>')
 def get_signals_with_allocation(date, capital):
     try:
         # Get last three trading days ending at the specified date
         trading_days = get_last_trading_days(weeks=3, end_date=date)
-        
-        # Find portfolio files for these dates
-        portfolios = []
-        for trade_date in trading_days:
-            date_str = trade_date.replace('-', '')
-            pattern = f'signals/live_signals_{date_str}_*.json'
-            matching_files = glob.glob(pattern)
-            
-            if matching_files:
-                latest_file = max(matching_files)  # Get the latest file for this date
-                with open(latest_file, 'r') as f:
-                    portfolio = json.load(f)
-                    portfolios.append(portfolio)
-        
-        if not portfolios:
+
+        # Cached per set of portfolio runs; capital only scales the weights below
+        position_weights = get_position_weights(trading_days)
+        if not position_weights:
             return jsonify({
                 "message": "Signals not ready for the requested date",
                 "status": "pending"
             }), 404
-            
-        # Calculate aggregated positions
-        position_weights = {}
-        for portfolio in portfolios:
-            portfolio_weight = 1.0 / len(portfolios)  # Equal weight for each portfolio
-            
-            # Calculate weights within the portfolio
-            long_stocks = portfolio['portfolio']['long']
-            short_stocks = portfolio['portfolio']['short']
-            
-            # Equal weight between long and short sides
-            if long_stocks:  # Only process if there are long positions
-                stock_weight = portfolio_weight * 0.5 / len(long_stocks)  # Half of portfolio weight divided by number of stocks
-                for ticker in long_stocks:
-                    position_weights[ticker] = position_weights.get(ticker, 0) + stock_weight
-            
-            if short_stocks:  # Only process if there are short positions
-                stock_weight = portfolio_weight * 0.5 / len(short_stocks)  # Half of portfolio weight divided by number of stocks
-                for ticker in short_stocks:
-                    position_weights[ticker] = position_weights.get(ticker, 0) - stock_weight
-        
-        # Set up proxy pool
-        try:
-            logger.info("Fetching proxies for price data...")
-            proxies = get_proxies()
-            if not proxies:
-                raise ValueError("No proxies fetched")
-            logger.info(f"Successfully fetched {len(proxies)} proxies")
-        except Exception as e:
-            logger.error(f"Error setting up proxies: {e}")
-            logger.info("Falling back to no proxy")
-            proxies = [None]
+
+        def size_position(ticker, weight, current_price):
+            dollar_allocation = capital * weight
+            shares = int(dollar_allocation / current_price)
+
+            if shares != 0:
+                return {
+                    "ticker": ticker,
+                    "shares": shares,
+                    "price": current_price,
+                    "weight": weight,
+                    "allocation": shares * current_price
+                }
+            return None
 
         def fetch_price_data(args):
             ticker, weight, proxy_pool = args
@@ -336,19 +471,9 @@ def get_signals_with_allocation(date, capital):
 
                     stock = yf.Ticker(ticker, session=session)
                     current_price = stock.fast_info['lastPrice']
-                    
-                    dollar_allocation = capital * weight
-                    shares = int(dollar_allocation / current_price)
-                    
-                    if shares != 0:
-                        return {
-                            "ticker": ticker,
-                            "shares": shares,
-                            "price": current_price,
-                            "weight": weight,
-                            "allocation": shares * current_price
-                        }
-                    return None
+                    # Share the live price with other requests until the next refresh
+                    quote_snapshot.put({ticker: current_price})
+                    return size_position(ticker, weight, current_price)
 
                 except Exception as e:
                     if attempt < config.MAX_RETRIES - 1:
@@ -359,15 +484,44 @@ def get_signals_with_allocation(date, capital):
                     return None
             return None
 
+        # Price positions from one consistent quote snapshot
+        snapshot = quote_snapshot.snapshot(list(position_weights))
+        positions = []
+        unquoted = {}
+        for ticker, weight in position_weights.items():
+            current_price = snapshot.price(ticker, max_age=config.QUOTE_MAX_AGE)
+            if current_price is None:
+                unquoted[ticker] = weight
+                continue
+            position = size_position(ticker, weight, current_price)
+            if position:
+                positions.append(position)
+        logger.info(f"Priced {len(position_weights) - len(unquoted)} positions from the quote snapshot, "
+                    f"{len(unquoted)} need live prices")
+        quote_snapshot.track(unquoted)
+
+        # Set up proxy pool, only needed for tickers the snapshot could not price
+        proxies = [None]
+        if unquoted:
+            try:
+                logger.info("Fetching proxies for price data...")
+                proxies = get_proxies()
+                if not proxies:
+                    raise ValueError("No proxies fetched")
+                logger.info(f"Successfully fetched {len(proxies)} proxies")
+            except Exception as e:
+                logger.error(f"Error setting up proxies: {e}")
+                logger.info("Falling back to no proxy")
+                proxies = [None]
+
         # Create tasks list with tickers and proxy pools
         tasks = []
-        for i, (ticker, weight) in enumerate(position_weights.items()):
+        for i, (ticker, weight) in enumerate(unquoted.items()):
             # Create a new cycle starting from a different position for each ticker
             shifted_proxies = proxies[i % len(proxies):] + proxies[:i % len(proxies)]
             tasks.append((ticker, weight, cycle(shifted_proxies)))
 
         # Process tickers concurrently
-        positions = []
         successful_fetches = 0
         failed_fetches = 0
         
@@ -391,7 +545,8 @@ def get_signals_with_allocation(date, capital):
         return jsonify({
             "trading_days": trading_days,
             "positions": positions,
-            "total_positions": len(positions)
+            "total_positions": len(positions),
+            "quote_snapshot": snapshot.metadata(config.QUOTE_MAX_AGE)
         })
         
     except Exception as e:
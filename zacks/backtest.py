@@ -0,0 +1,292 @@
+"""
+Vectorized historical backtest of the Zacks rank long/short portfolio.
+
+Replays the stored weekly portfolios the way get_signals_with_allocation
+combines them: on any day the book is the equal-weighted overlap of the
+baskets from the last three trading weeks, each basket half long its rank-1
+names and half short its rank-5 names. Baskets are laid out on a weekly
+calendar as a (weeks x tickers) weight matrix and averaged over the
+three-week window. Each week's book is carried onto trading days and
+multiplied with the daily returns matrix, so there is no loop over baskets
+or days.
+
+A week's book is traded at the close of the week's last trading day and
+earns returns from the next trading day. Weights are held constant between
+rebalances (daily rebalanced to target), without transaction costs.
+
+Usage:
+    python backtest.py --start 2023-01-01 --output signals/backtest
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import time
+from itertools import cycle
+
+import numpy as np
+import pandas as pd
+import requests
+import yfinance as yf
+
+import config
+from signal_store import SignalStore
+from stage_timer import timed_run, stage, record_retry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+
+
+def calculate_risk_metrics(returns, periods=TRADING_DAYS):
+    """Same metrics as pairs portfolio_utils, for returns sampled `periods` times a year"""
+    annual_return = (1 + returns.mean()) ** periods - 1
+    annual_vol = returns.std() * np.sqrt(periods)
+    sharpe_ratio = annual_return / annual_vol if annual_vol != 0 else 0
+    max_drawdown = (1 + returns).cumprod().div((1 + returns).cumprod().cummax()) - 1
+    return {
+        'Annual Return': float(annual_return),
+        'Annual Volatility': float(annual_vol),
+        'Sharpe Ratio': float(sharpe_ratio),
+        'Max Drawdown': float(max_drawdown.min())
+    }
+
+
+def load_portfolios(store, start_date=None, end_date=None):
+    """
+    Stored weekly portfolios, the latest run of each trading date
+    Returns:
+        dict of {trading_date: {'long': [...], 'short': [...]}}, oldest first
+    """
+    runs = store.runs(config.SIGNAL_STRATEGY, start_date=start_date, end_date=end_date, latest_only=True)
+    return {run['trading_date']: run['payload']['portfolio'] for run in runs}
+
+
+def basket_weights(portfolios):
+    """
+    One row per basket: +0.5 / n_long for each long and -0.5 / n_short for each short
+    Returns:
+        DataFrame of weights indexed by trading date, one column per ticker
+    """
+    dates = list(portfolios)
+    tickers = sorted({ticker for portfolio in portfolios.values()
+                      for side in ('long', 'short') for ticker in portfolio[side]})
+    column = {ticker: i for i, ticker in enumerate(tickers)}
+    weights = np.zeros((len(dates), len(tickers)))
+
+    for row, date in enumerate(dates):
+        for side, sign in (('long', 1.0), ('short', -1.0)):
+            names = portfolios[date][side]
+            if names:
+                # Duplicate names get their share added up, like the live aggregation
+                np.add.at(weights[row], [column[ticker] for ticker in names], sign * 0.5 / len(names))
+
+    return pd.DataFrame(weights, index=pd.to_datetime(dates), columns=tickers)
+
+
+def overlap_weights(baskets, last_week=None, weeks=3):
+    """
+    Equal-weighted overlap of the baskets from the last `weeks` trading weeks
+    Weeks without a basket are skipped, like a missing portfolio in the live allocation.
+    Args:
+        baskets: DataFrame from basket_weights
+        last_week: Last Monday-Sunday week period to compute a book for, defaults to the last basket's
+    Returns:
+        DataFrame of book weights for every week from the first basket, indexed by week period
+    """
+    # Lay the baskets out on a Monday-Sunday week calendar, the last one of each week
+    weekly = baskets.groupby(baskets.index.to_period('W-SUN')).last()
+    last_week = max(last_week, weekly.index.max()) if last_week is not None else weekly.index.max()
+    weekly = weekly.reindex(pd.period_range(weekly.index.min(), last_week, freq='W-SUN'))
+
+    available = weekly.notna().any(axis=1).astype(float)
+    total = weekly.fillna(0.0).rolling(weeks, min_periods=1).sum()
+    count = available.rolling(weeks, min_periods=1).sum()
+    return total.div(count.where(count > 0), axis=0).fillna(0.0)
+
+
+def daily_weights(book, index):
+    """
+    Book weights held on each trading day of `index`
+    Each week's book is set at the close of its last trading day and earns
+    returns from the next trading day.
+    """
+    week_ends = index.to_series().groupby(index.to_period('W-SUN')).last()
+    week_ends = week_ends[week_ends.index.isin(book.index)]
+    held = book.loc[week_ends.index].set_axis(pd.DatetimeIndex(week_ends.to_numpy()))
+    return held.reindex(index).ffill().shift(1).fillna(0.0)
+
+
+def simulate(portfolios, closes, weeks=3):
+    """
+    Daily returns of the overlapping-basket book
+    Args:
+        portfolios: dict from load_portfolios
+        closes: DataFrame of daily closes, one column per ticker
+        weeks: Trading weeks of baskets held at once
+    Returns:
+        tuple of (DataFrame with total, long and short daily returns, gross exposure
+        and turnover, DataFrame of daily weights)
+    """
+    baskets = basket_weights(portfolios)
+    closes = closes.sort_index()
+    # Trade from the first basket onwards
+    closes = closes[closes.index >= baskets.index.min()]
+    if closes.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    returns = closes.pct_change()
+
+    book = overlap_weights(baskets, closes.index[-1].to_period('W-SUN'), weeks)
+    weights = daily_weights(book, closes.index).reindex(columns=returns.columns, fill_value=0.0)
+    missing = book.columns.difference(returns.columns)
+    if len(missing):
+        logger.warning(f"No prices for {len(missing)} held tickers, their positions earn nothing: "
+                       f"{', '.join(missing[:10])}{'...' if len(missing) > 10 else ''}")
+
+    w = weights.to_numpy()
+    r = np.nan_to_num(returns.to_numpy())
+    contribution = w * r
+    result = pd.DataFrame({
+        'total_return': contribution.sum(axis=1),
+        'long_return': np.where(w > 0, contribution, 0.0).sum(axis=1),
+        'short_return': np.where(w < 0, contribution, 0.0).sum(axis=1),
+        'gross_exposure': np.abs(w).sum(axis=1),
+        'turnover': np.abs(np.diff(w, axis=0, prepend=0.0)).sum(axis=1)
+    }, index=closes.index)
+    # The first day only sets the starting prices
+    return result.iloc[1:], weights.iloc[1:]
+
+
+def get_proxies():
+    proxy_url = f"https://proxy.webshare.io/api/v2/proxy/list/download/{config.WEBSHARE_API_KEY}/-/any/sourceip/direct/-/"
+    response = requests.get(proxy_url)
+    if response.status_code == 200:
+        return [f"http://{line.strip()}" for line in response.text.split('\n') if line.strip()]
+    raise ValueError(f"Failed to fetch proxies. Status code: {response.status_code}")
+
+
+def download_closes(tickers, start, proxies):
+    """
+    Daily closes since `start` for many tickers, in batches of DOWNLOAD_BATCH_SIZE
+    Returns:
+        DataFrame of closes with one column per ticker that returned data
+    """
+    proxy_pool = cycle(proxies)
+    frames = []
+    for batch_start in range(0, len(tickers), config.DOWNLOAD_BATCH_SIZE):
+        batch = tickers[batch_start:batch_start + config.DOWNLOAD_BATCH_SIZE]
+        batch_number = batch_start // config.DOWNLOAD_BATCH_SIZE + 1
+        for attempt in range(config.MAX_RETRIES):
+            try:
+                proxy = next(proxy_pool)
+                session = requests.Session()
+                if proxy:
+                    session.proxies = {'http': proxy, 'https': proxy}
+
+                with stage('fetch'):
+                    data = yf.download(batch, start=start, auto_adjust=True,
+                                       progress=False, threads=True, session=session)
+                if data is None or data.empty:
+                    raise ValueError("no data returned")
+
+                closes = data['Close']
+                if isinstance(closes, pd.Series):
+                    closes = closes.to_frame(batch[0])
+                frames.append(closes)
+                break
+
+            except Exception as e:
+                if attempt < config.MAX_RETRIES - 1:
+                    logger.error(f"Price batch {batch_number} - Error on attempt {attempt + 1}: {str(e)}, retrying...")
+                    record_retry('fetch')
+                    time.sleep(random.uniform(3, 6))
+                    continue
+                logger.error(f"Price batch {batch_number} - Error after {config.MAX_RETRIES} attempts: {str(e)}")
+
+    if not frames:
+        return pd.DataFrame()
+    closes = pd.concat(frames, axis=1)
+    closes.index = pd.to_datetime(closes.index).tz_localize(None)
+    return closes
+
+
+def summarize(result):
+    """Risk metrics of the book, its long and short legs, and average turnover"""
+    metrics = calculate_risk_metrics(result['total_return'])
+    metrics.update({
+        'Days': int(len(result)),
+        'Average Gross Exposure': float(result['gross_exposure'].mean()),
+        'Average Daily Turnover': float(result['turnover'].mean()),
+        'Long Leg': calculate_risk_metrics(result['long_return']),
+        'Short Leg': calculate_risk_metrics(result['short_return'])
+    })
+    return metrics
+
+
+def save_results(result, metrics, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    result.assign(cum_return=(1 + result['total_return']).cumprod()).to_csv(
+        os.path.join(output_dir, 'daily_returns.csv'), index_label='date')
+    with open(os.path.join(output_dir, 'performance_metrics.json'), 'w') as f:
+        json.dump(metrics, f, indent=4)
+
+
+def run_backtest(start_date=None, end_date=None, output_dir=None, prices_file=None):
+    output_dir = output_dir or config.BACKTEST_RESULTS_DIR
+    store = SignalStore(config.SIGNAL_DB_PATH)
+    portfolios = load_portfolios(store, start_date, end_date)
+    if not portfolios:
+        logger.error("No stored portfolios to backtest")
+        return None
+    tickers = sorted({ticker for portfolio in portfolios.values()
+                      for side in ('long', 'short') for ticker in portfolio[side]})
+    logger.info(f"Backtesting {len(portfolios)} weekly portfolios over {len(tickers)} tickers "
+                f"from {min(portfolios)} to {max(portfolios)}")
+
+    if prices_file:
+        closes = pd.read_csv(prices_file, index_col=0, parse_dates=True)
+    else:
+        try:
+            proxies = get_proxies() or [None]
+        except Exception as e:
+            logger.error(f"Error setting up proxies: {e}")
+            proxies = [None]
+        closes = download_closes(tickers, min(portfolios), proxies)
+    if closes.empty:
+        logger.error("No price history available")
+        return None
+    if end_date:
+        closes = closes[closes.index <= pd.Timestamp(end_date)]
+
+    with stage('backtest'):
+        result, _ = simulate(portfolios, closes)
+        metrics = summarize(result)
+
+    with stage('persist'):
+        save_results(result, metrics, output_dir)
+
+    logger.info(f"Annual Return: {metrics['Annual Return']:.2%}, "
+                f"Annual Volatility: {metrics['Annual Volatility']:.2%}, "
+                f"Sharpe Ratio: {metrics['Sharpe Ratio']:.2f}, "
+                f"Max Drawdown: {metrics['Max Drawdown']:.2%}")
+    logger.info(f"Results saved in {output_dir}")
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest the stored Zacks rank long/short portfolios')
+    parser.add_argument('--start', default=None, help='First portfolio date, YYYY-MM-DD')
+    parser.add_argument('--end', default=None, help='Last date, YYYY-MM-DD')
+    parser.add_argument('--output', default=config.BACKTEST_RESULTS_DIR, help='Directory for the results')
+    parser.add_argument('--prices', default=None,
+                        help='CSV of daily closes (date index, one column per ticker) instead of downloading')
+    args = parser.parse_args()
+
+    with timed_run('zacks_backtest', config.TIMINGS_DIR):
+        run_backtest(args.start, args.end, args.output, args.prices)
+
+
+if __name__ == "__main__":
+    main()
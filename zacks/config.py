@@ -7,5 +7,32 @@ MAX_RETRIES = 5
 # Threading Parameters
 MAX_WORKERS = 10
 
+# Tickers per batched volume and close download for universe scoring
+DOWNLOAD_BATCH_SIZE = 100
+
+# Directory for backtest results, inside the persisted signals volume
+BACKTEST_RESULTS_DIR = 'signals/backtest'
+
 # API Endpoints
 ZACKS_DATA_URL = 'http://zacks_data:5051'
+
+# Directory for per-stage timing reports, inside the persisted signals volume
+TIMINGS_DIR = 'signals/timings'
+
+# Append-only signal store shared by the portfolio job and the API, inside the signals volume
+SIGNAL_DB_PATH = 'signals/signals.db'
+SIGNAL_STRATEGY = 'zacks'
+
+# Background quote snapshot: seconds between batched refreshes, oldest quote used
+# instead of a live lookup, tickers per download request, and weeks of portfolio
+# runs whose tickers count as held
+QUOTE_REFRESH_INTERVAL = 60
+QUOTE_MAX_AGE = 300
+QUOTE_BATCH_SIZE = 100
+HELD_PORTFOLIO_WEEKS = 4
+
+# Seconds between quote snapshot refreshes outside regular trading hours
+QUOTE_IDLE_INTERVAL = 3600
+
+# Aggregated position weights cached per set of portfolio runs, for /signals/<date>/<capital>
+ALLOCATION_CACHE_SIZE = 32
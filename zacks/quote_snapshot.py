@@ -0,0 +1,271 @@
+"""
+Background quote snapshot for request-path pricing.
+
+A daemon thread refreshes the last price of every tracked ticker in batched
+downloads every `interval` seconds and publishes the result as an immutable
+table. Readers take the current table in one step, so a request sees one
+consistent snapshot and never waits on the network. Each quote keeps the
+time of its last bar and the time it was fetched, so callers can decide
+what is too stale to use and fall back to a live lookup. Outside regular
+trading hours, prices barely move, so refreshes can be spaced out to
+`idle_interval`.
+
+    quotes = QuoteSnapshot(lambda: ['AAPL', 'MSFT'], interval=60, active=market_open)
+    quotes.start()
+    snapshot = quotes.snapshot(['AAPL'])
+    price = snapshot.price('AAPL', max_age=300)
+"""
+import functools
+import threading
+import time
+from datetime import datetime, timezone
+from itertools import cycle
+
+import pandas as pd
+import pandas_market_calendars as mcal
+import pytz
+import requests
+import yfinance as yf
+
+EASTERN = pytz.timezone('US/Eastern')
+
+
+@functools.lru_cache(maxsize=8)
+def _regular_session(date, calendar):
+    """(open, close) epoch seconds of the session on a YYYY-MM-DD date, or None if closed"""
+    schedule = mcal.get_calendar(calendar).schedule(start_date=date, end_date=date)
+    if schedule.empty:
+        return None
+    return schedule['market_open'].iloc[0].timestamp(), schedule['market_close'].iloc[0].timestamp()
+
+
+def market_open(now=None, calendar='NYSE'):
+    """Whether `now` (epoch seconds, defaults to the current time) falls in a regular session"""
+    now = time.time() if now is None else now
+    session = _regular_session(datetime.fromtimestamp(now, EASTERN).strftime('%Y-%m-%d'), calendar)
+    return session is not None and session[0] <= now < session[1]
+
+
+class ProxySessions:
+    """
+    Session factory rotating through a proxy list, for QuoteSnapshot's session_factory.
+
+    Args:
+        get_proxies: Function returning proxy URLs, called on first use and again
+                     every max_age seconds; without proxies sessions go direct
+        max_age: Seconds before the proxy list is fetched again
+    """
+
+    def __init__(self, get_proxies, max_age=3600):
+        self.get_proxies = get_proxies
+        self.max_age = max_age
+        self._pool = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if self._pool is None or time.time() - self._fetched_at > self.max_age:
+                try:
+                    proxies = self.get_proxies()
+                except Exception as e:
+                    print(f"Error fetching proxies for the quote snapshot: {e}")
+                    proxies = None
+                self._pool = cycle(proxies or [None])
+                self._fetched_at = time.time()
+            proxy = next(self._pool)
+        session = requests.Session()
+        if proxy:
+            session.proxies = {'http': proxy, 'https': proxy}
+        return session
+
+
+def download_last_prices(tickers, session=None):
+    """
+    Latest 1-minute close for many tickers in one request
+    Returns:
+        dict of {ticker: (price, bar time as epoch seconds)}
+    """
+    data = yf.download(list(tickers), period='5d', interval='1m',
+                       progress=False, threads=True, session=session)
+    if data is None or data.empty:
+        return {}
+
+    closes = data['Close']
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(list(tickers)[0])
+
+    quotes = {}
+    for ticker in closes.columns:
+        series = closes[ticker].dropna()
+        if series.empty or series.iloc[-1] <= 0:
+            continue
+        quotes[ticker] = (float(series.iloc[-1]), series.index[-1].timestamp())
+    return quotes
+
+
+class Snapshot:
+    """Quotes as of one refresh, with staleness metadata"""
+
+    def __init__(self, quotes, refreshed_at, tickers=None):
+        self.quotes = quotes
+        self.refreshed_at = refreshed_at
+        self.tickers = list(tickers) if tickers is not None else sorted(quotes)
+
+    def age(self, ticker, now=None):
+        """Seconds since the ticker's quote was fetched, or None if there is none"""
+        quote = self.quotes.get(ticker)
+        if quote is None:
+            return None
+        return (now or time.time()) - quote['fetched_at']
+
+    def price(self, ticker, max_age=None):
+        """Last price, or None if missing or fetched more than max_age seconds ago"""
+        quote = self.quotes.get(ticker)
+        if quote is None:
+            return None
+        if max_age is not None and self.age(ticker) > max_age:
+            return None
+        return quote['price']
+
+    def metadata(self, max_age=None):
+        """Refresh time plus the requested tickers that are missing or stale"""
+        now = time.time()
+        missing = [ticker for ticker in self.tickers if ticker not in self.quotes]
+        stale = [ticker for ticker in self.tickers
+                 if ticker in self.quotes and max_age is not None and self.age(ticker, now) > max_age]
+        return {
+            'refreshed_at': (datetime.fromtimestamp(self.refreshed_at, timezone.utc).isoformat(timespec='seconds')
+                             if self.refreshed_at else None),
+            'max_age_seconds': max_age,
+            'quoted': len(self.tickers) - len(missing) - len(stale),
+            'stale': stale,
+            'missing': missing
+        }
+
+
+class QuoteSnapshot:
+    """
+    Keep last prices for a changing set of tickers fresh in the background.
+
+    Args:
+        tickers: Function returning the tickers to track, called on every refresh
+                 so the set follows what is currently held and signaled
+        interval: Seconds between refreshes
+        batch_size: Tickers per download request
+        session_factory: Optional function returning a requests session per batch
+        fetch: Function (tickers, session) -> {ticker: (price, bar time)}
+        active: Optional function returning whether quotes are moving, e.g. market_open;
+                while it returns False refreshes are spaced idle_interval seconds apart
+        idle_interval: Seconds between refreshes while not active
+    """
+
+    def __init__(self, tickers, interval=60, batch_size=100, session_factory=None,
+                 fetch=download_last_prices, active=None, idle_interval=3600):
+        self.tickers = tickers
+        self.interval = interval
+        self.active = active
+        self.idle_interval = idle_interval
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.fetch = fetch
+        self._quotes = {}
+        self._refreshed_at = None
+        self._extra = set()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def track(self, tickers):
+        """Add tickers seen at read time so the next refresh covers them"""
+        with self._lock:
+            self._extra.update(tickers)
+
+    def put(self, prices):
+        """Publish prices fetched live by a reader, so other readers reuse them until the next refresh"""
+        if not prices:
+            return
+        now = time.time()
+        with self._lock:
+            quotes = dict(self._quotes)
+            for ticker, price in prices.items():
+                quotes[ticker] = {'price': price, 'timestamp': now, 'fetched_at': now}
+            self._quotes = quotes
+            self._extra.update(prices)
+
+    def refresh(self):
+        """Fetch every tracked ticker in batches and publish a new table"""
+        with self._refresh_lock:
+            try:
+                tracked = set(self.tickers())
+            except Exception as e:
+                print(f"Error listing tickers for the quote snapshot: {e}")
+                tracked = set()
+            with self._lock:
+                tracked |= self._extra
+            tracked = sorted(ticker for ticker in tracked if ticker)
+
+            # Quotes that fail to refresh are kept and age out through fetched_at
+            fetched_quotes = {}
+            for start in range(0, len(tracked), self.batch_size):
+                batch = tracked[start:start + self.batch_size]
+                try:
+                    session = self.session_factory() if self.session_factory else None
+                    fetched = self.fetch(batch, session)
+                except Exception as e:
+                    print(f"Error refreshing quotes for {batch[0]}..{batch[-1]}: {e}")
+                    continue
+                fetched_at = time.time()
+                for ticker, (price, bar_time) in fetched.items():
+                    fetched_quotes[ticker] = {'price': price, 'timestamp': bar_time, 'fetched_at': fetched_at}
+
+            # Merge into the current table, so prices put() during the refresh are kept
+            with self._lock:
+                quotes = dict(self._quotes)
+                for ticker, quote in fetched_quotes.items():
+                    current = quotes.get(ticker)
+                    if current is None or current['fetched_at'] <= quote['fetched_at']:
+                        quotes[ticker] = quote
+                self._quotes = quotes
+                self._refreshed_at = time.time()
+            return len(tracked)
+
+    def due(self):
+        """Whether the next tick should refresh: always while active, every idle_interval otherwise"""
+        if self.active is None or self._refreshed_at is None:
+            return True
+        try:
+            active = self.active()
+        except Exception as e:
+            print(f"Error checking market hours for the quote snapshot: {e}")
+            active = True
+        return active or time.time() - self._refreshed_at >= self.idle_interval
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.monotonic()
+            if self.due():
+                self.refresh()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - start)))
+
+    def start(self):
+        """Start refreshing in a daemon thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='quote-snapshot')
+            self._thread.daemon = True  # Thread will exit when main program exits
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self, tickers=None):
+        """Current quotes for the given tickers (all if None) as one consistent Snapshot"""
+        with self._lock:
+            quotes, refreshed_at = self._quotes, self._refreshed_at
+        return Snapshot(quotes, refreshed_at, tickers)
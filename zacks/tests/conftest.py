@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+# Service modules are imported flat, the way the service runs them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    # The app creates its signal store relative to the working directory on import
+    monkeypatch.chdir(tmp_path)
+    import app
+    return app
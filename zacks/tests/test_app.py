@@ -0,0 +1,67 @@
+import pytest
+
+from signal_store import SignalStore
+
+TRADING_DAYS = ['2026-10-02', '2026-10-09', '2026-10-16']
+
+PORTFOLIOS = {
+    '2026-10-02': {'portfolio': {'long': ['AAPL', 'MSFT'], 'short': ['F']}},
+    '2026-10-09': {'portfolio': {'long': ['AAPL'], 'short': ['F', 'GM']}},
+    '2026-10-16': {'portfolio': {'long': ['NVDA', 'AAPL'], 'short': []}},
+}
+
+
+@pytest.fixture
+def service(app_module, tmp_path, monkeypatch):
+    app = app_module
+    store = SignalStore(str(tmp_path / 'signals.db'))
+    for trading_date, payload in PORTFOLIOS.items():
+        store.append('zacks', trading_date, payload)
+    monkeypatch.setattr(app, 'signal_store', store)
+    app.position_weights_cache.clear()
+    yield app
+    app.position_weights_cache.clear()
+
+
+def test_cached_weights_match_the_stored_portfolios(service, monkeypatch):
+    weights = service.get_position_weights(TRADING_DAYS)
+
+    assert weights == pytest.approx(service.aggregate_position_weights(list(PORTFOLIOS.values())))
+    assert weights['AAPL'] == pytest.approx((0.25 + 0.5 + 0.25) / 3)
+    assert weights['F'] == pytest.approx(-(0.5 + 0.25) / 3)
+
+    # A hit does not load any payload again
+    monkeypatch.setattr(service.signal_store, 'get', lambda run_id: pytest.fail('payload reloaded'))
+    assert service.get_position_weights(TRADING_DAYS) is weights
+
+
+def test_new_run_for_a_date_gives_a_new_cache_key(service):
+    first = service.get_position_weights(TRADING_DAYS)
+    rerun = {'portfolio': {'long': ['TSLA'], 'short': ['F']}}
+    service.signal_store.append('zacks', '2026-10-09', rerun)
+
+    second = service.get_position_weights(TRADING_DAYS)
+
+    assert len(service.position_weights_cache) == 2
+    assert second is not first
+    assert second == pytest.approx(service.aggregate_position_weights(
+        [PORTFOLIOS['2026-10-02'], rerun, PORTFOLIOS['2026-10-16']]))
+
+
+def test_allocation_is_priced_from_the_quote_snapshot(service, monkeypatch):
+    monkeypatch.setattr(service, 'get_last_trading_days', lambda weeks, end_date: list(TRADING_DAYS))
+    monkeypatch.setattr(service, 'get_proxies', lambda: pytest.fail('live price lookup'))
+    prices = {'AAPL': 200.0, 'MSFT': 400.0, 'F': 10.0, 'GM': 50.0, 'NVDA': 100.0}
+    service.quote_snapshot.put(prices)
+
+    response = service.app.test_client().get('/signals/20261016/100000')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    weights = service.aggregate_position_weights(list(PORTFOLIOS.values()))
+    positions = {position['ticker']: position for position in body['positions']}
+    assert positions.keys() == weights.keys()
+    for ticker, weight in weights.items():
+        assert positions[ticker]['shares'] == int(100000 * weight / prices[ticker])
+        assert positions[ticker]['price'] == prices[ticker]
+    assert body['quote_snapshot']['missing'] == [] and body['quote_snapshot']['stale'] == []
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import simulate
+
+# Friday baskets with no basket in the week of 2026-09-18
+PORTFOLIOS = {
+    '2026-09-04': {'long': ['AAA', 'BBB'], 'short': ['CCC']},
+    '2026-09-11': {'long': ['AAA'], 'short': ['CCC', 'DDD']},
+    '2026-09-25': {'long': ['DDD', 'AAA'], 'short': []},
+}
+
+
+def make_closes():
+    index = pd.bdate_range('2026-09-04', '2026-10-02')
+    rng = np.random.default_rng(7)
+    returns = rng.normal(0.0, 0.02, (len(index), 4))
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=index, columns=['AAA', 'BBB', 'CCC', 'DDD'])
+
+
+def expected_book(aggregate, dates):
+    book = aggregate([{'portfolio': PORTFOLIOS[date]} for date in dates])
+    return pd.Series(book).reindex(['AAA', 'BBB', 'CCC', 'DDD'], fill_value=0.0)
+
+
+@pytest.mark.parametrize('days, dates', [
+    # A basket is traded from the next trading day after it is published
+    (('2026-09-07', '2026-09-11'), ['2026-09-04']),
+    (('2026-09-14', '2026-09-18'), ['2026-09-04', '2026-09-11']),
+    # The missing week is skipped rather than counted as an empty basket
+    (('2026-09-21', '2026-09-25'), ['2026-09-04', '2026-09-11']),
+    # The first basket has rolled out of the three-week window
+    (('2026-09-28', '2026-10-02'), ['2026-09-11', '2026-09-25']),
+])
+def test_held_weights_match_the_live_allocation(app_module, days, dates):
+    _, weights = simulate(PORTFOLIOS, make_closes(), weeks=3)
+    expected = expected_book(app_module.aggregate_position_weights, dates)
+
+    held = weights.loc[days[0]:days[1]]
+    assert len(held) == 5
+    for _, row in held.iterrows():
+        pd.testing.assert_series_equal(row, expected, check_names=False)
+
+
+def test_returns_are_the_held_weights_times_the_close_returns(app_module):
+    closes = make_closes()
+    result, weights = simulate(PORTFOLIOS, closes, weeks=3)
+
+    # The first day only sets the starting prices
+    assert result.index[0] == pd.Timestamp('2026-09-07')
+    contribution = weights * closes.pct_change().loc[weights.index]
+    np.testing.assert_allclose(result['total_return'], contribution.sum(axis=1))
+    np.testing.assert_allclose(result['long_return'], contribution.where(weights > 0, 0.0).sum(axis=1))
+    np.testing.assert_allclose(result['short_return'], contribution.where(weights < 0, 0.0).sum(axis=1))
+    np.testing.assert_allclose(result['gross_exposure'], weights.abs().sum(axis=1))
+
+    # Books change hands on the Monday after each basket week
+    day = pd.Timestamp('2026-09-14')
+    previous = expected_book(app_module.aggregate_position_weights, ['2026-09-04'])
+    current = expected_book(app_module.aggregate_position_weights, ['2026-09-04', '2026-09-11'])
+    assert result.loc[day, 'turnover'] == pytest.approx((current - previous).abs().sum())